@@ -0,0 +1,324 @@
+"""
+Scaling benchmark of the headless simulation.
+A Vivarium is built at several population sizes, and the milliseconds per tick spent in Vivarium.animationUpdate,
+in the creatures' animationUpdate and stepForward, and in Component.update are measured separately, together with
+the peak memory of the run. Component.update counts every call, from the vivarium, the creatures or eager setters,
+and is left out of the creature timings it happens in. Results are written as JSON so that two commits can be
+compared.
+
+The vivarium runs in its default configuration, simulation level of detail off. --lod times the LOD configuration
+instead, the "lod" key of the JSON says which one a result file holds, and only results of the same configuration
+are compared.
+
+Run it directly: python Benchmark.py [--counts 10 100 1000 10000] [--ticks 20] [--lod] [--output results.json]
+                                     [--compare baseline.json] [--threshold 1.2]
+With --compare, every metric more than threshold times slower than in the baseline is reported as a regression and
+the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from Component import Component
+from Vivarium import Vivarium
+from Prey import Prey
+from Predator import Predator
+from Kernels import loadKernels
+
+
+VERSION = 2  # layout version of the JSON results
+DEFAULT_COUNTS = (10, 100, 1000, 10000)
+TIMED_METRICS = ("tick_ms", "creature_animation_ms", "step_forward_ms", "component_update_ms")
+# metrics compared by compare(), all of them are better when lower
+COMPARED_METRICS = TIMED_METRICS + ("peak_rss_mb",)
+
+density = 10 / 64  # creatures per cubic tank unit, the same at every size so neighbor counts stay comparable
+predator_share = 0.1  # fraction of the population which are predators
+
+
+class _Timer:
+    """
+    Wraps a method and adds the wall time of every call to a running total. Calls made from inside another call
+    of the same timer are not counted twice, and the time spent in a nested timer can be left out.
+    """
+    total = 0.0
+    method = None
+    nested = None  # _Timer whose time during calls of this one is not counted
+    depth = 0  # calls of this timer in progress
+
+    def __init__(self, method, nested=None):
+        self.total = 0.0
+        self.method = method
+        self.nested = nested
+        self.depth = 0
+
+    def __call__(self, *args, **kwargs):
+        if self.depth:
+            return self.method(*args, **kwargs)
+        self.depth += 1
+        start = time.perf_counter()
+        inner = self.nested.total if self.nested is not None else 0.0
+        try:
+            return self.method(*args, **kwargs)
+        finally:
+            self.depth -= 1
+            self.total += time.perf_counter() - start
+            if self.nested is not None:
+                self.total -= self.nested.total - inner
+
+    def take(self):
+        """
+        Total since the last take(), in seconds
+        """
+        total, self.total = self.total, 0.0
+        return total
+
+
+def peakMemory():
+    """
+    Peak resident memory of this process so far in megabytes, None where the platform does not report it
+
+    :rtype: float
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def buildVivarium(count, seed=0, kernels=None, lod=False):
+    """
+    Headless vivarium holding count creatures at a fixed density, one in ten of them predators
+
+    :param count: number of creatures
+    :type count: int
+    :param seed: seed of the simulation
+    :type seed: int
+    :param kernels: kernel backend, see Kernels.loadKernels
+    :type kernels: str
+    :param lod: turn simulation level of detail on, see SimulationLOD
+    :type lod: bool
+    :rtype: Vivarium
+    """
+    side = float(np.cbrt(count / density))
+    tank_dimensions = [side, side, side]
+    vivarium = Vivarium(None, None, seed=seed, tank_dimensions=tank_dimensions, populate=False, kernels=kernels,
+                        lod=lod)
+    predators = max(1, int(round(count * predator_share)))
+    vivarium.spawn(Prey, count - predators, "prey")
+    vivarium.spawn(Predator, predators, "predator")
+    return vivarium
+
+
+def runBenchmark(count, ticks, warmup=3, seed=0, kernels=None, lod=False):
+    """
+    Build one vivarium and time its ticks. Module level so that every size runs in a fresh worker process,
+    which keeps the peak memory of one size from leaking into the next.
+
+    :param count: number of creatures
+    :type count: int
+    :param ticks: number of timed ticks
+    :type ticks: int
+    :param warmup: ticks run before timing starts, e.g. for kernels to compile
+    :type warmup: int
+    :param seed: seed of the simulation
+    :type seed: int
+    :param kernels: kernel backend, see Kernels.loadKernels
+    :type kernels: str
+    :param lod: turn simulation level of detail on, see SimulationLOD
+    :type lod: bool
+    :return: timings of the run, every *_ms value is a mean over the timed ticks
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    vivarium = buildVivarium(count, seed, kernels, lod)
+    build_seconds = time.perf_counter() - start
+
+    timers = {"creature_animation_ms": [], "step_forward_ms": [], "component_update_ms": []}
+    # every Component.update, the vivarium's and the ones creatures and setters run themselves
+    componentUpdate = Component.update
+    update = _Timer(componentUpdate)
+    Component.update = lambda self, *args, **kwargs: update(self, *args, **kwargs)
+    animations = []
+    steps = []
+    for c in vivarium.components:
+        c.animationUpdate = _Timer(c.animationUpdate, update)
+        c.stepForward = _Timer(c.stepForward, update)
+        animations.append(c.animationUpdate)
+        steps.append(c.stepForward)
+
+    tick_times = []
+    try:
+        for _ in range(warmup):
+            vivarium.animationUpdate()
+        for timer in [update] + animations + steps:
+            timer.take()
+
+        for _ in range(ticks):
+            start = time.perf_counter()
+            vivarium.animationUpdate()
+            tick_times.append(time.perf_counter() - start)
+            timers["creature_animation_ms"].append(sum(t.take() for t in animations))
+            timers["step_forward_ms"].append(sum(t.take() for t in steps))
+            timers["component_update_ms"].append(update.take())
+    finally:
+        Component.update = componentUpdate
+
+    tick_times = np.asarray(tick_times) * 1000
+    result = {
+        "creatures": count,
+        "lod": lod,
+        "creatures_at_end": len(vivarium.components),
+        "tank_side": vivarium.tank_dimensions[0],
+        "build_s": build_seconds,
+        "tick_ms": float(tick_times.mean()) if ticks else 0.0,
+        "tick_median_ms": float(np.median(tick_times)) if ticks else 0.0,
+    }
+    for key, values in timers.items():
+        result[key] = float(np.mean(values)) * 1000 if ticks else 0.0
+    result["other_ms"] = result["tick_ms"] - sum(result[key] for key in timers)
+    result["us_per_creature_tick"] = result["tick_ms"] * 1000 / count
+    result["neighbor_rebuild_rate"] = vivarium.flocking.neighbors.rebuildRate()
+    result["peak_rss_mb"] = peakMemory()
+    return result
+
+
+def gitCommit():
+    """
+    Commit hash of the working tree, None outside a git checkout
+
+    :rtype: str
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def runSuite(counts=DEFAULT_COUNTS, ticks=20, warmup=3, seed=0, kernels=None, lod=False):
+    """
+    Benchmark every population size, one after the other, each in its own process
+
+    :param counts: population sizes
+    :type counts: list<int>
+    :param lod: time the simulation level of detail configuration instead of the default one
+    :type lod: bool
+    :rtype: dict
+    """
+    results = []
+    for count in counts:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(runBenchmark, count, ticks, warmup, seed, kernels, lod).result())
+    return {
+        "version": VERSION,
+        "commit": gitCommit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "kernels": loadKernels(kernels).name,
+        "lod": lod,
+        "ticks": ticks,
+        "warmup": warmup,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=1.2, floor=0.05):
+    """
+    Metrics which got worse between two suite results, for every population size present in both
+
+    :param baseline: runSuite() result to compare against
+    :type baseline: dict
+    :param current: runSuite() result under test
+    :type current: dict
+    :param threshold: ratio current / baseline above which a metric counts as a regression
+    :type threshold: float
+    :param floor: timings below this many milliseconds in both runs are timer noise and are left out
+    :type floor: float
+    :return: (creatures, metric, baseline value, current value, ratio) of every compared metric, and the regressions
+    :rtype: tuple<list<tuple>, list<tuple>>
+    :raises ValueError: if the two runs timed different configurations
+    """
+    # results written before the "lod" key existed were all run with level of detail on
+    if baseline.get("lod", True) != current.get("lod", True):
+        raise ValueError(f"baseline ran with lod={baseline.get('lod', True)}, "
+                         f"current run with lod={current.get('lod', True)}")
+    before = {r["creatures"]: r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        old = before.get(r["creatures"])
+        if old is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if old.get(metric) is None or r.get(metric) is None:
+                continue
+            if metric in TIMED_METRICS and max(old[metric], r[metric]) < floor:
+                continue
+            ratio = r[metric] / old[metric] if old[metric] > 0 else float("inf")
+            rows.append((r["creatures"], metric, old[metric], r[metric], ratio))
+    return rows, [row for row in rows if row[4] > threshold]
+
+
+def formatResults(suite):
+    """
+    Render suite results as a fixed width text table
+
+    :rtype: str
+    """
+    columns = ("creatures", "build_s") + TIMED_METRICS + ("other_ms", "us_per_creature_tick", "neighbor_rebuild_rate",
+                                                           "peak_rss_mb")
+    cells = [[f"{r[c]:.3f}" if isinstance(r[c], float) else str(r[c]) for c in columns] for r in suite["results"]]
+    widths = [max(len(c), *(len(row[k]) for row in cells)) for k, c in enumerate(columns)] if cells \
+        else [len(c) for c in columns]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines += ["  ".join(v.rjust(w) for v, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the headless simulation at several population sizes")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS))
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--kernels", choices=("numpy", "numba"), default=None)
+    parser.add_argument("--lod", action="store_true", help="turn simulation level of detail on")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    suite = runSuite(args.counts, args.ticks, args.warmup, args.seed, args.kernels, args.lod)
+    print(formatResults(suite))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(suite, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        try:
+            _, regressions = compare(baseline, suite, args.threshold)
+        except ValueError as e:
+            sys.exit(f"cannot compare: {e}")
+        for creatures, metric, old, new, ratio in regressions:
+            print(f"regression at {creatures} creatures: {metric} {old:.3f} -> {new:.3f} ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,204 @@
+"""
+Bulk bounding-sphere collision detection between creatures.
+Works on whole CreatureStore arrays at once, one call per tick replaces per-creature Python loops.
+"""
+
+import numpy as np
+
+
+def timeOfImpact(offset, relative_velocity, reach, dt):
+    """
+    Earliest time at which two spheres moving in straight lines touch, for many pairs at once.
+    This is the capsule vs capsule test of the spheres swept over one step.
+
+    :param offset: center of the first sphere minus center of the second, at the start of the step
+    :type offset: numpy.ndarray(K, 3)
+    :param relative_velocity: velocity of the first sphere minus velocity of the second
+    :type relative_velocity: numpy.ndarray(K, 3)
+    :param reach: sum of the two radii
+    :type reach: numpy.ndarray(K,)
+    :param dt: length of the step
+    :type dt: float
+    :return: time of first contact in [0, dt], 0 for pairs already overlapping, inf when they do not touch
+    :rtype: numpy.ndarray(K,)
+    """
+    # |offset + relative_velocity * t| = reach  <=>  a t^2 + 2 b t + c = 0
+    a = np.einsum("ij,ij->i", relative_velocity, relative_velocity)
+    b = np.einsum("ij,ij->i", offset, relative_velocity)
+    c = np.einsum("ij,ij->i", offset, offset) - reach * reach
+    disc = b * b - a * c
+
+    t = np.full(len(a), np.inf)
+    t[c <= 0] = 0
+    approaching = (c > 0) & (b < 0) & (disc >= 0) & (a > 0)
+    root = (-b[approaching] - np.sqrt(disc[approaching])) / a[approaching]
+    t[approaching] = np.where(root <= dt, root, np.inf)
+    return t
+
+
+class CollisionResult:
+    """
+    Touching sphere pairs of one detection pass, split by how the two species relate.
+    Every pair array is (K, 2) and holds store row indices, with a matching (K,) array of contact times within the
+    step, all 0 for a discrete pass.
+    """
+    eats = None  # [predator row, prey row]
+    bounces = None  # [row, row] of the same species, lower row first
+    others = None  # any other touching pair, lower row first
+    eat_times = None
+    bounce_times = None
+    other_times = None
+
+    def __init__(self, eats, bounces, others, eat_times=None, bounce_times=None, other_times=None):
+        self.eats = eats
+        self.bounces = bounces
+        self.others = others
+        self.eat_times = eat_times if eat_times is not None else np.zeros(len(eats))
+        self.bounce_times = bounce_times if bounce_times is not None else np.zeros(len(bounces))
+        self.other_times = other_times if other_times is not None else np.zeros(len(others))
+
+    def __repr__(self):
+        return f"eats: {len(self.eats)} bounces: {len(self.bounces)} others: {len(self.others)}"
+
+
+class CollisionDetector:
+    """
+    Find every pair of overlapping bounding spheres and classify it by species relation.
+
+    Small populations are tested all-pairs with NumPy broadcasting. The (N, N) distance matrix is evaluated in blocks of
+    block_size rows, so memory stays bounded by block_size * N however large the population is.
+    When a SpatialHash is given, only the pairs it reports are tested instead.
+
+    Given a step length, detection is continuous: spheres are swept along their velocities over the step, so fast
+    creatures cannot pass through each other between two ticks.
+    """
+    predation = None  # set<tuple<int, int>>, (predator species, prey species)
+    block_size = 512
+
+    def __init__(self, predation=((0, 1),), block_size=512):
+        """
+        :param predation: (predator species_id, prey species_id) relations
+        :type predation: iterable<tuple<int, int>>
+        :param block_size: number of rows tested per block of the all-pairs kernel
+        :type block_size: int
+        """
+        self.predation = set(tuple(p) for p in predation)
+        self.block_size = max(1, int(block_size))
+
+    def overlappingPairs(self, positions, radii, grid=None):
+        """
+        All pairs (i, j), i < j, whose spheres overlap
+
+        :param positions: sphere centers
+        :type positions: numpy.ndarray(N, 3)
+        :param radii: sphere radii
+        :type radii: numpy.ndarray(N,)
+        :param grid: optional spatial hash already rebuilt over positions
+        :type grid: SpatialHash
+        :rtype: numpy.ndarray(K, 2)
+        """
+        n = len(positions)
+        if n < 2:
+            return np.zeros((0, 2), dtype=np.int64)
+
+        if grid is not None:
+            i, j = grid.pairsWithin(2 * float(radii.max()))
+            d = positions[i] - positions[j]
+            reach = radii[i] + radii[j]
+            hit = np.einsum("ij,ij->i", d, d) <= reach * reach
+            pairs = np.stack((np.minimum(i, j), np.maximum(i, j)), axis=1)[hit]
+            return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+        result = []
+        for start in range(0, n - 1, self.block_size):
+            stop = min(start + self.block_size, n)
+            d = positions[start:stop, None, :] - positions[None, :, :]
+            d2 = np.einsum("ijk,ijk->ij", d, d)
+            reach = radii[start:stop, None] + radii[None, :]
+            hit = d2 <= reach * reach
+            # only keep the upper triangle, j > i
+            hit &= np.arange(n)[None, :] > np.arange(start, stop)[:, None]
+            bi, bj = np.nonzero(hit)
+            result.append(np.stack((bi + start, bj), axis=1))
+        return np.concatenate(result)
+
+    def sweptPairs(self, positions, velocities, radii, dt, grid=None):
+        """
+        All pairs (i, j), i < j, whose spheres touch at some time of a step, moving along their velocities
+
+        :param positions: sphere centers at the start of the step
+        :type positions: numpy.ndarray(N, 3)
+        :param velocities: sphere velocities
+        :type velocities: numpy.ndarray(N, 3)
+        :param radii: sphere radii
+        :type radii: numpy.ndarray(N,)
+        :param dt: length of the step
+        :type dt: float
+        :param grid: optional spatial hash already rebuilt over positions
+        :type grid: SpatialHash
+        :return: pairs and their time of first contact
+        :rtype: tuple<numpy.ndarray(K, 2), numpy.ndarray(K,)>
+        """
+        n = len(positions)
+        if n < 2:
+            return np.zeros((0, 2), dtype=np.int64), np.zeros(0)
+
+        if grid is not None:
+            # two creatures can close at most twice the top speed's travel in one step
+            travel = 2 * float(np.linalg.norm(velocities, axis=1).max()) * dt
+            i, j = grid.pairsWithin(2 * float(radii.max()) + travel)
+            i, j = np.minimum(i, j), np.maximum(i, j)
+            t = timeOfImpact(positions[i] - positions[j], velocities[i] - velocities[j], radii[i] + radii[j], dt)
+            hit = np.isfinite(t)
+            pairs, times = np.stack((i, j), axis=1)[hit], t[hit]
+            order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+            return pairs[order], times[order]
+
+        result = []
+        result_times = []
+        for start in range(0, n - 1, self.block_size):
+            stop = min(start + self.block_size, n)
+            d = (positions[start:stop, None, :] - positions[None, :, :]).reshape(-1, 3)
+            dv = (velocities[start:stop, None, :] - velocities[None, :, :]).reshape(-1, 3)
+            reach = (radii[start:stop, None] + radii[None, :]).ravel()
+            t = timeOfImpact(d, dv, reach, dt).reshape(stop - start, n)
+            hit = np.isfinite(t)
+            # only keep the upper triangle, j > i
+            hit &= np.arange(n)[None, :] > np.arange(start, stop)[:, None]
+            bi, bj = np.nonzero(hit)
+            result.append(np.stack((bi + start, bj), axis=1))
+            result_times.append(t[bi, bj])
+        return np.concatenate(result), np.concatenate(result_times)
+
+    def detect(self, store, grid=None, dt=None):
+        """
+        Run one detection pass over every creature in the store
+
+        :param store: the creature state to test
+        :type store: CreatureStore
+        :param grid: optional spatial hash already rebuilt over store.positions()
+        :type grid: SpatialHash
+        :param dt: step length for continuous detection, None to only test the current positions
+        :type dt: float
+        :rtype: CollisionResult
+        """
+        if dt is None:
+            pairs = self.overlappingPairs(store.positions(), store.radii(), grid)
+            times = np.zeros(len(pairs))
+        else:
+            pairs, times = self.sweptPairs(store.positions(), store.velocities(), store.radii(), dt, grid)
+        species = store.speciesIds()
+        si = species[pairs[:, 0]]
+        sj = species[pairs[:, 1]]
+
+        i_eats_j = np.zeros(len(pairs), dtype=bool)
+        j_eats_i = np.zeros(len(pairs), dtype=bool)
+        for predator, prey in self.predation:
+            i_eats_j |= (si == predator) & (sj == prey)
+            j_eats_i |= (sj == predator) & (si == prey)
+
+        eats = np.concatenate((pairs[i_eats_j], pairs[j_eats_i][:, ::-1]))
+        eat_times = np.concatenate((times[i_eats_j], times[j_eats_i]))
+        same = si == sj
+        other = ~(i_eats_j | j_eats_i | same)
+        return CollisionResult(eats, pairs[same], pairs[other], eat_times, times[same], times[other])
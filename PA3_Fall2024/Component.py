@@ -7,6 +7,7 @@ First version in 11/01/2021
 
 Modified by Daniel Scrivener 07/2022
 """
+import contextlib
 import copy
 import math
 import os
@@ -49,11 +50,36 @@ except ImportError:
     raise ImportError("Required dependency PyOpenGL not present")
 
 
+class _Batch:
+    """
+    In module usage only. State of one open Component.batch() block
+    """
+    pending = None  # list<Component>, components whose eager update the block skipped
+    avoided = 0  # number of skipped eager updates
+
+    def __init__(self):
+        self.pending = []
+        self.avoided = 0
+
+
 class Component:
     children = None  # list
+    parentComponent = None  # Component whose children list holds this one, set by addChild
 
     # the homogeneous transformation matrix for the current joint
     transformationMat = None
+    localMat = None  # transformation relative to the parent, transformationMat = parent's matrix @ localMat
+    parentMat = None  # parent matrix transformationMat was last computed from, None to force a recompute
+    local_dirty = True  # localMat is out of date, set by markDirty()
+    subtree_dirty = True  # this component or one below it needs update(), kept set on every ancestor
+    scene = None  # FlatSceneGraph this component was compiled into, told about every markDirty()
+    scene_index = -1  # row of this component in its scene's arrays
+
+    # bumped whenever a children list changes, compiled scene graphs are then out of date
+    tree_version = 0
+    # open batch() blocks, innermost last. Setters leave their update to the innermost one while any is open
+    batches = []  # list<_Batch>
+    avoided_updates = 0  # eager setter updates skipped inside batch() blocks, since the program started
 
     # a instance of class which inherit from Displayable
     # if this class is used as skeleton, then keep this empty
@@ -83,6 +109,9 @@ class Component:
 
     preRotationMat = None
     postRotationMat = None
+    # constant factors around the joint rotation, rebuilt lazily after the setters changing them ran
+    prefixMat = None  # postRotationMat @ outRotation
+    suffixMat = None  # inRotation @ preRotationMat @ scaling
 
     texture = None
     textureOn = False
@@ -91,6 +120,9 @@ class Component:
 
     quat = None
 
+    # a sleeping component keeps its transformation matrices, update() from its parent skips its whole subtree
+    sleeping = False
+
     def __init__(self, position, display_obj=None):
         """
         Init Component
@@ -151,15 +183,49 @@ class Component:
         # prevent the duplicate child to be added to the self.children
         if child not in self.children:
             self.children.append(child)
+            if self.scene is not None:
+                # only compiled graphs have to know, building a new creature does not make them stale
+                Component.tree_version += 1
+        child.parentComponent = self
+        child.parentMat = None
+        child.markDirty()
 
     def clear(self):
         """
         remove all children and destroy them
         """
-        for c in self.children:
+        for c in list(self.children):
             c.clear()
+            c.releaseDisplay()
             self.children.remove(c)
             del c
+        Component.tree_version += 1
+
+    def releaseDisplay(self, recursive=False):
+        """
+        Give up the shared resources of this component's displayable, e.g. its mesh, when it leaves the scene
+
+        :param recursive: do the same for every component below this one
+        :type recursive: bool
+        """
+        if isinstance(self.displayObj, Displayable):
+            self.displayObj.release()
+        if recursive:
+            for c in self.children:
+                c.releaseDisplay(True)
+
+    def acquireDisplay(self, recursive=False):
+        """
+        Take back what releaseDisplay() gave up, when the component returns to the scene
+
+        :param recursive: do the same for every component below this one
+        :type recursive: bool
+        """
+        if isinstance(self.displayObj, Displayable):
+            self.displayObj.acquire()
+        if recursive:
+            for c in self.children:
+                c.acquireDisplay(True)
 
     def initialize(self):
         """
@@ -178,7 +244,10 @@ class Component:
         self.update()
 
     def draw(self, shaderProg):
-        shaderProg.setMat4("modelMat", self.transformationMat.transpose())
+        modelMat = self.transformationMat
+        if isinstance(self.displayObj, Displayable):
+            modelMat = self.displayObj.modelMatrix(modelMat)
+        shaderProg.setMat4("modelMat", modelMat.transpose())
         shaderProg.setVec3("currentColor", self.current_color)
         if isinstance(self.displayObj, Displayable):
             if self.textureOn:
@@ -192,38 +261,158 @@ class Component:
         for c in self.children:
             c.draw(shaderProg)
 
-    def update(self, parentTransformationMat=None):
+    def markDirty(self):
         """
-        Apply translation, rotation and scaling to this component and all its children
-        all matrix are stored in column-major order
-        Must be called after any changes made to the instance
+        Flag this component's local transformation as changed, so that the next update() recomputes it and the
+        world matrices of its subtree. Every setter calls this, code assigning angles, positions or rotation
+        matrices directly has to call it as well.
 
         :return: None
         """
-        if parentTransformationMat is None:
-            parentTransformationMat = np.identity(4)
+        if self.scene is not None and not self.local_dirty:
+            self.scene.dirty.append(self.scene_index)
+        self.local_dirty = True
+        self.subtree_dirty = True
+        self._flagAncestors()
+
+    def _flagAncestors(self):
+        """
+        In class usage only. Set subtree_dirty on every ancestor, up to the first one which already has it
+        """
+        node = self.parentComponent
+        while node is not None and not node.subtree_dirty:
+            node.subtree_dirty = True
+            node = node.parentComponent
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Edit many components with a single update: inside the block, setters such as setCurrentAngle or
+        setCurrentPosition only flag what they change, and this component's subtree is updated once on exit.
+        e.g. with creature.batch(): build or pose every part
+
+        Every block keeps its own list of the updates it skipped. A block closing while others are still open
+        hands that list to the innermost open one, so nested blocks are folded into the outermost one and
+        interleaved blocks do not lose each other's updates. If the block is left by an exception nothing is
+        updated, the edited components keep their flags and are brought up to date by their next update().
+        """
+        record = _Batch()
+        Component.batches.append(record)
+        try:
+            yield self
+        finally:
+            Component.batches.remove(record)
+            Component.avoided_updates += record.avoided
+        if Component.batches:
+            Component.batches[-1].pending.append(self)
+            Component.batches[-1].pending.extend(record.pending)
+            return
+        self.update()
+        # components edited in the block which are not below this one
+        for c in record.pending:
+            if c.local_dirty:
+                c.update()
+
+    def _updateUnlessBatched(self):
+        """
+        In class usage only. Eager update of a setter, left to the innermost open batch() block if there is one
+        """
+        if Component.batches:
+            record = Component.batches[-1]
+            record.avoided += 1
+            if not record.pending or record.pending[-1] is not self:
+                record.pending.append(self)
+        else:
+            self.update()
 
-        translationMat = self.glUtility.translate(*self.currentPos.getCoords(), False)
+    def localMatrix(self):
+        """
+        Translation, rotation and scaling of this component relative to its parent
+
+        :rtype: numpy.ndarray(4, 4)
+        """
+        if self.prefixMat is None:
+            self.prefixMat = self.postRotationMat @ self.outRotation
+        if self.suffixMat is None:
+            self.suffixMat = self.inRotation @ self.preRotationMat @ self.glUtility.scale(*self.currentScaling, False)
 
         # if self.quat is set, use the quaternion as your rotation matrix.
         # otherwise, use Euler angles with rotation extents, etc.
         # this means that quaternions will always override the settings for Euler angles
 
         if self.quat != None:
-            rotationMatU = self.quat.toMatrix().transpose()
-            rotationMatV = np.identity(4)
-            rotationMatW = np.identity(4)
+            rotationMat = self.quat.toMatrix().transpose()
         else:
-            rotationMatU = self.glUtility.rotate(self.uAngle, self.uAxis, False)
-            rotationMatV = self.glUtility.rotate(self.vAngle, self.vAxis, False)
-            rotationMatW = self.glUtility.rotate(self.wAngle, self.wAxis, False)
-        scalingMat = self.glUtility.scale(*self.currentScaling, False)
+            # a zero angle is an identity factor, leave it out
+            rotationMat = None
+            for angle, axis in ((self.uAngle, self.uAxis), (self.vAngle, self.vAxis), (self.wAngle, self.wAxis)):
+                if angle != 0:
+                    r = self.glUtility.rotate(angle, axis, False)
+                    rotationMat = r if rotationMat is None else rotationMat @ r
+        result = self.prefixMat @ self.suffixMat if rotationMat is None else \
+            self.prefixMat @ rotationMat @ self.suffixMat
+        # every factor is affine, so translating first only adds to the last column
+        result[:3, 3] += self.currentPos.getCoords()
+        return result
 
-        self.transformationMat = parentTransformationMat @ translationMat @ self.postRotationMat @ self.outRotation @ rotationMatU @ rotationMatV @ \
-                                 rotationMatW @ self.inRotation @ self.preRotationMat @ scalingMat
+    def update(self, parentTransformationMat=None):
+        """
+        Apply translation, rotation and scaling to this component and all its children
+        all matrix are stored in column-major order
+        Must be called after any changes made to the instance
+
+        Only components flagged by markDirty() rebuild their local matrix, world matrices are only recomputed below
+        a component whose matrix changed, and subtrees with nothing flagged are skipped entirely.
+
+        :param parentTransformationMat: world matrix of the parent, the parent component's current one if None
+        :type parentTransformationMat: numpy.ndarray(4, 4)
+        :return: None
+        """
+        if parentTransformationMat is None:
+            parent = self.parentComponent
+            if parent is not None and parent.transformationMat is not None:
+                parentTransformationMat = parent.transformationMat
+            else:
+                parentTransformationMat = np.identity(4)
+        changed = self.parentMat is None or (parentTransformationMat is not self.parentMat and
+                                             not np.array_equal(parentTransformationMat, self.parentMat))
+        self._updateTree(parentTransformationMat, changed)
+        if self.subtree_dirty:
+            # a sleeping descendant still waits for its update, keep the path to it flagged
+            self._flagAncestors()
+
+    def _updateTree(self, parentTransformationMat, changed):
+        """
+        In class usage only. Recursive part of update()
+
+        :param changed: whether parentTransformationMat differs from the one the world matrix was computed from
+        :type changed: bool
+        """
+        if self.local_dirty or self.localMat is None:
+            self.localMat = self.localMatrix()
+            self.local_dirty = False
+            changed = True
+        if changed or self.parentMat is None:
+            self.parentMat = parentTransformationMat
+            if self.transformationMat is None:
+                self.transformationMat = parentTransformationMat @ self.localMat
+            else:
+                # in place, the matrix may be a view into a FlatSceneGraph
+                np.matmul(parentTransformationMat, self.localMat, out=self.transformationMat)
+            changed = True
 
+        pending = False
         for c in self.children:
-            c.update(self.transformationMat)
+            if c.sleeping:
+                if changed:
+                    # recompute its world matrix once it wakes up
+                    c.parentMat = None
+                    c.subtree_dirty = True
+                pending = pending or c.subtree_dirty
+            elif changed or c.subtree_dirty:
+                c._updateTree(self.transformationMat, changed)
+                pending = pending or c.subtree_dirty
+        self.subtree_dirty = pending
 
     def rotate(self, degree, axis):
         """
@@ -247,6 +436,7 @@ class Component:
         else:
             self.wAngle = max(min(degree + self.wAngle, self.wRange[1]), self.wRange[0])
             # print(self.wAngle)
+        self.markDirty()
 
     def reset(self, mode="all"):
         """
@@ -262,9 +452,10 @@ class Component:
             self.vAngle = self.default_vAngle
             self.wAngle = self.default_wAngle
         if mode in ["position", "all"]:
-            self.currentPos = self.defaultPos
+            self._moveTo(self.defaultPos)
         if mode in ["scale", "all"]:
             self.currentScaling = copy.deepcopy(self.defaultScaling)
+            self.suffixMat = None
         if mode in ["rotationAxis", "all"]:
             self.setPreRotation(np.identity(4, dtype=np.double))
             self.setU([1, 0, 0])
@@ -272,6 +463,7 @@ class Component:
             self.setW([0, 0, 1])
         if mode in ["color", "all"]:
             self.setCurrentColor(self.default_color)
+        self.markDirty()
 
     def setRotateExtent(self, axis, minDeg=None, maxDeg=None):
         """
@@ -342,7 +534,8 @@ class Component:
             self.vAngle = self.clamp(angle, self.vRange[0], self.vRange[1])
         else:
             self.wAngle = self.clamp(angle, self.wRange[0], self.wRange[1])
-        self.update()
+        self.markDirty()
+        self._updateUnlessBatched()
 
     def setDefaultAngle(self, angle, axis):
         """
@@ -363,6 +556,7 @@ class Component:
         else:
             self.default_wAngle = angle
             self.wAngle = angle
+        self.markDirty()
 
     def setDefaultPosition(self, pos):
         """
@@ -374,7 +568,8 @@ class Component:
         if not isinstance(pos, Point):
             raise TypeError("pos should have type Point")
         self.defaultPos = pos.copy()
-        self.currentPos = copy.deepcopy(self.defaultPos)
+        self._moveTo(self.defaultPos)
+        self.markDirty()
 
     def setDefaultScale(self, scale):
         """
@@ -390,7 +585,9 @@ class Component:
             raise ValueError("Component only accept uniform scaling")"""
         self.defaultScaling = copy.deepcopy(scale)
         self.currentScaling = copy.deepcopy(self.defaultScaling)
-        self.update()
+        self.suffixMat = None
+        self.markDirty()
+        self._updateUnlessBatched()
 
     def setDefaultColor(self, color):
         """
@@ -413,8 +610,22 @@ class Component:
         """
         if not isinstance(pos, Point):
             raise TypeError("pos should have type Point")
-        self.currentPos = pos.copy()
-        self.update()
+        self._moveTo(pos)
+        self.markDirty()
+        self._updateUnlessBatched()
+
+    def _moveTo(self, pos):
+        """
+        In class usage only. Make currentPos a copy of pos. The coordinates of a creature held by a CreatureStore
+        are a view of its row of the store's position array, they are overwritten in place so that the creature
+        stays bound to its row.
+
+        :type pos: Point
+        """
+        if getattr(self, "store", None) is not None:
+            self.currentPos.coords[:] = pos.getCoords()
+        else:
+            self.currentPos = pos.copy()
 
     def setCurrentColor(self, color):
         """
@@ -445,7 +656,9 @@ class Component:
         if min(scale) != max(scale):
             raise ValueError("Component only accept uniform scaling")
         self.currentScaling = copy.deepcopy(scale)
-        self.update()
+        self.suffixMat = None
+        self.markDirty()
+        self._updateUnlessBatched()
 
     def setPreRotation(self, rotation_matrix=None):
         """
@@ -457,6 +670,8 @@ class Component:
         """
         if isinstance(rotation_matrix, np.ndarray):
             self.preRotationMat = rotation_matrix
+            self.suffixMat = None
+            self.markDirty()
 
     def setPostRotation(self, rotation_matrix=None):
         """
@@ -467,6 +682,8 @@ class Component:
         """
         if isinstance(rotation_matrix, np.ndarray):
             self.postRotationMat = rotation_matrix
+            self.prefixMat = None
+            self.markDirty()
 
     def u(self):
         return self.uAxis.copy()
@@ -482,25 +699,30 @@ class Component:
             raise TypeError("axis should have the same size as the current one")
         for i in range(len(u)):
             self.uAxis[i] = u[i]
+        self.markDirty()
 
     def setV(self, v):
         if len(v) != len(self.vAxis):
             raise TypeError("axis should have the same size as the current one")
         for i in range(len(v)):
             self.vAxis[i] = v[i]
+        self.markDirty()
 
     def setW(self, w):
         if len(w) != len(self.wAxis):
             raise TypeError("axis should have the same size as the current one")
         for i in range(len(w)):
             self.wAxis[i] = w[i]
+        self.markDirty()
     
     def setQuaternion(self, q):
         """ sets a quaternion for rotation """
         if not isinstance(q, Quaternion):
             raise TypeError("q must be of type Quaternion")
         self.quat = q
+        self.markDirty()
 
     def clearQuaternion(self):
         """ clears the existing quaternion """
         self.quat = None
+        self.markDirty()
@@ -0,0 +1,144 @@
+"""
+Registry of the components living in the vivarium tank, with stable integer handles.
+Adding, removing and looking up a creature are O(1), and live creatures are kept in one dense list which can be
+iterated directly every tick.
+"""
+
+
+class CreatureRegistry:
+    """
+    Dense list of registered objects plus a slot table for handles.
+
+    A handle packs a slot number with that slot's generation, (generation << 32) | slot. Removing an object bumps the
+    generation of its slot, so handles of removed objects never resolve again, even after the slot is reused.
+    Removal moves the last object into the freed position of the dense list, so `objects` has no holes but its
+    order changes. Do not remove objects while iterating over the registry, iterate over a copy instead.
+    """
+    SLOT_BITS = 32
+    SLOT_MASK = (1 << 32) - 1
+
+    objects = None  # list<Component>, dense, every registered object
+    names = None  # list<str>, dense, name of every registered object, "" if it has none
+
+    generation = None  # list<int>, slot -> current generation
+    dense_index = None  # list<int>, slot -> position in objects, -1 when the slot is free
+    slots = None  # list<int>, dense, position in objects -> slot
+    free_slots = None  # list<int>, stack of unused slots
+    slot_of = None  # dict<int, int>, id(object) -> slot
+
+    def __init__(self, objects=None):
+        """
+        :param objects: list to keep the dense objects in, it must be empty. Pass a list other code already holds \
+            a reference to, e.g. a Component's children, to keep both in sync without copying
+        :type objects: list
+        """
+        if objects is not None and len(objects) > 0:
+            raise ValueError("the dense object list of a new registry should be empty")
+        self.objects = objects if objects is not None else []
+        self.names = []
+        self.generation = []
+        self.dense_index = []
+        self.slots = []
+        self.free_slots = []
+        self.slot_of = dict()
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __contains__(self, obj):
+        return id(obj) in self.slot_of
+
+    def add(self, obj, name=""):
+        """
+        Register an object at the end of the dense list
+
+        :param obj: the object to register
+        :param name: name of the object, "" for none
+        :type name: str
+        :return: handle of the object, unchanged if it was already registered
+        :rtype: int
+        """
+        if id(obj) in self.slot_of:
+            return self.handleOf(obj)
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.generation)
+            self.generation.append(0)
+            self.dense_index.append(-1)
+
+        self.dense_index[slot] = len(self.objects)
+        self.objects.append(obj)
+        self.names.append(name)
+        self.slots.append(slot)
+        self.slot_of[id(obj)] = slot
+        return (self.generation[slot] << self.SLOT_BITS) | slot
+
+    def remove(self, obj):
+        """
+        Unregister an object, in O(1). The last object of the dense list takes its place.
+
+        :param obj: the object to remove, or its handle
+        :return: the removed object, None if it was not registered or the handle is stale
+        """
+        if isinstance(obj, int):
+            obj = self.get(obj)
+        slot = self.slot_of.pop(id(obj), None) if obj is not None else None
+        if slot is None:
+            return None
+
+        i = self.dense_index[slot]
+        last = len(self.objects) - 1
+        if i != last:
+            self.objects[i] = self.objects[last]
+            self.names[i] = self.names[last]
+            self.slots[i] = self.slots[last]
+            self.dense_index[self.slots[i]] = i
+        self.objects.pop()
+        self.names.pop()
+        self.slots.pop()
+
+        self.dense_index[slot] = -1
+        self.generation[slot] += 1
+        self.free_slots.append(slot)
+        return obj
+
+    def get(self, handle):
+        """
+        Object a handle refers to
+
+        :type handle: int
+        :return: the object, or None if it has been removed since the handle was issued
+        """
+        slot = handle & self.SLOT_MASK
+        if slot >= len(self.generation) or self.generation[slot] != handle >> self.SLOT_BITS:
+            return None
+        i = self.dense_index[slot]
+        return self.objects[i] if i >= 0 else None
+
+    def handleOf(self, obj):
+        """
+        :return: current handle of a registered object, -1 if it is not registered
+        :rtype: int
+        """
+        slot = self.slot_of.get(id(obj))
+        if slot is None:
+            return -1
+        return (self.generation[slot] << self.SLOT_BITS) | slot
+
+    def nameOf(self, obj):
+        """
+        :return: name an object was registered with, "" if it has none or is not registered
+        :rtype: str
+        """
+        slot = self.slot_of.get(id(obj))
+        return self.names[self.dense_index[slot]] if slot is not None else ""
+
+    def setName(self, obj, name):
+        """
+        Change the name of a registered object
+        """
+        self.names[self.dense_index[self.slot_of[id(obj)]]] = name
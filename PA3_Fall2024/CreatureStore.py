@@ -0,0 +1,207 @@
+"""
+Struct-of-arrays storage for the simulated state of every creature in the vivarium.
+Row i of every array belongs to the creature whose store_index is i, so vectorized passes can work on the whole
+population at once instead of reading scattered attributes creature by creature.
+"""
+
+import numpy as np
+
+
+class CreatureStore:
+    """
+    Central NumPy-backed creature state, owned by Vivarium.
+
+    Arrays are allocated with spare capacity and grown by doubling. Only the first `count` rows are live,
+    use the positions()/velocities()/radii()/speciesIds()/wallHits() accessors to get views over them.
+    A creature's currentPos coords is a view into its row of `position`, so writing to the array moves the creature.
+    Views handed out before a creature is added or removed may point to stale memory, do not keep them across ticks.
+    """
+    capacity = 0
+    count = 0
+    revision = 0  # bumped whenever a row starts holding a different creature, cached row indices are then stale
+
+    position = None  # numpy.ndarray(capacity, 3)
+    velocity = None  # numpy.ndarray(capacity, 3)
+    radius = None  # numpy.ndarray(capacity,)
+    species = None  # numpy.ndarray(capacity,)
+    wall_hits = None  # numpy.ndarray(capacity,), bitmask of tank walls touched during the last containment pass
+    previous = None  # numpy.ndarray(capacity, 3), positions at the start of the current tick
+    lod_priority = None  # numpy.ndarray(capacity,), copy of every creature's lod_priority
+    lod_pending = None  # numpy.ndarray(capacity,), ticks since the creature's last animationUpdate/stepForward
+    asleep = None  # numpy.ndarray(capacity,) bool, see SleepSystem
+    idle_ticks = None  # numpy.ndarray(capacity,), ticks the creature has been still for
+    joint_activity = None  # numpy.ndarray(capacity,), creature's jointActivity() as of its last update
+
+    # every per-creature array, with its trailing shape and dtype
+    fields = (
+        ("position", (3,), np.float64),
+        ("velocity", (3,), np.float64),
+        ("radius", (), np.float64),
+        ("species", (), np.int32),
+        ("wall_hits", (), np.uint8),
+        ("previous", (3,), np.float64),
+        ("lod_priority", (), np.int8),
+        ("lod_pending", (), np.int32),
+        ("asleep", (), np.bool_),
+        ("idle_ticks", (), np.int32),
+        ("joint_activity", (), np.float64),
+    )
+
+    objects = None  # list<EnvironmentObject>, row -> creature
+
+    def __init__(self, capacity=16):
+        """
+        :param capacity: number of rows to allocate up front
+        :type capacity: int
+        """
+        self.capacity = max(1, int(capacity))
+        self.count = 0
+        for name, shape, dtype in self.fields:
+            setattr(self, name, np.zeros((self.capacity,) + shape, dtype=dtype))
+        self.objects = []
+
+    def __len__(self):
+        return self.count
+
+    def positions(self):
+        return self.position[:self.count]
+
+    def velocities(self):
+        return self.velocity[:self.count]
+
+    def radii(self):
+        return self.radius[:self.count]
+
+    def speciesIds(self):
+        return self.species[:self.count]
+
+    def wallHits(self):
+        return self.wall_hits[:self.count]
+
+    def previousPositions(self):
+        return self.previous[:self.count]
+
+    def lodPriorities(self):
+        return self.lod_priority[:self.count]
+
+    def lodPending(self):
+        return self.lod_pending[:self.count]
+
+    def sleepingMask(self):
+        return self.asleep[:self.count]
+
+    def idleTicks(self):
+        return self.idle_ticks[:self.count]
+
+    def jointActivities(self):
+        return self.joint_activity[:self.count]
+
+    def savePrevious(self):
+        """
+        Remember the current positions as the previous simulation state, used for render interpolation
+        """
+        self.previous[:self.count] = self.position[:self.count]
+
+    def rebind(self):
+        """
+        Point every creature's currentPos back at its row of the position array
+        """
+        for i in range(self.count):
+            self._bind(i)
+
+    def add(self, obj):
+        """
+        Append a creature to the store. Its current position, bound_radius and species_id are copied in,
+        and its currentPos is rebound to the new row.
+
+        :param obj: the creature to add
+        :type obj: EnvironmentObject
+        :return: the row index assigned to this creature
+        :rtype: int
+        """
+        if obj.store is self:
+            return obj.store_index
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+
+        i = self.count
+        for name, _, _ in self.fields:
+            getattr(self, name)[i] = 0
+        self.position[i] = obj.currentPos.getCoords()
+        self.previous[i] = self.position[i]
+        self.radius[i] = obj.bound_radius if obj.bound_radius is not None else 0.0
+        self.species[i] = obj.species_id
+        self.lod_priority[i] = obj.lod_priority
+        self.joint_activity[i] = obj.jointActivity()
+        self.objects.append(obj)
+        self.count += 1
+        self.revision += 1
+
+        obj.store = self
+        self._bind(i)
+        return i
+
+    def remove(self, obj):
+        """
+        Remove a creature from the store. The last row is moved into the freed slot so the arrays stay dense.
+        The removed creature keeps a private copy of its last position.
+
+        :param obj: the creature to remove
+        :type obj: EnvironmentObject
+        """
+        if obj.store is not self:
+            return
+        i = obj.store_index
+        last = self.count - 1
+
+        obj.currentPos.setCoords(self.position[i].copy())
+        obj.sleeping = False
+        obj.store = None
+        obj.store_index = -1
+
+        if i != last:
+            for name, _, _ in self.fields:
+                array = getattr(self, name)
+                array[i] = array[last]
+            self.objects[i] = self.objects[last]
+            self._bind(i)
+        self.objects.pop()
+        self.count -= 1
+        self.revision += 1
+
+    def reorder(self, objects):
+        """
+        Permute the rows so that row i belongs to objects[i]
+
+        :param objects: every creature of the store, in the new order
+        :type objects: list<EnvironmentObject>
+        """
+        if len(objects) != self.count or any(o.store is not self for o in objects):
+            raise ValueError("reorder needs every creature of this store exactly once")
+        permutation = np.array([o.store_index for o in objects], dtype=np.int64)
+        for name, _, _ in self.fields:
+            array = getattr(self, name)
+            array[:self.count] = array[permutation]
+        self.objects = list(objects)
+        self.revision += 1
+        self.rebind()
+
+    def _grow(self, capacity):
+        """
+        Reallocate every array with a larger capacity and rebind all creatures to their new rows
+        """
+        for name, shape, dtype in self.fields:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + shape, dtype=dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+        self.rebind()
+
+    def _bind(self, i):
+        """
+        In class usage only. Point creature i's index and currentPos at row i
+        """
+        obj = self.objects[i]
+        obj.store_index = i
+        obj.currentPos.coords = self.position[i]
@@ -21,3 +21,24 @@ class Displayable:
 
     def initialize(self):
         raise NotImplementedError
+
+    def modelMatrix(self, transformationMat):
+        """
+        Model matrix to draw with, given the world matrix of the owning Component
+
+        :type transformationMat: numpy.ndarray(4, 4)
+        :rtype: numpy.ndarray(4, 4)
+        """
+        return transformationMat
+
+    def acquire(self):
+        """
+        Take back the resources given up by release(), called when the owning Component returns to the scene
+        """
+        pass
+
+    def release(self):
+        """
+        Free resources shared with other displayables, called when the owning Component leaves the scene
+        """
+        pass
@@ -10,7 +10,7 @@ Modified by Daniel Scrivener 07/22
 from random import random
 from Point import Point
 from Displayable import Displayable
-from GLBuffer import VAO, VBO, EBO
+from SharedMesh import SharedMesh
 import numpy as np
 import ColorType
 from collada import *
@@ -42,74 +42,75 @@ except ImportError:
 
 
 class DisplayableMesh(Displayable):
-    vao = None
-    vbo = None
-    ebo = None
+    """
+    One drawn instance of a SharedMesh. The vertex data and GPU buffers belong to the shared mesh, this instance
+    only holds its scale, applied through the model matrix, and its color, applied through the currentColor uniform.
+    """
+    mesh = None  # SharedMesh drawn by this instance, None after release()
+    key = None  # shape identifier mesh is shared under
     shaderProg = None
 
-    vertices = None  # array to store vertex information
-    indices = None  # stores triangle indices to vertices
+    vertices = None  # array to store vertex information, shared and read only
+    indices = None  # stores triangle indices to vertices, shared and read only
 
+    scale = None  # numpy.ndarray(3,), scale factors applied to each vertex
+    scaleMat = None  # numpy.ndarray(4, 4), scale as a matrix, right-multiplied into the model matrix
     defaultColor = None
 
-    def __init__(self, shaderProg, scale, vertexData, indexData, color=ColorType.BLUE):
+    def __init__(self, shaderProg, scale, vertexData, indexData, color=ColorType.BLUE, key=None):
         """
-        :param shaderProg: compiled shader program
+        :param shaderProg: compiled shader program. Pass None to build the mesh without any GPU buffers (headless)
         :type shaderProg: GLProgram
         :param scale: set of three scale factors to be applied to each vertex
         :type scale: list or tuple
-        :param filename: .dae file to import
-        :type filename: string
-        :param color: vertex color to be applied uniformly
+        :param vertexData: unscaled vertices, 11 floats each. Not modified, and only read if key is not cached yet
+        :type vertexData: numpy.ndarray
+        :param indexData: triangle indices to vertexData
+        :type indexData: numpy.ndarray
+        :param color: color to be applied uniformly
         :type color: ColorType
+        :param key: shape identifier the vertex data is shared under, e.g. ("sphere", True). None gives this \
+            instance a mesh of its own
+        :type key: hashable
         """
         super(DisplayableMesh, self).__init__()
         assert(len(scale) == 3)
 
         self.defaultColor = np.array(color.getRGB())
+        self.scale = np.array(scale, dtype=float)
+        self.scaleMat = np.diag((self.scale[0], self.scale[1], self.scale[2], 1.0))
 
         self.shaderProg = shaderProg
-        self.shaderProg.use()
+        self.key = key
+        self.mesh = SharedMesh.acquire(key, shaderProg, vertexData, indexData)
+        self.vertices = self.mesh.vertices
+        self.indices = self.mesh.indices
 
-        self.vao = VAO()
-        self.vbo = VBO()  # vbo can only be initiate with glProgram activated
-        self.ebo = EBO()
-
-        self.indices = indexData
-        self.vertices = vertexData
-
-        for i in range(len(self.vertices) // 11):
-            i = i * 11
-            self.vertices[i] = self.vertices[i] * scale[0]
-            self.vertices[i + 1] = self.vertices[i + 1] * scale[1]
-            self.vertices[i + 2] = self.vertices[i + 2] * scale[2]
-            self.vertices[i + 5] = self.defaultColor[0]
-            self.vertices[i + 6] = self.defaultColor[1]
-            self.vertices[i + 7] = self.defaultColor[2]
+    def modelMatrix(self, transformationMat):
+        return transformationMat @ self.scaleMat
 
     def draw(self):
-        self.vao.bind()
-        self.ebo.draw()
-        self.vao.unbind()
+        self.mesh.draw()
 
     def initialize(self):
         """
-        Remember to bind VAO before this initialization. If VAO is not bind, program might throw an error
-        in systems that don't enable a default VAO after GLProgram compilation
+        Upload the shared mesh if that was not done yet. Remember to bind VAO before this initialization.
+        If VAO is not bind, program might throw an error in systems that don't enable a default VAO after GLProgram
+        compilation
         """
-        self.vao.bind()
-        self.vbo.setBuffer(self.vertices, 11)
-        self.ebo.setBuffer(self.indices)
-        
-        self.vbo.setAttribPointer(self.shaderProg.getAttribLocation("vertexPos"),
-                                  stride=11, offset=0, attribSize=3)
-        self.vbo.setAttribPointer(self.shaderProg.getAttribLocation("vertexNormal"),
-                                  stride=11, offset=3, attribSize=3)
-        self.vbo.setAttribPointer(self.shaderProg.getAttribLocation("vertexColor"),
-                                  stride=11, offset=6, attribSize=3)
-        self.vbo.setAttribPointer(self.shaderProg.getAttribLocation("vertexTexture"),
-                                  stride=11, offset=9, attribSize=2)
-
-
-        self.vao.unbind()
+        self.mesh.initialize()
 
+    def acquire(self):
+        """
+        Take the shared mesh back after release(), e.g. when the owning Component returns to the scene
+        """
+        if self.mesh is None:
+            self.mesh = SharedMesh.acquire(self.key, self.shaderProg, self.vertices, self.indices)
+
+    def release(self):
+        """
+        Stop using the shared mesh, its GPU buffers are freed once no instance uses it anymore
+        """
+        if self.mesh is not None:
+            self.mesh.release()
+            self.mesh = None
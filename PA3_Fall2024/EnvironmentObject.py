@@ -12,6 +12,7 @@ import math
 from Point import Point
 from Quaternion import Quaternion
 import numpy as np
+from EventQueue import EventQueue
 
 
 class EnvironmentObject:
@@ -24,20 +25,120 @@ class EnvironmentObject:
 
     bound_radius = None
     bound_center = Point((0,0,0))
+    translation_speed = None  # initial swimming speed, in tank units per second
+
+    store = None  # CreatureStore this object's simulation state lives in
+    store_index = -1  # row of this object in store
+    registry = None  # CreatureRegistry of the vivarium this object lives in
+    vivarium = None  # Vivarium this object lives in, None outside a tank
+    lod_priority = 0  # levels of simulation detail above what distance alone would give, see SimulationLOD
+    lod_steps = 1  # ticks the current animationUpdate/stepForward call stands for, more than 1 when catching up
+    previous_pose = None  # list<tuple<Component, float, float, float>>, u/v/w angles of every part before a tick
+    pose_tick = -1  # tick previous_pose was saved at
+
+    @property
+    def position(self):
+        """
+        View of this object's row in the vivarium's position array, or its own coords when not in a store
+        """
+        if self.store is None:
+            return self.currentPos.getCoords()
+        return self.store.position[self.store_index]
+
+    @property
+    def velocity(self):
+        """
+        View of this object's row in the vivarium's velocity array, or None when not in a store
+        """
+        if self.store is None:
+            return None
+        return self.store.velocity[self.store_index]
+
+    def jointActivity(self):
+        """
+        How fast this object's joints are animating, the largest rotation_speed step in degrees per tick.
+        Used by SleepSystem to tell creatures at rest.
+
+        :rtype: float
+        """
+        speed = getattr(self, "rotation_speed", None)
+        if not speed:
+            return 0.0
+        return float(np.abs(np.asarray(speed, dtype=np.float64)).max())
+
+    def savePose(self, tick):
+        """
+        Remember the joint angles of this object and its animated parts before a tick changes them,
+        used for render interpolation
+
+        :param tick: number of the tick about to run
+        :type tick: int
+        """
+        parts = [self] + list(getattr(self, "components", None) or [])
+        self.previous_pose = [(c, c.uAngle, c.vAngle, c.wAngle) for c in parts]
+        self.pose_tick = tick
+
+    def blendPose(self, alpha):
+        """
+        Put every part saved by savePose() alpha of the way from its previous to its current angles,
+        the short way around the circle so that a heading wrapping at 360 does not spin
+
+        :param alpha: blend factor in [0, 1]
+        :type alpha: float
+        :return: the current angles, to be put back with restorePose()
+        :rtype: list<tuple<Component, float, float, float>>
+        """
+        current = []
+        for c, u, v, w in self.previous_pose:
+            current.append((c, c.uAngle, c.vAngle, c.wAngle))
+            c.uAngle, c.vAngle, c.wAngle = [old + alpha * ((new - old + 180) % 360 - 180)
+                                             for old, new in ((u, c.uAngle), (v, c.vAngle), (w, c.wAngle))]
+            c.markDirty()
+        return current
+
+    @staticmethod
+    def restorePose(pose):
+        """
+        Put back the angles returned by blendPose()
+        """
+        for c, u, v, w in pose:
+            c.uAngle, c.vAngle, c.wAngle = u, v, w
+            c.markDirty()
 
     def addCollisionObj(self, a):
         """
         Add an environment object for this creature to interact with
         """
         if isinstance(a, EnvironmentObject):
-            self.env_obj_list.append(a)
+            if self.vivarium is not None:
+                # through the vivarium, so that a gets its store row, names and place in the scene graph
+                if a in self.vivarium.registry or a in self.vivarium.pending_adds:
+                    return
+                if self.vivarium.stepping:
+                    # rows must not move while creatures step, commitEvents adds it
+                    self.vivarium.pending_adds.append(a)
+                else:
+                    self.vivarium.addNewObjInTank(a)
+            else:
+                self.env_obj_list.append(a)
 
     def rmCollisionObj(self, a):
         """
         Remove an environment object for this creature to interact with
         """
         if isinstance(a, EnvironmentObject):
-            self.env_obj_list.remove(a)
+            if self.vivarium is not None:
+                if a in self.vivarium.pending_adds:
+                    self.vivarium.pending_adds.remove(a)
+                elif self.vivarium.stepping:
+                    # rows must not move while creatures step, a is eaten with this tick's other prey
+                    if a in self.vivarium.registry:
+                        self.vivarium.events.push(EventQueue.EAT, self.store_index, a.store_index)
+                else:
+                    # O(1) swap-remove from the registry, the store and the name maps
+                    self.vivarium.delObjInTank(a)
+            else:
+                self.env_obj_list.remove(a)
 
     def animationUpdate(self):
         """
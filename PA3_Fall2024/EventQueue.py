@@ -0,0 +1,113 @@
+"""
+Per-tick buffer of interaction events between creatures.
+Detection passes and creatures' stepForward only record what happened; Vivarium applies the consequences in one
+commit phase once every creature has stepped, so no list is modified while it is being iterated.
+"""
+
+import numpy as np
+
+
+class EventQueue:
+    """
+    (kind, a, b, data) records kept in preallocated arrays, reused from tick to tick.
+
+    a and b are CreatureStore rows as of the start of the commit phase, b is -1 when the event only involves one
+    creature. data is one float whose meaning depends on the kind, see the kind constants.
+    The buffer grows by doubling when a tick produces more events than its capacity.
+    """
+    EAT = 0  # a ate b, data is the time into the tick they touched at, in seconds
+    BOUNCE = 1  # a and b bumped into each other, data is the time into the tick they touched at, in seconds
+    WALL = 2  # a touched the tank walls, b is -1, data is the Vivarium.WALL_* bitmask
+    FOOD = 3  # a ate food particle b, b is the FoodPool slot, data is unused
+    KIND_NAMES = ("eat", "bounce", "wall", "food")
+
+    capacity = 0
+    count = 0
+    kind = None  # numpy.ndarray(capacity,) uint8
+    a = None  # numpy.ndarray(capacity,) int64
+    b = None  # numpy.ndarray(capacity,) int64
+    data = None  # numpy.ndarray(capacity,) float64
+
+    def __init__(self, capacity=256):
+        """
+        :param capacity: number of events to allocate room for up front
+        :type capacity: int
+        """
+        self.capacity = max(1, int(capacity))
+        self.count = 0
+        self.kind = np.zeros(self.capacity, dtype=np.uint8)
+        self.a = np.zeros(self.capacity, dtype=np.int64)
+        self.b = np.zeros(self.capacity, dtype=np.int64)
+        self.data = np.zeros(self.capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """
+        Forget every event, the arrays are kept for the next tick
+        """
+        self.count = 0
+
+    def push(self, kind, a, b=-1, data=0.0):
+        """
+        Record a single event, e.g. from a creature's stepForward
+        """
+        self.pushMany(kind, [a], [b], [data])
+
+    def pushMany(self, kind, a, b=None, data=None):
+        """
+        Record a batch of events of the same kind
+
+        :param kind: one of the kind constants
+        :type kind: int
+        :param a: first creature of every event
+        :type a: numpy.ndarray(K,)
+        :param b: second participant of every event, -1 for all if None
+        :type b: numpy.ndarray(K,)
+        :param data: payload of every event, 0 for all if None
+        :type data: numpy.ndarray(K,)
+        """
+        k = len(a)
+        if k == 0:
+            return
+        if self.count + k > self.capacity:
+            self._grow(max(self.capacity * 2, self.count + k))
+        end = self.count + k
+        self.kind[self.count:end] = kind
+        self.a[self.count:end] = a
+        self.b[self.count:end] = -1 if b is None else b
+        self.data[self.count:end] = 0.0 if data is None else data
+        self.count = end
+
+    def select(self, kind):
+        """
+        Events of one kind in deterministic order, sorted by a then b whatever order they were pushed in
+
+        :return: (a, b, data) arrays
+        :rtype: tuple<numpy.ndarray, numpy.ndarray, numpy.ndarray>
+        """
+        mask = self.kind[:self.count] == kind
+        a, b, data = self.a[:self.count][mask], self.b[:self.count][mask], self.data[:self.count][mask]
+        order = np.lexsort((b, a))
+        return a[order], b[order], data[order]
+
+    def counts(self):
+        """
+        Number of events of every kind recorded since the last clear()
+
+        :rtype: dict<str, int>
+        """
+        per_kind = np.bincount(self.kind[:self.count], minlength=len(self.KIND_NAMES))
+        return {name: int(per_kind[k]) for k, name in enumerate(self.KIND_NAMES)}
+
+    def _grow(self, capacity):
+        """
+        In class usage only. Reallocate the arrays with a larger capacity, keeping the recorded events
+        """
+        for name in ("kind", "a", "b", "data"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
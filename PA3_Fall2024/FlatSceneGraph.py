@@ -0,0 +1,285 @@
+"""
+A Component hierarchy compiled into flat arrays, so world matrices are computed without Python recursion.
+Nodes are stored breadth first, which puts every depth of the tree in one contiguous range of rows, and each depth
+is evaluated with a single batched matrix product against the world matrices of the depth above.
+"""
+
+import numpy as np
+
+from Component import Component
+
+
+class FlatSceneGraph:
+    """
+    parent, local and world arrays over every Component below a root.
+
+    After compile(), every node's transformationMat is a view into `world`, so drawing reads the batched result
+    directly. Only local matrices of nodes flagged with markDirty() are rebuilt, the rest of evaluate() is one
+    np.matmul per depth. Subtrees of sleeping nodes are skipped, like update() skips them: their matrices keep
+    their last values and their flagged local matrices wait until they wake up.
+    The graph has to be compiled again when the tree changes shape, see isStale(), unless the change went through
+    appendSubtree() or removeSubtree(). Those patch the arrays in place: appended subtrees take rows after the
+    compiled ones and removed subtrees leave unused rows behind, until both are worth a compile() to pack them.
+    """
+    nodes = None  # list<Component>, breadth first, nodes[0] is the root, None for the rows of removed nodes
+    count = 0  # rows in use, compiled, appended or removed
+    compiled = 0  # rows laid out by compile(), the ones after them were appended
+    removed = 0  # rows of removed nodes
+    parent = None  # numpy.ndarray(capacity,), row of every node's parent, -1 for the root
+    depth = None  # numpy.ndarray(capacity,), depth of every node below the root, -1 for removed rows
+    levels = None  # list<tuple<int, int, numpy.ndarray>>, (first row, end row, parent rows) of every compiled depth
+    appended = None  # list<tuple<numpy.ndarray, numpy.ndarray>>, (rows, parent rows) of every appended depth
+    local = None  # numpy.ndarray(capacity, 4, 4), every node's transformation relative to its parent
+    world = None  # numpy.ndarray(capacity, 4, 4), every node's transformationMat
+    dirty = None  # list<int>, rows whose local matrix changed since the last evaluate(), filled by markDirty()
+    tree_version = -1  # Component.tree_version the graph was compiled at
+
+    def __init__(self, root=None):
+        """
+        :param root: component to compile right away, None to leave the graph empty
+        :type root: Component
+        """
+        self.nodes = []
+        self.count = self.compiled = self.removed = 0
+        self._allocate(0)
+        self.levels = []
+        self.appended = []
+        self.dirty = []
+        if root is not None:
+            self.compile(root)
+
+    def __len__(self):
+        return self.count - self.removed
+
+    def isStale(self):
+        """
+        Whether some children list changed since the graph was compiled
+
+        :rtype: bool
+        """
+        return self.tree_version != Component.tree_version
+
+    def compile(self, root):
+        """
+        Flatten the tree below root, taking over the transformation matrices of all its nodes
+
+        :param root: top of the hierarchy
+        :type root: Component
+        """
+        for node in self.nodes:
+            if node is not None:
+                node.scene = None
+                node.scene_index = -1
+
+        nodes, parent, depth = self._layout(root, -1, 0, 0)
+        n = len(nodes)
+        self.nodes = []
+        self.count = self.removed = 0
+        self._allocate(n)
+        self._adopt(nodes, parent, depth)
+        self.compiled = n
+        depth = self.depth[:n]
+        bounds = np.flatnonzero(np.diff(depth)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [n]))
+        self.levels = [(int(s), int(e), self.parent[s:e]) for s, e in zip(starts[1:], ends[1:])]
+        self.appended = []
+        self.dirty = []
+        self.tree_version = Component.tree_version
+
+    def appendSubtree(self, node):
+        """
+        Give rows to a subtree which was just attached to a node of the graph, instead of compiling it again.
+        Call it in place of bumping Component.tree_version, a graph which was stale already is left for compile().
+
+        :param node: top of the new subtree, its parentComponent is in the graph
+        :type node: Component
+        """
+        current = not self.isStale()
+        Component.tree_version += 1
+        top = node.parentComponent
+        if not current or top is None or top.scene is not self:
+            return
+        row = top.scene_index
+        nodes, parent, depth = self._layout(node, row, self.count, int(self.depth[row]) + 1)
+        if self.count + len(nodes) > len(self.parent):
+            self._allocate(max(2 * len(self.parent), self.count + len(nodes)))
+        self._adopt(nodes, parent, depth)
+        self._settle()
+
+    def removeSubtree(self, node):
+        """
+        Give up the rows of a subtree which was just detached from the graph, instead of compiling it again.
+        Call it in place of bumping Component.tree_version, a graph which was stale already is left for compile().
+
+        :param node: top of the removed subtree
+        :type node: Component
+        """
+        current = not self.isStale()
+        Component.tree_version += 1
+        if not current or node.scene is not self:
+            return
+        stack = [node]
+        while stack:
+            c = stack.pop()
+            stack.extend(c.children)
+            k = c.scene_index
+            # keep the last matrices, the row is evaluated for nobody from now on
+            c.transformationMat = self.world[k].copy()
+            c.parentMat = None
+            c.scene = None
+            c.scene_index = -1
+            self.nodes[k] = None
+            self.depth[k] = -1
+            self.removed += 1
+        self._settle()
+
+    def evaluate(self, parentTransformationMat=None, sleeping=None):
+        """
+        Rebuild the flagged local matrices, then every world matrix depth by depth
+
+        :param parentTransformationMat: world matrix of the root's parent, identity if None
+        :type parentTransformationMat: numpy.ndarray(4, 4)
+        :param sleeping: rows of sleeping nodes, whose subtrees are left as they are
+        :type sleeping: list<int>
+        """
+        if self.count == 0:
+            return
+        if self.appended is None:
+            self._sortAppended()
+        depths = max(len(self.levels), len(self.appended))
+        skipped = None
+        if sleeping is not None and len(sleeping) > 0:
+            skipped = np.zeros(self.count, dtype=bool)
+            skipped[sleeping] = True
+            for d in range(depths):
+                if d < len(self.levels):
+                    start, end, parents = self.levels[d]
+                    skipped[start:end] |= skipped[parents]
+                if d < len(self.appended):
+                    rows, parents = self.appended[d]
+                    skipped[rows] |= skipped[parents]
+
+        if self.dirty:
+            pending = []
+            for k in set(self.dirty):
+                node = self.nodes[k]
+                if node is None:
+                    # removed since it was flagged
+                    continue
+                if skipped is not None and skipped[k]:
+                    pending.append(k)
+                    continue
+                node.localMat = node.localMatrix()
+                node.local_dirty = False
+                self.local[k] = node.localMat
+            self.dirty[:] = pending
+
+        if parentTransformationMat is None:
+            parentTransformationMat = np.identity(4)
+        self.nodes[0].parentMat = parentTransformationMat
+        if skipped is not None and skipped[0]:
+            return
+        np.matmul(parentTransformationMat, self.local[0], out=self.world[0])
+        # rows of removed nodes are evaluated along with their depth, nobody reads them
+        for d in range(depths):
+            if d < len(self.levels):
+                start, end, parents = self.levels[d]
+                if skipped is None or not skipped[start:end].any():
+                    np.matmul(self.world[parents], self.local[start:end], out=self.world[start:end])
+                else:
+                    rows = start + np.flatnonzero(~skipped[start:end])
+                    self.world[rows] = np.matmul(self.world[self.parent[rows]], self.local[rows])
+            if d < len(self.appended):
+                rows, parents = self.appended[d]
+                if skipped is not None:
+                    awake = ~skipped[rows]
+                    rows, parents = rows[awake], parents[awake]
+                self.world[rows] = np.matmul(self.world[parents], self.local[rows])
+
+    @staticmethod
+    def _layout(root, parentRow, offset, rootDepth):
+        """
+        In class usage only. Nodes of the tree below root in breadth first order, with the row of their parent and
+        their depth, for rows starting at offset
+        """
+        nodes = [root]
+        parent = [parentRow]
+        depth = [rootDepth]
+        for k, node in enumerate(nodes):
+            for c in node.children:
+                nodes.append(c)
+                parent.append(offset + k)
+                depth.append(depth[k] + 1)
+        return nodes, parent, depth
+
+    def _allocate(self, capacity):
+        """
+        In class usage only. Arrays for capacity rows keeping the rows in use, every node's matrices are bound to
+        the new storage
+        """
+        parent = np.full(capacity, -1, dtype=np.int64)
+        depth = np.full(capacity, -1, dtype=np.int64)
+        local = np.zeros((capacity, 4, 4))
+        world = np.zeros((capacity, 4, 4))
+        n = self.count
+        if n > 0:
+            parent[:n] = self.parent[:n]
+            depth[:n] = self.depth[:n]
+            local[:n] = self.local[:n]
+            world[:n] = self.world[:n]
+        self.parent, self.depth, self.local, self.world = parent, depth, local, world
+        for k, node in enumerate(self.nodes):
+            if node is None:
+                continue
+            node.transformationMat = world[k]
+            if k > 0:
+                node.parentMat = world[parent[k]]
+        if self.levels:
+            self.levels = [(s, e, self.parent[s:e]) for s, e, _ in self.levels]
+
+    def _adopt(self, nodes, parent, depth):
+        """
+        In class usage only. Take over the nodes laid out by _layout() in the rows following the ones in use
+        """
+        start = self.count
+        end = start + len(nodes)
+        self.parent[start:end] = parent
+        self.depth[start:end] = depth
+        self.nodes.extend(nodes)
+        self.count = end
+        for k, node in enumerate(nodes, start):
+            if node.local_dirty or node.localMat is None:
+                node.localMat = node.localMatrix()
+                node.local_dirty = False
+            self.local[k] = node.localMat
+            if node.transformationMat is not None:
+                self.world[k] = node.transformationMat
+            node.transformationMat = self.world[k]
+            node.scene = self
+            node.scene_index = k
+        for k in range(max(start, 1), end):
+            self.nodes[k].parentMat = self.world[self.parent[k]]
+
+    def _settle(self):
+        """
+        In class usage only. Keep the patched graph current, unless appended and removed rows are half of it and
+        the next update should compile it again
+        """
+        self.appended = None
+        if 2 * (self.count - self.compiled + self.removed) <= self.count:
+            self.tree_version = Component.tree_version
+
+    def _sortAppended(self):
+        """
+        In class usage only. Group the live appended rows by depth
+        """
+        depth = self.depth[self.compiled:self.count]
+        rows = self.compiled + np.flatnonzero(depth > 0)
+        self.appended = []
+        if len(rows) == 0:
+            return
+        rows = rows[np.argsort(self.depth[rows], kind="stable")]
+        for d in range(1, int(self.depth[rows[-1]]) + 1):
+            r = rows[self.depth[rows] == d]
+            self.appended.append((r, self.parent[r]))
@@ -0,0 +1,154 @@
+"""
+Food chunks for the vivarium, stored as a fixed capacity pool of NumPy arrays instead of one Component per chunk.
+Food sinks slowly to the tank floor, stays there once it settled, and is eaten by the first creature that touches it.
+"""
+
+import numpy as np
+
+from Component import Component
+from DisplayableMesh import DisplayableMesh
+from GLUtility import GLUtility
+from Point import Point
+from Shapes import Sphere
+import ColorType
+
+
+class FoodPool(Component):
+    """
+    Fixed capacity pool of food particles.
+
+    Slots are handed out and returned through a free list, so dropping food never allocates. Settled particles rest
+    on the floor and are skipped by integration. The whole pool is drawn with a single low poly sphere mesh,
+    moved to every live particle in turn.
+    """
+    capacity = 0
+    food_radius = 0.04
+    sink_speed = 0.25  # tank units per second
+    floor = 0.0  # height particles settle at
+
+    position = None  # numpy.ndarray(capacity, 3)
+    velocity = None  # numpy.ndarray(capacity, 3)
+    alive = None  # numpy.ndarray(capacity,) bool
+    settled = None  # numpy.ndarray(capacity,) bool
+
+    free = None  # numpy.ndarray(capacity,), stack of unused slots, free[:free_count] are valid
+    free_count = 0
+
+    def __init__(self, shaderProg, tank_dimensions, capacity=256, food_radius=0.04, sink_speed=0.25):
+        """
+        :param shaderProg: compiled shader program, None when running headless
+        :type shaderProg: GLProgram
+        :param tank_dimensions: size of the tank along x, y and z
+        :type tank_dimensions: list<float>
+        :param capacity: most food particles alive at once
+        :type capacity: int
+        :param food_radius: radius of one food particle
+        :type food_radius: float
+        :param sink_speed: how fast food drops to the floor, tank units per second
+        :type sink_speed: float
+        """
+        mesh = DisplayableMesh(shaderProg, [food_radius] * 3, Sphere.verticesLP, Sphere.indicesLP, ColorType.ORANGE,
+                               ("sphere", True))
+        super(FoodPool, self).__init__(Point((0, 0, 0)), mesh)
+        self.capacity = int(capacity)
+        self.food_radius = food_radius
+        self.sink_speed = sink_speed
+        self.floor = -tank_dimensions[1] / 2 + food_radius
+
+        self.position = np.zeros((self.capacity, 3))
+        self.velocity = np.zeros((self.capacity, 3))
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self.settled = np.zeros(self.capacity, dtype=bool)
+        # pop from the end, so slot 0 is handed out first
+        self.free = np.arange(self.capacity - 1, -1, -1, dtype=np.int64)
+        self.free_count = self.capacity
+
+    def __len__(self):
+        return self.capacity - self.free_count
+
+    def spawn(self, position):
+        """
+        Drop a food particle at position
+
+        :param position: where the particle appears
+        :type position: list<float> or numpy.ndarray
+        :return: slot of the new particle, or -1 if the pool is full
+        :rtype: int
+        """
+        if self.free_count == 0:
+            return -1
+        self.free_count -= 1
+        i = int(self.free[self.free_count])
+        self.position[i] = position
+        self.velocity[i] = (0, -self.sink_speed, 0)
+        self.alive[i] = True
+        self.settled[i] = False
+        return i
+
+    def release(self, slots):
+        """
+        Remove particles and return their slots to the free list
+
+        :param slots: slots of live particles
+        :type slots: numpy.ndarray
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        slots = slots[self.alive[slots]]
+        self.alive[slots] = False
+        self.settled[slots] = False
+        self.free[self.free_count:self.free_count + len(slots)] = slots
+        self.free_count += len(slots)
+
+    def step(self, dt):
+        """
+        Let every falling particle sink for one tick, particles reaching the floor settle there
+        """
+        moving = self.alive & ~self.settled
+        if not moving.any():
+            return
+        self.position[moving] += self.velocity[moving] * dt
+        landed = moving & (self.position[:, 1] <= self.floor)
+        self.position[landed, 1] = self.floor
+        self.velocity[landed] = 0
+        self.settled[landed] = True
+
+    def feed(self, store, grid):
+        """
+        Let creatures eat the food they touch, looking for them in the spatial hash around every particle.
+        When several creatures touch the same particle, the closest one gets it, the lower row on a tie.
+
+        :param store: creature state
+        :type store: CreatureStore
+        :param grid: spatial hash rebuilt over store.positions() as they are now
+        :type grid: SpatialHash
+        :return: (slots, rows) of the particles eaten and the store rows of the creatures which ate them
+        :rtype: tuple<numpy.ndarray, numpy.ndarray>
+        """
+        slots = np.flatnonzero(self.alive)
+        if len(slots) == 0 or len(store) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        radii = store.radii()
+        food, rows = grid.neighborsOf(self.position[slots], float(radii.max()) + self.food_radius)
+        d = self.position[slots[food]] - store.positions()[rows]
+        d2 = np.einsum("ij,ij->i", d, d)
+        reach = radii[rows] + self.food_radius
+        touching = d2 <= reach * reach
+        food, rows, d2 = food[touching], rows[touching], d2[touching]
+        # closest creature first for every particle
+        order = np.lexsort((rows, d2, food))
+        food, rows = food[order], rows[order]
+        first = np.flatnonzero(np.diff(food, prepend=-1))
+        eaten, rows = slots[food[first]], rows[first]
+        self.release(eaten)
+        return eaten, rows
+
+    def draw(self, shaderProg):
+        if self.displayObj.mesh.vao is None:
+            return
+        shaderProg.use()
+        self.texture.unbind(shaderProg.getUniformLocation("textureImage"))
+        shaderProg.setVec3("currentColor", self.current_color)
+        for p in self.position[self.alive]:
+            modelMat = self.displayObj.modelMatrix(self.transformationMat @ GLUtility.translate(*p, False))
+            shaderProg.setMat4("modelMat", modelMat.transpose())
+            self.displayObj.draw()
@@ -51,6 +51,10 @@ class VBO:
     def bind(self):
         gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
 
+    def delete(self):
+        gl.glDeleteBuffers(1, [self.vbo])
+        self.vbo = None
+
     def setBuffer(self, bufferDataArray: np.ndarray, vertexAttribSize: int):
         """
         :param vertexAttribSize: the size of the vertex attribute
@@ -109,6 +113,10 @@ class EBO:
     def bind(self):
         gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self.ebo)
 
+    def delete(self):
+        gl.glDeleteBuffers(1, [self.ebo])
+        self.ebo = None
+
     def setBuffer(self, bufferDataArray: np.ndarray):
         if bufferDataArray.dtype != np.dtype("int32"):
             bufferDataArray = bufferDataArray.astype(np.dtype("int32"))
@@ -176,6 +184,10 @@ class VAO:
     def unbind(self):
         gl.glBindVertexArray(0)
 
+    def delete(self):
+        gl.glDeleteVertexArrays(1, [self.vao])
+        self.vao = None
+
 
 # A global variable in this scope to store next texture id, there should be no duplicate textureUnitID
 NextTextureID = 1
@@ -0,0 +1,274 @@
+"""
+Hot loops of the simulation behind one interface: neighbor pair search, flocking force accumulation and bounce
+resolution. NumpyKernels is the reference implementation. NumbaKernels compiles the same loops with Numba when it is
+installed, and gives bit-identical results: every sum is accumulated in the same order as the NumPy version.
+
+loadKernels() picks the backend at startup, the VIVARIUM_KERNELS environment variable ("numpy" or "numba")
+overrides the choice.
+"""
+
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def expandRanges(starts, counts):
+    """
+    Concatenate the integer ranges [starts[k], starts[k] + counts[k]) into one flat array
+
+    :param starts: first value of every range
+    :type starts: numpy.ndarray
+    :param counts: length of every range
+    :type counts: numpy.ndarray
+    :return: (owner, values) where owner[m] is the range index values[m] came from
+    :rtype: tuple<numpy.ndarray, numpy.ndarray>
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(len(counts)), counts)
+    if total == 0:
+        return owner, np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    values = np.asarray(starts, dtype=np.int64)[owner] + (np.arange(total) - offsets[owner])
+    return owner, values
+
+
+class NumpyKernels:
+    """
+    Reference kernels, vectorized with NumPy
+    """
+    name = "numpy"
+
+    def cellPairs(self, points, cells, order, cell_start, cell_count, dims, offsets, r2):
+        """
+        Pairs of points closer than sqrt(r2), visiting the cell offsets of a SpatialHash in order
+
+        :param points: positions
+        :type points: numpy.ndarray(N, 3)
+        :param cells: integer cell of every point
+        :type cells: numpy.ndarray(N, 3)
+        :param order: point indices sorted by cell
+        :param cell_start: first slot of order of every cell
+        :param cell_count: number of points of every cell
+        :param dims: number of cells along each axis
+        :param offsets: cell offsets to visit, the zero offset only keeps pairs with i < j
+        :type offsets: numpy.ndarray(K, 3)
+        :param r2: squared distance threshold
+        :type r2: float
+        :return: (i, j) index arrays, ordered by offset, then i, then position of j in its cell
+        :rtype: tuple<numpy.ndarray, numpy.ndarray>
+        """
+        result_i = []
+        result_j = []
+        for offset in offsets:
+            target = cells + offset
+            inside = np.all((target >= 0) & (target < dims), axis=-1)
+            target = np.clip(target, 0, dims - 1)
+            keys = (target[:, 0] * dims[1] + target[:, 1]) * dims[2] + target[:, 2]
+            i, slots = expandRanges(cell_start[keys], np.where(inside, cell_count[keys], 0))
+            j = order[slots]
+            if not offset.any():
+                # same cell, keep each pair once
+                keep = i < j
+                i, j = i[keep], j[keep]
+            d = points[i] - points[j]
+            close = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1] + d[:, 2] * d[:, 2] <= r2
+            result_i.append(i[close])
+            result_j.append(j[close])
+        return np.concatenate(result_i), np.concatenate(result_j)
+
+    def flockingSums(self, positions, velocities, a, b):
+        """
+        Per creature sums over directed neighbor pairs (a, b): neighbor count, sum of neighbor velocities,
+        sum of neighbor positions and separation, the sum of offset / squared distance away from each neighbor
+
+        :rtype: tuple<numpy.ndarray(N,), numpy.ndarray(N, 3), numpy.ndarray(N, 3), numpy.ndarray(N, 3)>
+        """
+        n = len(positions)
+        offset = positions[a] - positions[b]
+        d2 = np.maximum(offset[:, 0] * offset[:, 0] + offset[:, 1] * offset[:, 1] + offset[:, 2] * offset[:, 2],
+                        1e-9)
+        count = np.bincount(a, minlength=n).astype(np.float64)
+        sum_velocity = np.zeros((n, 3))
+        sum_position = np.zeros((n, 3))
+        separation = np.zeros((n, 3))
+        for k in range(3):
+            sum_velocity[:, k] = np.bincount(a, weights=velocities[b, k], minlength=n)
+            sum_position[:, k] = np.bincount(a, weights=positions[b, k], minlength=n)
+            separation[:, k] = np.bincount(a, weights=offset[:, k] / d2, minlength=n)
+        return count, sum_velocity, sum_position, separation
+
+    def reflectBounces(self, positions, velocities, i, j, t):
+        """
+        Bounce creature pairs apart in place: the velocity component of each creature heading into the other is
+        reflected about the plane between them, at their point of contact. A creature in several pairs gets the
+        sum of its reflections, scaled back to its speed before the bounces if it came out faster, so that a
+        crowd cannot keep speeding it up.
+
+        :param positions: positions at the start of the tick
+        :type positions: numpy.ndarray(N, 3)
+        :param velocities: velocities, changed in place
+        :type velocities: numpy.ndarray(N, 3)
+        :param i: first creature of every pair
+        :param j: second creature of every pair
+        :param t: time into the tick every pair touched at
+        """
+        normal = positions[i] - positions[j] + (velocities[i] - velocities[j]) * t[:, None]
+        length = np.sqrt(normal[:, 0] * normal[:, 0] + normal[:, 1] * normal[:, 1] + normal[:, 2] * normal[:, 2])
+        normal /= np.maximum(length, 1e-9)[:, None]
+        normal[length < 1e-9] = (1, 0, 0)  # exactly overlapping, pick any plane
+        vi, vj = velocities[i], velocities[j]
+        into_i = np.minimum(vi[:, 0] * normal[:, 0] + vi[:, 1] * normal[:, 1] + vi[:, 2] * normal[:, 2], 0)
+        into_j = np.maximum(vj[:, 0] * normal[:, 0] + vj[:, 1] * normal[:, 1] + vj[:, 2] * normal[:, 2], 0)
+        touched = np.unique(np.concatenate((i, j)))
+        v = velocities[touched]
+        before = np.sqrt(v[:, 0] * v[:, 0] + v[:, 1] * v[:, 1] + v[:, 2] * v[:, 2])
+        np.add.at(velocities, i, -2 * into_i[:, None] * normal)
+        np.add.at(velocities, j, -2 * into_j[:, None] * normal)
+        v = velocities[touched]
+        after = np.sqrt(v[:, 0] * v[:, 0] + v[:, 1] * v[:, 1] + v[:, 2] * v[:, 2])
+        velocities[touched] = v * np.minimum(before / np.maximum(after, 1e-12), 1.0)[:, None]
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _cellPairs(points, cells, order, cell_start, cell_count, dims, offsets, r2):
+        n = len(points)
+        # first pass counts, second pass fills, both in the reference order
+        total = 0
+        for fill in range(2):
+            if fill:
+                result_i = np.empty(total, dtype=np.int64)
+                result_j = np.empty(total, dtype=np.int64)
+            m = 0
+            for o in range(len(offsets)):
+                zero = offsets[o, 0] == 0 and offsets[o, 1] == 0 and offsets[o, 2] == 0
+                for i in range(n):
+                    cx = cells[i, 0] + offsets[o, 0]
+                    cy = cells[i, 1] + offsets[o, 1]
+                    cz = cells[i, 2] + offsets[o, 2]
+                    if cx < 0 or cy < 0 or cz < 0 or cx >= dims[0] or cy >= dims[1] or cz >= dims[2]:
+                        continue
+                    key = (cx * dims[1] + cy) * dims[2] + cz
+                    for s in range(cell_start[key], cell_start[key] + cell_count[key]):
+                        j = order[s]
+                        if zero and not i < j:
+                            continue
+                        dx = points[i, 0] - points[j, 0]
+                        dy = points[i, 1] - points[j, 1]
+                        dz = points[i, 2] - points[j, 2]
+                        if dx * dx + dy * dy + dz * dz <= r2:
+                            if fill:
+                                result_i[m] = i
+                                result_j[m] = j
+                            m += 1
+            total = m
+        return result_i, result_j
+
+    @numba.njit(cache=True)
+    def _flockingSums(positions, velocities, a, b):
+        n = len(positions)
+        count = np.zeros(n)
+        sum_velocity = np.zeros((n, 3))
+        sum_position = np.zeros((n, 3))
+        separation = np.zeros((n, 3))
+        for m in range(len(a)):
+            p, q = a[m], b[m]
+            ox = positions[p, 0] - positions[q, 0]
+            oy = positions[p, 1] - positions[q, 1]
+            oz = positions[p, 2] - positions[q, 2]
+            d2 = max(ox * ox + oy * oy + oz * oz, 1e-9)
+            count[p] += 1
+            for k in range(3):
+                sum_velocity[p, k] += velocities[q, k]
+                sum_position[p, k] += positions[q, k]
+            separation[p, 0] += ox / d2
+            separation[p, 1] += oy / d2
+            separation[p, 2] += oz / d2
+        return count, sum_velocity, sum_position, separation
+
+    @numba.njit(cache=True)
+    def _reflectBounces(positions, velocities, i, j, t):
+        k = len(i)
+        normal = np.empty((k, 3))
+        into_i = np.empty(k)
+        into_j = np.empty(k)
+        # every normal and reflection is computed from the velocities as they were before any pair is applied
+        for m in range(k):
+            p, q = i[m], j[m]
+            for c in range(3):
+                normal[m, c] = positions[p, c] - positions[q, c] + (velocities[p, c] - velocities[q, c]) * t[m]
+            length = np.sqrt(normal[m, 0] * normal[m, 0] + normal[m, 1] * normal[m, 1] + normal[m, 2] * normal[m, 2])
+            scale = max(length, 1e-9)
+            for c in range(3):
+                normal[m, c] /= scale
+            if length < 1e-9:
+                # exactly overlapping, pick any plane
+                normal[m, 0], normal[m, 1], normal[m, 2] = 1.0, 0.0, 0.0
+            into_i[m] = min(velocities[p, 0] * normal[m, 0] + velocities[p, 1] * normal[m, 1] +
+                            velocities[p, 2] * normal[m, 2], 0.0)
+            into_j[m] = max(velocities[q, 0] * normal[m, 0] + velocities[q, 1] * normal[m, 1] +
+                            velocities[q, 2] * normal[m, 2], 0.0)
+        touched = np.unique(np.concatenate((i, j)))
+        before = np.empty(len(touched))
+        for m in range(len(touched)):
+            p = touched[m]
+            before[m] = np.sqrt(velocities[p, 0] * velocities[p, 0] + velocities[p, 1] * velocities[p, 1] +
+                                velocities[p, 2] * velocities[p, 2])
+        for m in range(k):
+            for c in range(3):
+                velocities[i[m], c] += -2 * into_i[m] * normal[m, c]
+        for m in range(k):
+            for c in range(3):
+                velocities[j[m], c] += -2 * into_j[m] * normal[m, c]
+        for m in range(len(touched)):
+            p = touched[m]
+            after = np.sqrt(velocities[p, 0] * velocities[p, 0] + velocities[p, 1] * velocities[p, 1] +
+                            velocities[p, 2] * velocities[p, 2])
+            scale = min(before[m] / max(after, 1e-12), 1.0)
+            for c in range(3):
+                velocities[p, c] *= scale
+
+
+class NumbaKernels(NumpyKernels):
+    """
+    The reference kernels as compiled loops, only available when Numba is installed
+    """
+    name = "numba"
+
+    def __init__(self):
+        if numba is None:
+            raise ImportError("NumbaKernels needs the numba package")
+
+    def cellPairs(self, points, cells, order, cell_start, cell_count, dims, offsets, r2):
+        return _cellPairs(points, cells, order, cell_start, cell_count, dims, offsets, float(r2))
+
+    def flockingSums(self, positions, velocities, a, b):
+        return _flockingSums(np.ascontiguousarray(positions), np.ascontiguousarray(velocities), a, b)
+
+    def reflectBounces(self, positions, velocities, i, j, t):
+        if len(i) > 0:
+            _reflectBounces(positions, velocities, i, j, t)
+
+
+def loadKernels(name=None):
+    """
+    Kernel backend to run the simulation with
+
+    :param name: "numpy" or "numba". If None, the VIVARIUM_KERNELS environment variable decides, \
+        and without it Numba is used when it is installed
+    :type name: str
+    :rtype: NumpyKernels
+    """
+    if name is None:
+        name = os.environ.get("VIVARIUM_KERNELS", "numba" if numba is not None else "numpy")
+    if name == "numpy":
+        return NumpyKernels()
+    if name == "numba":
+        return NumbaKernels()
+    raise ValueError(f"unknown kernel backend {name}")
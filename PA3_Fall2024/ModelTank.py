@@ -38,11 +38,12 @@ class DisplayableTank(Displayable):
         self.defaultColor = np.array(color.getRGB())
 
         self.shaderProg = shaderProg
-        self.shaderProg.use()
+        if self.shaderProg is not None:
+            self.shaderProg.use()
 
-        self.vao = VAO()
-        self.vbo = VBO()  # vbo can only be initiate with glProgram activated
-        self.ebo = lineEBO()
+            self.vao = VAO()
+            self.vbo = VBO()  # vbo can only be initiate with glProgram activated
+            self.ebo = lineEBO()
 
         # construct vertex list
         
@@ -78,6 +79,9 @@ class DisplayableTank(Displayable):
         # self.indices should be a flat array of length n*2
 
     def draw(self):
+        if self.vao is None:
+            # headless tank, nothing was uploaded
+            return
         self.vao.bind()
         self.ebo.draw()
         self.vao.unbind()
@@ -87,6 +91,8 @@ class DisplayableTank(Displayable):
         Remember to bind VAO before this initialization. If VAO is not bind, program might throw an error
         in systems that don't enable a default VAO after GLProgram compilation
         """
+        if self.vao is None:
+            return
         self.vao.bind()
         self.vbo.setBuffer(self.vertices, 11)
         self.ebo.setBuffer(self.indices)
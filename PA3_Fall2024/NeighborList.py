@@ -0,0 +1,111 @@
+"""
+Verlet neighbor list: pairs of creatures cached within a cutoff slightly larger than the query radius.
+Creatures move a small fraction of their perception radius per tick, so the cached pairs stay valid for many ticks
+and every query only filters them by their current distance instead of searching the spatial hash again.
+"""
+
+import numpy as np
+
+
+class NeighborList:
+    """
+    Candidate pairs within radius + skin of each other, as of the last build.
+
+    As long as no creature has moved more than skin / 2 since the build, every pair now closer than radius is
+    among the candidates, so a query is exact. The list is rebuilt from the spatial hash when a creature moved
+    further, when a larger radius is asked for, or when the store's rows changed (a creature was added, removed or
+    the rows were reordered).
+    """
+    skin = 0.3
+    cutoff = 0.0  # radius + skin of the last build
+    i = None  # numpy.ndarray(K,), first creature of every candidate pair
+    j = None  # numpy.ndarray(K,), second creature of every candidate pair
+    reference = None  # numpy.ndarray(N, 3), positions at the last build
+    revision = -1  # CreatureStore.revision at the last build
+
+    builds = 0  # number of builds since construction
+    queries = 0  # number of pairs() calls since construction
+    rebuilt = False  # whether the last pairs() call rebuilt the list
+
+    def __init__(self, skin=0.3):
+        """
+        :param skin: extra distance kept in the list on top of the query radius. A larger skin means fewer \
+            rebuilds but more candidates to filter every query
+        :type skin: float
+        """
+        if skin <= 0:
+            raise ValueError("skin should be positive")
+        self.skin = skin
+        self.cutoff = 0.0
+        self.i = np.zeros(0, dtype=np.int64)
+        self.j = np.zeros(0, dtype=np.int64)
+        self.reference = np.zeros((0, 3))
+        self.revision = -1
+        self.builds = 0
+        self.queries = 0
+        self.rebuilt = False
+
+    def isStale(self, store, radius):
+        """
+        Whether the cached candidates may miss a pair closer than radius
+
+        :type store: CreatureStore
+        :type radius: float
+        :rtype: bool
+        """
+        if store.revision != self.revision or radius + self.skin > self.cutoff:
+            return True
+        moved = store.positions() - self.reference
+        limit = self.skin / 2
+        return bool(np.any(np.einsum("ij,ij->i", moved, moved) > limit * limit))
+
+    def build(self, store, grid, radius):
+        """
+        Collect every pair within radius + skin from the spatial hash
+
+        :param store: creature state
+        :type store: CreatureStore
+        :param grid: spatial hash already rebuilt over store.positions()
+        :type grid: SpatialHash
+        :param radius: query radius the list is built for
+        :type radius: float
+        """
+        self.cutoff = radius + self.skin
+        i, j = grid.pairsWithin(self.cutoff)
+        # canonical order, so that sums over the pairs do not depend on when the list was last built
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        order = np.lexsort((j, i))
+        self.i, self.j = i[order], j[order]
+        self.reference = store.positions().copy()
+        self.revision = store.revision
+        self.builds += 1
+
+    def pairs(self, store, grid, radius):
+        """
+        Every unordered pair of creatures closer than radius, rebuilding the list first if needed
+
+        :param store: creature state
+        :type store: CreatureStore
+        :param grid: spatial hash already rebuilt over store.positions(), only read on a rebuild
+        :type grid: SpatialHash
+        :param radius: pair distance threshold
+        :type radius: float
+        :return: (i, j) store rows with i < j, sorted by i then j
+        :rtype: tuple<numpy.ndarray, numpy.ndarray>
+        """
+        self.queries += 1
+        self.rebuilt = self.isStale(store, radius)
+        if self.rebuilt:
+            self.build(store, grid, radius)
+        positions = store.positions()
+        d = positions[self.i] - positions[self.j]
+        close = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1] + d[:, 2] * d[:, 2] <= radius * radius
+        return self.i[close], self.j[close]
+
+    def rebuildRate(self):
+        """
+        Fraction of queries which had to rebuild the list
+
+        :rtype: float
+        """
+        return self.builds / self.queries if self.queries else 0.0
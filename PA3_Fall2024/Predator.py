@@ -6,50 +6,56 @@ from util import AddMirror
 
 class Predator(Component, EnvironmentObject):
     name = "dinosaur"
+    species_id = 0
     def __init__(self, position, shaderProg, size=1):
         super(Predator, self).__init__(position)
-        bound = Cube(Point((0, 0, 0)), shaderProg, [0.35 * size, 0.9 * size, 0.9 * size], Ct.WHITE)
-        # self.addChild(bound)
-        body = Body(self, Point((0, -0.04 * size, 0 * size)), shaderProg, size=size)
-        tail = Tail(body.c_dict['body'], Point((0 * size, -0.02 * size, -0.02 * size)), shaderProg, size=size)
-        neck = Neck(body.c_dict['body'], Point((0 * size, 0.04 * size, 0.12 * size)), shaderProg, size=size)
-        head = Head(neck.c_dict['neck1'], Point((0 * size, 0.04 * size, 0.14 * size)), shaderProg, size=size)
-        pre_l_leg = Leg(body.c_dict['body'], Point((0.04*size, 0*size, 0.12*size)), shaderProg, pre="pre", size=size)
-        pre_r_leg = Leg(body.c_dict['body'], Point((-0.04*size, 0*size, 0.12*size)), shaderProg, pre = "pre",mirror=True, size=size)
-        suf_l_leg = Leg(body.c_dict['body'], Point((0.04 * size, 0 * size, -0.06 * size)), shaderProg, pre="suf", size=size)
-        suf_r_leg = Leg(body.c_dict['body'], Point((-0.04 * size, 0 * size, -0.06 * size)), shaderProg, pre="suf", mirror=True,
-                        size=size)
-        self.components = ([bound] + body.components +
-                           head.components +
-                           tail.components +
-                           neck.components +
-                           pre_l_leg.components + pre_r_leg.components +
-                           suf_l_leg.components + suf_r_leg.components)
-        self.c_dict = {
-            'bound': bound,
-            **body.c_dict,
-            **tail.c_dict,
-            **neck.c_dict,
-            **head.c_dict,
-            **pre_l_leg.c_dict, **pre_r_leg.c_dict,
-            **suf_l_leg.c_dict, **suf_r_leg.c_dict}
-        for limb1 in [self.c_dict['left_pre_leg_limb1'],self.c_dict['right_pre_leg_limb1'],self.c_dict['left_suf_leg_limb1'],self.c_dict['right_suf_leg_limb1']]:
-            limb1.setRotateExtent(limb1.uAxis, 0, -20)
-            limb1.setRotateExtent(limb1.vAxis, -90, 90)
-            limb1.setRotateExtent(limb1.wAxis, -60, 60)
-
-        for limb0 in [self.c_dict['left_pre_leg_limb0'],self.c_dict['right_pre_leg_limb0'],self.c_dict['left_suf_leg_limb0'],self.c_dict['right_suf_leg_limb0']]:
-            limb0.setRotateExtent(limb1.uAxis, 40, -40)
-            limb0.setRotateExtent(limb1.vAxis, -90, 90)
-            limb0.setRotateExtent(limb1.wAxis, -60, 60)
-
-        s0, s1 = 2, 1
-        self.rotation_speed = [
-            [s0, 0, 0], [-s1, 0, 0],
-            [-s0, 0, 0], [-s1, 0, 0],
-            [-s0, 0, 0], [-s1, 0, 0],
-            [s0, 0, 0], [-s1, 0, 0],
-        ]
+        # parts are posed with many setter calls, update the whole creature once at the end
+        with self.batch():
+            bound = Cube(Point((0, 0, 0)), shaderProg, [0.35 * size, 0.9 * size, 0.9 * size], Ct.WHITE)
+            # self.addChild(bound)
+            body = Body(self, Point((0, -0.04 * size, 0 * size)), shaderProg, size=size)
+            tail = Tail(body.c_dict['body'], Point((0 * size, -0.02 * size, -0.02 * size)), shaderProg, size=size)
+            neck = Neck(body.c_dict['body'], Point((0 * size, 0.04 * size, 0.12 * size)), shaderProg, size=size)
+            head = Head(neck.c_dict['neck1'], Point((0 * size, 0.04 * size, 0.14 * size)), shaderProg, size=size)
+            pre_l_leg = Leg(body.c_dict['body'], Point((0.04*size, 0*size, 0.12*size)), shaderProg, pre="pre", size=size)
+            pre_r_leg = Leg(body.c_dict['body'], Point((-0.04*size, 0*size, 0.12*size)), shaderProg, pre = "pre",mirror=True, size=size)
+            suf_l_leg = Leg(body.c_dict['body'], Point((0.04 * size, 0 * size, -0.06 * size)), shaderProg, pre="suf", size=size)
+            suf_r_leg = Leg(body.c_dict['body'], Point((-0.04 * size, 0 * size, -0.06 * size)), shaderProg, pre="suf", mirror=True,
+                            size=size)
+            self.components = ([bound] + body.components +
+                               head.components +
+                               tail.components +
+                               neck.components +
+                               pre_l_leg.components + pre_r_leg.components +
+                               suf_l_leg.components + suf_r_leg.components)
+            self.c_dict = {
+                'bound': bound,
+                **body.c_dict,
+                **tail.c_dict,
+                **neck.c_dict,
+                **head.c_dict,
+                **pre_l_leg.c_dict, **pre_r_leg.c_dict,
+                **suf_l_leg.c_dict, **suf_r_leg.c_dict}
+            self.bound_center = Point((0, 0, 0))
+            self.bound_radius = 0.45 * size
+            self.translation_speed = 0.4
+            for limb1 in [self.c_dict['left_pre_leg_limb1'],self.c_dict['right_pre_leg_limb1'],self.c_dict['left_suf_leg_limb1'],self.c_dict['right_suf_leg_limb1']]:
+                limb1.setRotateExtent(limb1.uAxis, 0, -20)
+                limb1.setRotateExtent(limb1.vAxis, -90, 90)
+                limb1.setRotateExtent(limb1.wAxis, -60, 60)
+
+            for limb0 in [self.c_dict['left_pre_leg_limb0'],self.c_dict['right_pre_leg_limb0'],self.c_dict['left_suf_leg_limb0'],self.c_dict['right_suf_leg_limb0']]:
+                limb0.setRotateExtent(limb1.uAxis, 40, -40)
+                limb0.setRotateExtent(limb1.vAxis, -90, 90)
+                limb0.setRotateExtent(limb1.wAxis, -60, 60)
+
+            s0, s1 = 2, 1
+            self.rotation_speed = [
+                [s0, 0, 0], [-s1, 0, 0],
+                [-s0, 0, 0], [-s1, 0, 0],
+                [-s0, 0, 0], [-s1, 0, 0],
+                [s0, 0, 0], [-s1, 0, 0],
+            ]
 
     def stepForward(self, components, tank_dimensions, vivarium):
         ##### TODO 3: Interact with the environment
@@ -83,9 +89,10 @@ class Predator(Component, EnvironmentObject):
             self.c_dict['right_suf_leg_limb0'], self.c_dict['right_suf_leg_limb1'],
                  ]
         for i,comp in enumerate(limbs):
-            comp.rotate(self.rotation_speed[i][0], comp.uAxis)
-            comp.rotate(self.rotation_speed[i][1], comp.vAxis)
-            comp.rotate(self.rotation_speed[i][2], comp.wAxis)
+            # catch up on every tick skipped by simulation LOD
+            comp.rotate(self.rotation_speed[i][0] * self.lod_steps, comp.uAxis)
+            comp.rotate(self.rotation_speed[i][1] * self.lod_steps, comp.vAxis)
+            comp.rotate(self.rotation_speed[i][2] * self.lod_steps, comp.wAxis)
             if comp.uAngle + self.rotation_speed[i][0] >= comp.uRange[1] or comp.uAngle + self.rotation_speed[i][0] <= \
                     comp.uRange[0]:  # rotation reached the limit
                 self.rotation_speed[i][0] *= -1
@@ -96,7 +103,8 @@ class Predator(Component, EnvironmentObject):
                     comp.wRange[0]:
                 self.rotation_speed[i][2] *= -1
             # print(f'{comp.uAngle}, {comp.vAngle}, {comp.wAngle}, {comp.uRange}, {comp.vRange}, {comp.wRange}')
-        self.vAngle = (self.vAngle + 3) % 360
+        self.vAngle = (self.vAngle + 3 * self.lod_steps) % 360
+        self.markDirty()
 
         pass
         ##### BONUS 6: Group behaviors
@@ -15,40 +15,43 @@ class Prey(Component, EnvironmentObject):
 
     def __init__(self, postion, shaderProg, size=1):
         super(Prey, self).__init__(postion)
-        bound = Cube(Point((0,0,0)), shaderProg, [0.70*size, 0.9*size, 0.5*size], Ct.WHITE)
-        # self.addChild(bound)
-        body = Body(self, Point((0, 0.22*size, -0.2 * size)), shaderProg, size=size)
-        head = Head(body.c_dict['body'], Point((0, 0, 0)), shaderProg, size=size)
-        self.components = body.components + head.components + [bound]
-        self.c_dict = {**body.c_dict, **head.c_dict, 'bound': bound}
-        self.rotation_speed = []
-        for comp in self.components:
-            comp.setRotateExtent(comp.uAxis, 0, 35)
-            comp.setRotateExtent(comp.vAxis, -45, 45)
-            comp.setRotateExtent(comp.wAxis, -45, 45)
-
-        self.rotation_speed.append([0.5, 0, 0])
-        self.bound_center = Point((0, 0, 0))
-        self.bound_radius = 4
-        self.species_id = 1
-
-        left_leg = self.c_dict['left_leg_joint0']
-        right_leg = self.c_dict['right_leg_joint0']
-        self.rotation_speed = []
-        speed = 5
-        for i, leg in enumerate([left_leg, right_leg]):
-            leg.setRotateExtent(leg.uAxis, leg.default_uAngle - 35, leg.default_uAngle + 35)
-            leg.setRotateExtent(leg.vAxis, leg.default_vAngle - 45, leg.default_vAngle + 45)
-            leg.setRotateExtent(leg.wAxis, leg.default_wAngle - 45, leg.default_wAngle + 45)
-            self.rotation_speed.append([0.5 *speed if i %2 == 0 else -0.5*speed,0, 0])
-
-        left_arm = self.c_dict['left_arm_joint0']
-        right_arm = self.c_dict['right_arm_joint0']
-        for i, arm in enumerate([left_arm, right_arm]):
-            arm.setRotateExtent(leg.uAxis, arm.default_uAngle - 35, arm.default_uAngle + 35)
-            arm.setRotateExtent(leg.vAxis, arm.default_vAngle - 45, arm.default_vAngle + 45)
-            arm.setRotateExtent(leg.wAxis, arm.default_wAngle - 45, arm.default_wAngle + 45)
-            self.rotation_speed.append([-0.5 *speed if i %2 ==0 else 0.5* speed, 0, 0])
+        # parts are posed with many setter calls, update the whole creature once at the end
+        with self.batch():
+            bound = Cube(Point((0,0,0)), shaderProg, [0.70*size, 0.9*size, 0.5*size], Ct.WHITE)
+            # self.addChild(bound)
+            body = Body(self, Point((0, 0.22*size, -0.2 * size)), shaderProg, size=size)
+            head = Head(body.c_dict['body'], Point((0, 0, 0)), shaderProg, size=size)
+            self.components = body.components + head.components + [bound]
+            self.c_dict = {**body.c_dict, **head.c_dict, 'bound': bound}
+            self.rotation_speed = []
+            for comp in self.components:
+                comp.setRotateExtent(comp.uAxis, 0, 35)
+                comp.setRotateExtent(comp.vAxis, -45, 45)
+                comp.setRotateExtent(comp.wAxis, -45, 45)
+
+            self.rotation_speed.append([0.5, 0, 0])
+            self.bound_center = Point((0, 0, 0))
+            self.bound_radius = 0.45 * size
+            self.species_id = 1
+            self.translation_speed = 0.6
+
+            left_leg = self.c_dict['left_leg_joint0']
+            right_leg = self.c_dict['right_leg_joint0']
+            self.rotation_speed = []
+            speed = 5
+            for i, leg in enumerate([left_leg, right_leg]):
+                leg.setRotateExtent(leg.uAxis, leg.default_uAngle - 35, leg.default_uAngle + 35)
+                leg.setRotateExtent(leg.vAxis, leg.default_vAngle - 45, leg.default_vAngle + 45)
+                leg.setRotateExtent(leg.wAxis, leg.default_wAngle - 45, leg.default_wAngle + 45)
+                self.rotation_speed.append([0.5 *speed if i %2 == 0 else -0.5*speed,0, 0])
+
+            left_arm = self.c_dict['left_arm_joint0']
+            right_arm = self.c_dict['right_arm_joint0']
+            for i, arm in enumerate([left_arm, right_arm]):
+                arm.setRotateExtent(leg.uAxis, arm.default_uAngle - 35, arm.default_uAngle + 35)
+                arm.setRotateExtent(leg.vAxis, arm.default_vAngle - 45, arm.default_vAngle + 45)
+                arm.setRotateExtent(leg.wAxis, arm.default_wAngle - 45, arm.default_wAngle + 45)
+                self.rotation_speed.append([-0.5 *speed if i %2 ==0 else 0.5* speed, 0, 0])
 
 
     def stepForward(self, components, tank_dimensions, vivarium):
@@ -75,9 +78,10 @@ class Prey(Component, EnvironmentObject):
         right_arm = self.c_dict['right_arm_joint0']
         for i, comp in enumerate([left_leg, right_leg, left_arm, right_arm]):
             # print(f'before {comp.uAngle}, {comp.vAngle}, {comp.wAngle}, {comp.uRange}, {comp.vRange}, {comp.wRange}')
-            comp.rotate(self.rotation_speed[i][0], comp.uAxis)
-            comp.rotate(self.rotation_speed[i][1], comp.vAxis)
-            comp.rotate(self.rotation_speed[i][2], comp.wAxis)
+            # catch up on every tick skipped by simulation LOD
+            comp.rotate(self.rotation_speed[i][0] * self.lod_steps, comp.uAxis)
+            comp.rotate(self.rotation_speed[i][1] * self.lod_steps, comp.vAxis)
+            comp.rotate(self.rotation_speed[i][2] * self.lod_steps, comp.wAxis)
             if comp.uAngle + self.rotation_speed[i][0] >= comp.uRange[1] or comp.uAngle + self.rotation_speed[i][0] <= comp.uRange[0]:  # rotation reached the limit
                 self.rotation_speed[i][0] *= -1
             if comp.vAngle + self.rotation_speed[i][1] >= comp.vRange[1] + self.rotation_speed[i][1] or comp.vAngle <= comp.vRange[0]:
@@ -85,7 +89,8 @@ class Prey(Component, EnvironmentObject):
             if comp.wAngle + self.rotation_speed[i][2] >= comp.wRange[1] or comp.wAngle + self.rotation_speed[i][2] <= comp.wRange[0]:
                 self.rotation_speed[i][2] *= -1
             # print(f'{comp.uAngle}, {comp.vAngle}, {comp.wAngle}, {comp.uRange}, {comp.vRange}, {comp.wRange}')
-        self.vAngle = (self.vAngle + 3) %360
+        self.vAngle = (self.vAngle + 3 * self.lod_steps) %360
+        self.markDirty()
 
         ##### TODO 2: Animate your creature!
         # Requirements:
@@ -44,7 +44,7 @@ class Shape(Component):
     indexData = None
     mesh = None
 
-    def __init__(self, position, shaderProg, size, vertexData, indexData, color=ColorType.YELLOW):
+    def __init__(self, position, shaderProg, size, vertexData, indexData, color=ColorType.YELLOW, key=None):
         """
         :param position: location of the object
         :type position: Point
@@ -59,8 +59,10 @@ class Shape(Component):
         :param limb: sets the rotation behavior of the object. if true, rotations happen "at the joint" \
             rather than the object's center
         :type limb: boolean
+        :param key: shape identifier the vertex data is shared under, see SharedMesh
+        :type key: hashable
         """
-        self.mesh = DisplayableMesh(shaderProg, size, vertexData, indexData, color)
+        self.mesh = DisplayableMesh(shaderProg, size, vertexData, indexData, color, key)
         super(Shape, self).__init__(position, self.mesh)
 
 class Cone(Shape):
@@ -86,9 +88,11 @@ class Cone(Shape):
         :type color: ColorType
         """
         if lowPoly:
-            super(Cone, self).__init__(position, shaderProg, size, self.verticesLP.copy(), self.indicesLP.copy(), color)
+            super(Cone, self).__init__(position, shaderProg, size, self.verticesLP, self.indicesLP, color,
+                                       ("cone", True))
         else:
-            super(Cone, self).__init__(position, shaderProg, size, self.vertices.copy(), self.indices.copy(), color)
+            super(Cone, self).__init__(position, shaderProg, size, self.vertices, self.indices, color,
+                                       ("cone", False))
 
         # translate object by -z extent of the new component so that rotations occur @ the joint
         # rather than around the object's true center
@@ -120,7 +124,7 @@ class Cube(Shape):
         :param color: vertex color to be applied uniformly
         :type color: ColorType
         """
-        super(Cube, self).__init__(position, shaderProg, size, self.vertices.copy(), self.indices.copy(), color)
+        super(Cube, self).__init__(position, shaderProg, size, self.vertices, self.indices, color, ("cube", False))
         # translate object by -z extent of the new component so that rotations occur @ the joint
         # rather than around the object's true center
         glutility = GLUtility.GLUtility()
@@ -156,9 +160,11 @@ class Cylinder(Shape):
         :type color: ColorType
         """
         if lowPoly:
-            super(Cylinder, self).__init__(position, shaderProg, size, self.verticesLP.copy(), self.indicesLP.copy(), color)
+            super(Cylinder, self).__init__(position, shaderProg, size, self.verticesLP, self.indicesLP, color,
+                                           ("cylinder", True))
         else:
-            super(Cylinder, self).__init__(position, shaderProg, size, self.vertices.copy(), self.indices.copy(), color)
+            super(Cylinder, self).__init__(position, shaderProg, size, self.vertices, self.indices, color,
+                                           ("cylinder", False))
         # translate object by -z extent of the new component so that rotations occur @ the joint
         # rather than around the object's true center
         glutility = GLUtility.GLUtility()
@@ -198,9 +204,11 @@ class Sphere(Shape):
         :type limb: boolean
         """
         if lowPoly:
-            super(Sphere, self).__init__(position, shaderProg, size, self.verticesLP.copy(), self.indicesLP.copy(), color)
+            super(Sphere, self).__init__(position, shaderProg, size, self.verticesLP, self.indicesLP, color,
+                                         ("sphere", True))
         else:
-            super(Sphere, self).__init__(position, shaderProg, size, self.vertices.copy(), self.indices.copy(), color)
+            super(Sphere, self).__init__(position, shaderProg, size, self.vertices, self.indices, color,
+                                         ("sphere", False))
         # translate object by -z extent of the new component so that rotations occur @ the joint
         # rather than around the object's true center   
         glutility = GLUtility.GLUtility()
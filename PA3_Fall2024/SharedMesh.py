@@ -0,0 +1,150 @@
+"""
+Vertex data of one primitive shape and its GPU buffers, shared by every DisplayableMesh drawing that shape.
+Meshes are looked up by a key such as ("sphere", True) and the shader program they are drawn with, so a vivarium
+holds one copy of every shape it uses, however many components draw it, and uploads each of them once per GL context.
+"""
+
+from GLBuffer import VAO, VBO, EBO
+import numpy as np
+
+
+class SharedMesh:
+    """
+    Unscaled, uncolored vertices and triangle indices with one VAO/VBO/EBO, counted by the meshes using them.
+
+    Get one with acquire() and hand it back with release(). The last release() frees the GPU buffers and drops the
+    mesh from the cache, the next acquire() of its key builds it again. When the GL context is replaced, call
+    forgetBuffers() before building anything in the new one.
+    """
+    cache = {}  # dict<tuple<hashable, GLProgram>, SharedMesh>, every live shared mesh by key and shader program
+
+    key = None  # key in cache, None for a mesh which is not shared
+    vertices = None  # numpy.ndarray, 11 floats per vertex, read only
+    indices = None  # numpy.ndarray, 3 vertex indices per triangle, read only
+    shaderProg = None
+    vao = None
+    vbo = None
+    ebo = None
+    refcount = 0  # number of DisplayableMesh holding this mesh
+    uploaded = False  # whether the buffers hold the vertex data already
+
+    def __init__(self, key, shaderProg, vertexData, indexData):
+        """
+        In class usage only, see acquire()
+        """
+        self.key = key
+        self.vertices = np.array(vertexData, dtype=np.float32)
+        self.indices = np.array(indexData, dtype=np.int32)
+        self.vertices.flags.writeable = False
+        self.indices.flags.writeable = False
+        self.refcount = 0
+        self.uploaded = False
+        self.createBuffers(shaderProg)
+
+    @classmethod
+    def acquire(cls, key, shaderProg, vertexData, indexData):
+        """
+        Shared mesh for key, built from vertexData and indexData if nobody holds it yet
+
+        :param key: shape identifier, e.g. (shape name, lowPoly). None builds a private mesh which is never shared
+        :type key: hashable
+        :param shaderProg: compiled shader program, its GL context owns the buffers. None to build the mesh without \
+            any GPU buffers (headless)
+        :type shaderProg: GLProgram
+        :param vertexData: 11 floats per vertex, only read when the mesh is built
+        :type vertexData: numpy.ndarray
+        :param indexData: 3 vertex indices per triangle, only read when the mesh is built
+        :type indexData: numpy.ndarray
+        :rtype: SharedMesh
+        """
+        if key is not None:
+            key = (key, shaderProg)
+        mesh = cls.cache.get(key) if key is not None else None
+        if mesh is None:
+            mesh = cls(key, shaderProg, vertexData, indexData)
+            if key is not None:
+                cls.cache[key] = mesh
+        mesh.refcount += 1
+        return mesh
+
+    def release(self):
+        """
+        Give back one reference, the GPU buffers are freed with the last one
+        """
+        if self.refcount <= 0:
+            return
+        self.refcount -= 1
+        if self.refcount > 0:
+            return
+        if self.vao is not None:
+            self.vbo.delete()
+            self.ebo.delete()
+            self.vao.delete()
+            self.vao = self.vbo = self.ebo = None
+            self.uploaded = False
+        if self.key is not None and SharedMesh.cache.get(self.key) is self:
+            del SharedMesh.cache[self.key]
+
+    @classmethod
+    def forgetBuffers(cls):
+        """
+        The GL context holding every buffer is gone: drop them without deleting them, they would name other buffers
+        in a new context, and empty the cache so that the next acquire() of every key builds a new mesh
+        """
+        for mesh in cls.cache.values():
+            mesh.vao = mesh.vbo = mesh.ebo = None
+            mesh.uploaded = False
+        cls.cache.clear()
+
+    def createBuffers(self, shaderProg):
+        """
+        In class usage only. Create the GPU buffers if a shader program is given
+        """
+        self.shaderProg = shaderProg
+        if shaderProg is None:
+            return
+        shaderProg.use()
+        self.vao = VAO()
+        self.vbo = VBO()  # vbo can only be initiate with glProgram activated
+        self.ebo = EBO()
+
+    def initialize(self):
+        """
+        Upload the vertex data, only the first call after the buffers were created does anything
+        """
+        if self.vao is None or self.uploaded:
+            return
+        self.vao.bind()
+        self.vbo.setBuffer(self.vertices, 11)
+        self.ebo.setBuffer(self.indices)
+
+        self.vbo.setAttribPointer(self.shaderProg.getAttribLocation("vertexPos"),
+                                  stride=11, offset=0, attribSize=3)
+        self.vbo.setAttribPointer(self.shaderProg.getAttribLocation("vertexNormal"),
+                                  stride=11, offset=3, attribSize=3)
+        self.vbo.setAttribPointer(self.shaderProg.getAttribLocation("vertexColor"),
+                                  stride=11, offset=6, attribSize=3)
+        self.vbo.setAttribPointer(self.shaderProg.getAttribLocation("vertexTexture"),
+                                  stride=11, offset=9, attribSize=2)
+        self.vao.unbind()
+        self.uploaded = True
+
+    def draw(self):
+        if self.vao is None:
+            # headless mesh, nothing was uploaded
+            return
+        if not self.uploaded:
+            # built after the scene was initialized, e.g. for a creature spawned while running
+            self.initialize()
+        self.vao.bind()
+        self.ebo.draw()
+        self.vao.unbind()
+
+    @classmethod
+    def memoryUsage(cls):
+        """
+        Bytes of vertex and index data held by all cached meshes
+
+        :rtype: int
+        """
+        return sum(m.vertices.nbytes + m.indices.nbytes for m in cls.cache.values())
@@ -0,0 +1,124 @@
+"""
+Precomputed signed distance field of the free space inside the tank.
+The tank walls and any registered static obstacles are sampled once on a regular 3D grid, after that distance and
+gradient at any set of points are a vectorized trilinear interpolation.
+"""
+
+import numpy as np
+
+
+def boxDistance(points, center, half_extents):
+    """
+    Signed distance from points to an axis aligned box, negative inside
+
+    :rtype: numpy.ndarray(N,)
+    """
+    q = np.abs(points - np.asarray(center, dtype=np.float64)) - np.asarray(half_extents, dtype=np.float64)
+    outside = np.linalg.norm(np.maximum(q, 0), axis=-1)
+    inside = np.minimum(q.max(axis=-1), 0)
+    return outside + inside
+
+
+def sphereDistance(points, center, radius):
+    """
+    Signed distance from points to a sphere, negative inside
+
+    :rtype: numpy.ndarray(N,)
+    """
+    return np.linalg.norm(points - np.asarray(center, dtype=np.float64), axis=-1) - radius
+
+
+class SignedDistanceField:
+    """
+    Distance to the nearest solid surface, positive in free water and negative inside walls or obstacles.
+    The gradient points away from the nearest surface.
+
+    Register obstacles with addSphere()/addBox(), then call build() once before sampling.
+    """
+    spacing = 0.1
+    origin = None  # numpy.ndarray(3,), position of grid node (0, 0, 0)
+    shape = None  # tuple<int, int, int>, number of grid nodes along each axis
+    tank_dimensions = None
+
+    obstacles = None  # list<tuple>, ("sphere", center, radius) or ("box", center, half_extents)
+    distance = None  # numpy.ndarray(shape)
+    gradient = None  # numpy.ndarray(shape + (3,))
+
+    def __init__(self, tank_dimensions, spacing=0.1):
+        """
+        :param tank_dimensions: size of the tank along x, y and z, the tank is centered at the origin
+        :type tank_dimensions: list<float>
+        :param spacing: distance between grid nodes
+        :type spacing: float
+        """
+        if spacing <= 0:
+            raise ValueError("spacing should be positive")
+        self.tank_dimensions = np.asarray(tank_dimensions, dtype=np.float64)
+        self.spacing = float(spacing)
+        self.origin = -self.tank_dimensions / 2
+        self.shape = tuple(int(n) for n in np.ceil(self.tank_dimensions / self.spacing).astype(np.int64) + 1)
+        self.obstacles = []
+
+    def addSphere(self, center, radius):
+        """
+        Register a static spherical obstacle, e.g. a rock
+        """
+        self.obstacles.append(("sphere", np.asarray(center, dtype=np.float64), float(radius)))
+        self.distance = None
+
+    def addBox(self, center, half_extents):
+        """
+        Register a static axis aligned box obstacle
+        """
+        self.obstacles.append(("box", np.asarray(center, dtype=np.float64), np.asarray(half_extents, dtype=np.float64)))
+        self.distance = None
+
+    def evaluate(self, points):
+        """
+        Exact signed distance at points, computed from the tank and the obstacles instead of the grid
+
+        :rtype: numpy.ndarray(N,)
+        """
+        points = np.asarray(points, dtype=np.float64)
+        # inside the tank the free space distance is the negated distance to the tank box
+        result = -boxDistance(points, (0, 0, 0), self.tank_dimensions / 2)
+        for kind, center, size in self.obstacles:
+            d = sphereDistance(points, center, size) if kind == "sphere" else boxDistance(points, center, size)
+            result = np.minimum(result, d)
+        return result
+
+    def build(self):
+        """
+        Sample the distance field and its gradient on the grid
+        """
+        axes = [self.origin[k] + self.spacing * np.arange(self.shape[k]) for k in range(3)]
+        nodes = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+        self.distance = self.evaluate(nodes.reshape(-1, 3)).reshape(self.shape)
+        self.gradient = np.stack(np.gradient(self.distance, self.spacing), axis=-1)
+
+    def sample(self, points):
+        """
+        Trilinearly interpolated distance and gradient at points. Points outside the grid use the border values.
+
+        :param points: query positions
+        :type points: numpy.ndarray(N, 3)
+        :return: (distance, gradient) with shapes (N,) and (N, 3)
+        :rtype: tuple<numpy.ndarray, numpy.ndarray>
+        """
+        if self.distance is None:
+            self.build()
+        limit = np.array(self.shape) - 1
+        u = (np.asarray(points, dtype=np.float64) - self.origin) / self.spacing
+        u = np.clip(u, 0, limit)
+        base = np.minimum(np.floor(u).astype(np.int64), np.maximum(limit - 1, 0))
+        f = u - base
+
+        distance = np.zeros(len(u))
+        gradient = np.zeros((len(u), 3))
+        for corner in range(8):
+            offset = np.array([(corner >> 2) & 1, (corner >> 1) & 1, corner & 1])
+            idx = np.minimum(base + offset, limit)
+            w = np.prod(np.where(offset, f, 1 - f), axis=1)
+            distance += w * self.distance[idx[:, 0], idx[:, 1], idx[:, 2]]
+            gradient += w[:, None] * self.gradient[idx[:, 0], idx[:, 1], idx[:, 2]]
+        return distance, gradient
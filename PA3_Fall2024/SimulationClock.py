@@ -0,0 +1,68 @@
+"""
+Fixed-timestep simulation clock. Wall time between rendered frames is accumulated and paid out in whole simulation
+steps of constant length, so the simulation advances at the same rate whatever the render load is.
+"""
+
+import time
+
+
+class SimulationClock:
+    """
+    Accumulator for a fixed simulation timestep.
+
+    Every call to tick() adds the elapsed wall time to the accumulator and returns how many steps of dt should be
+    simulated now. What is left in the accumulator, as a fraction of dt, is the interpolation factor between the last
+    two simulation states to draw with.
+    """
+    dt = 1 / 120
+    accumulator = 0.0
+    max_lag = 0.25  # seconds of simulation time that may be owed at most
+    last_time = None
+
+    def __init__(self, dt, max_lag=0.25):
+        """
+        :param dt: length of one simulation step, in seconds
+        :type dt: float
+        :param max_lag: if the simulation falls further behind than this, the excess is dropped so a stall cannot \
+            snowball into ever longer catch-up frames
+        :type max_lag: float
+        """
+        if dt <= 0:
+            raise ValueError("dt should be positive")
+        self.dt = dt
+        self.max_lag = max(max_lag, dt)
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def reset(self):
+        """
+        Forget the accumulated time, e.g. after a pause
+        """
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def tick(self, elapsed=None):
+        """
+        Account for the time passed since the previous tick
+
+        :param elapsed: wall time to add, in seconds. If None, it is measured since the previous call
+        :type elapsed: float
+        :return: number of simulation steps to run now, possibly 0
+        :rtype: int
+        """
+        if elapsed is None:
+            now = time.perf_counter()
+            elapsed = 0.0 if self.last_time is None else now - self.last_time
+            self.last_time = now
+        self.accumulator = min(self.accumulator + max(elapsed, 0.0), self.max_lag)
+        steps = int(self.accumulator / self.dt)
+        self.accumulator -= steps * self.dt
+        return steps
+
+    def alpha(self):
+        """
+        How far the current frame lies between the previous and the current simulation state, in [0, 1)
+
+        :rtype: float
+        """
+        return self.accumulator / self.dt
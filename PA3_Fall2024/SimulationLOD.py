@@ -0,0 +1,125 @@
+"""
+Simulation level of detail: creatures far from the action get their per-creature Python work
+(animationUpdate and stepForward) less often.
+Movement, steering and collisions stay vectorized over the whole population every tick.
+"""
+
+import numpy as np
+
+
+class SimulationLOD:
+    """
+    Assigns every creature a level from its importance, and tells Vivarium which creatures are due for an update.
+
+    A creature at level k is updated every intervals[k] ticks. Its level comes from the closest of
+    * its distance to the camera, compared to camera_distances, if camera_position is set
+    * its distance to the nearest creature of a predator species, compared to predator_distances.
+      Predators themselves count as being at distance 0
+    and is then lowered by the creature's lod_priority, so a priority of 1 means one level more detail.
+    Off by default, every creature is then updated every tick, as in the interactive vivarium.
+    An update that was skipped is not lost: the creature's lod_steps tells it how many ticks the update stands for,
+    and it catches up in one go.
+    """
+    intervals = (1, 2, 4, 8)  # ticks between two updates, per level
+    camera_distances = (8.0, 12.0, 16.0)  # camera distance where each next level starts
+    predator_distances = (1.5, 3.0, 6.0)  # predator distance where each next level starts
+    predator_species = (0,)
+    camera_position = None  # numpy.ndarray(3,), in vivarium coordinates, None to leave the camera out
+    enabled = False
+    block_size = 1024  # creature rows per block of the nearest predator search
+
+    level_counts = None  # numpy.ndarray(levels,), creatures at every level after the last schedule()
+    skipped = 0  # creatures not updated during the last schedule()
+
+    def __init__(self, intervals=(1, 2, 4, 8), camera_distances=(8.0, 12.0, 16.0),
+                 predator_distances=(1.5, 3.0, 6.0), predator_species=(0,), enabled=False):
+        """
+        :param intervals: ticks between two updates at every level, starting with level 0
+        :type intervals: tuple<int>
+        :param camera_distances: len(intervals) - 1 increasing distances from the camera
+        :type camera_distances: tuple<float>
+        :param predator_distances: len(intervals) - 1 increasing distances from the nearest predator, \
+            None to leave predators out
+        :type predator_distances: tuple<float>
+        :param predator_species: species_id of predators
+        :type predator_species: tuple<int>
+        :param enabled: update far away creatures less often. If False every creature is updated every tick
+        :type enabled: bool
+        """
+        if len(intervals) == 0 or min(intervals) < 1:
+            raise ValueError("intervals should be positive tick counts")
+        for distances in (camera_distances, predator_distances):
+            if distances is not None and len(distances) != len(intervals) - 1:
+                raise ValueError("every distance list needs one entry less than intervals")
+        self.intervals = np.asarray(intervals, dtype=np.int64)
+        self.camera_distances = camera_distances
+        self.predator_distances = predator_distances
+        self.predator_species = tuple(predator_species)
+        self.enabled = enabled
+        self.level_counts = np.zeros(len(intervals), dtype=np.int64)
+        self.skipped = 0
+
+    def nearestPredatorDistance(self, positions, species):
+        """
+        Distance from every creature to the closest predator, 0 for predators and inf when there is none
+
+        :rtype: numpy.ndarray(N,)
+        """
+        is_predator = np.isin(species, self.predator_species)
+        result = np.full(len(positions), np.inf)
+        result[is_predator] = 0
+        predators = positions[is_predator]
+        if len(predators) == 0:
+            return result
+        others = np.flatnonzero(~is_predator)
+        for start in range(0, len(others), self.block_size):
+            rows = others[start:start + self.block_size]
+            d = positions[rows, None, :] - predators[None, :, :]
+            result[rows] = np.sqrt(np.einsum("ijk,ijk->ij", d, d).min(axis=1))
+        return result
+
+    def levels(self, store):
+        """
+        Level of detail of every creature in the store
+
+        :type store: CreatureStore
+        :rtype: numpy.ndarray(N,)
+        """
+        positions = store.positions()
+        top = len(self.intervals) - 1
+        level = np.full(len(positions), top if self.enabled else 0, dtype=np.int64)
+        if not self.enabled or top == 0:
+            return level
+        used = False
+        if self.camera_position is not None:
+            d = np.linalg.norm(positions - np.asarray(self.camera_position, dtype=np.float64), axis=1)
+            level = np.minimum(level, np.searchsorted(self.camera_distances, d))
+            used = True
+        if self.predator_distances is not None:
+            d = self.nearestPredatorDistance(positions, store.speciesIds())
+            level = np.minimum(level, np.searchsorted(self.predator_distances, d))
+            used = True
+        if not used:
+            level[:] = 0
+        return np.clip(level - store.lodPriorities(), 0, top)
+
+    def schedule(self, store):
+        """
+        Advance every creature's count of pending ticks by one and pick the creatures due for an update.
+        Their pending count is reset.
+
+        :type store: CreatureStore
+        :return: (rows, steps), store rows to update this tick and the number of ticks each update stands for
+        :rtype: tuple<numpy.ndarray, numpy.ndarray>
+        """
+        level = self.levels(store)
+        pending = store.lodPending()
+        pending += 1
+        due = pending >= self.intervals[level]
+        rows = np.flatnonzero(due)
+        steps = pending[rows].copy()
+        pending[rows] = 0
+
+        self.level_counts = np.bincount(level, minlength=len(self.intervals))
+        self.skipped = len(pending) - len(rows)
+        return rows, steps
@@ -24,6 +24,7 @@ import ColorType
 from GLProgram import GLProgram
 from GLBuffer import VAO, VBO, EBO, Texture
 from Vivarium import Vivarium
+from SharedMesh import SharedMesh
 from Quaternion import Quaternion
 import GLUtility
 
@@ -161,13 +162,16 @@ class Sketch(CanvasBase):
     def InitGL(self):
         # self.texture = Texture()
 
+        # OnResize replaced the GL context, the buffers of the previous scene went with it
+        SharedMesh.forgetBuffers()
+        self.topLevelComponent.clear()
+
         self.shaderProg = GLProgram()
         self.shaderProg.compile()
 
         # instantiate models, this can only be done with a compiled GL program
         self.vivarium = Vivarium(self, self.shaderProg)
-        
-        self.topLevelComponent.clear()
+
         self.topLevelComponent.addChild(self.vivarium)
         self.topLevelComponent.initialize()
 
@@ -232,12 +236,12 @@ class Sketch(CanvasBase):
         self.viewMat = self.glutility.view(self.getCameraPos(), self.lookAtPt, self.upVector)
         self.shaderProg.setMat4("viewMat", self.viewMat)
 
-        self.topLevelComponent.update(np.identity(4))
+        # run the fixed-step simulation for the time since the last frame, then draw in between the last two states
+        self.vivarium.lod.camera_position = self.getCameraPos()
+        self.vivarium.advance()
+        self.vivarium.interpolate()
         self.topLevelComponent.draw(self.shaderProg)
 
-        # perform the next step of the animation
-        self.vivarium.animationUpdate()
-
         self.SwapBuffers()
 
     def _adjust_size(self, event):
@@ -354,16 +358,18 @@ class Sketch(CanvasBase):
         if size is None:
             return
 
-        self._adjust_angle(target, keycode, size)
-        self._adjust_pos(target, keycode, size)
-        self._adjust_scale(target, keycode, size)
-        print(
-            f"current {key} u: {target.uAngle} v: {target.vAngle} w: {target.wAngle}  pos: {target.currentPos}, scale: {target.currentScaling}")
-        mirror = self._get_mirror(target)
-        if mirror is not None:
-            self._adjust_angle(mirror, keycode, size, mirror=True)
-            self._adjust_pos(mirror, keycode, size, mirror=True)
-            self._adjust_scale(mirror, keycode, size)
+        # the target and its mirror are updated together once both are edited
+        with self.vivarium.batch():
+            self._adjust_angle(target, keycode, size)
+            self._adjust_pos(target, keycode, size)
+            self._adjust_scale(target, keycode, size)
+            print(
+                f"current {key} u: {target.uAngle} v: {target.vAngle} w: {target.wAngle}  pos: {target.currentPos}, scale: {target.currentScaling}")
+            mirror = self._get_mirror(target)
+            if mirror is not None:
+                self._adjust_angle(mirror, keycode, size, mirror=True)
+                self._adjust_pos(mirror, keycode, size, mirror=True)
+                self._adjust_scale(mirror, keycode, size)
 
 
     def OnDestroy(self, event):
@@ -519,6 +525,9 @@ class Sketch(CanvasBase):
             # reset viewing angle
             self.viewing_quaternion = Quaternion()
             self.update()
+        # drop a chunk of food into the tank
+        if chr(keycode) in "fF":
+            self.vivarium.dropFood()
         if keycode in [wx.WXK_ESCAPE]:
             # exit component editing mode
             self.select_components[self.select_obj_index].reset("color")
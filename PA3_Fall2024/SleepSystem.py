@@ -0,0 +1,128 @@
+"""
+Sleeping state for creatures at rest.
+A creature that has been still for a while is put to sleep: it gets no animationUpdate/stepForward, is not
+integrated, and its subtree is left out of Component.update, until something wakes it up again.
+"""
+
+import numpy as np
+
+from EventQueue import EventQueue
+
+
+class SleepSystem:
+    """
+    Decides every tick which creatures sleep, from CreatureStore arrays.
+
+    A creature is still when its speed is below speed_threshold and its joint animation (joint_activity, refreshed
+    whenever the creature gets an update) is below joint_threshold. After sleep_after still ticks it falls asleep.
+    A sleeping creature wakes up when
+    * it takes part in an event of the tick, a bite or a bump (see disturb()) or touching a wall
+    * an awake creature that is moving comes within wake_radius of it
+    * its velocity is changed from outside, see Vivarium.applyImpulse
+    """
+    speed_threshold = 1e-3  # tank units per second
+    joint_threshold = 1e-3  # degrees per tick
+    sleep_after = 60  # still ticks before falling asleep
+    wake_radius = 0.5  # added to both bounding radii
+    enabled = True
+
+    sleeping_count = 0
+    awake_count = 0
+    woken = 0  # creatures woken up during the last update()
+    fell_asleep = 0  # creatures which fell asleep during the last update()
+
+    def __init__(self, speed_threshold=1e-3, joint_threshold=1e-3, sleep_after=60, wake_radius=0.5):
+        """
+        :param speed_threshold: creatures slower than this may sleep
+        :type speed_threshold: float
+        :param joint_threshold: creatures whose joints turn slower than this may sleep
+        :type joint_threshold: float
+        :param sleep_after: number of still ticks before a creature falls asleep
+        :type sleep_after: int
+        :param wake_radius: how close a moving creature has to come to wake a sleeping one up
+        :type wake_radius: float
+        """
+        self.speed_threshold = speed_threshold
+        self.joint_threshold = joint_threshold
+        self.sleep_after = sleep_after
+        self.wake_radius = wake_radius
+
+    def update(self, store, events, grid):
+        """
+        Wake up disturbed creatures and put still ones to sleep, at the end of a tick
+
+        :param store: creature state
+        :type store: CreatureStore
+        :param events: events of this tick, only WALL events are read, they are recorded after any removal
+        :type events: EventQueue
+        :param grid: spatial hash built during this tick, only needed when some creature sleeps.
+            Rows moved by a removal since it was built may wake the wrong creature, which is harmless
+        :type grid: SpatialHash
+        """
+        asleep = store.sleepingMask()
+        idle = store.idleTicks()
+        was_asleep = asleep.copy()
+        if not self.enabled:
+            asleep[:] = False
+            idle[:] = 0
+        else:
+            speed = np.linalg.norm(store.velocities(), axis=1)
+            moving = speed >= self.speed_threshold
+            still = ~moving & (store.jointActivities() < self.joint_threshold)
+            idle[:] = np.where(still, idle + 1, 0)
+
+            disturbed = moving.copy()
+            a, _, _ = events.select(EventQueue.WALL)
+            disturbed[a] = True
+            if asleep.any():
+                disturbed |= self._nearMovers(store, grid, moving & ~asleep, asleep)
+
+            asleep &= ~disturbed
+            idle[disturbed] = 0
+            asleep |= idle >= self.sleep_after
+
+        changed = np.flatnonzero(asleep != was_asleep)
+        for k in changed:
+            store.objects[k].sleeping = bool(asleep[k])
+        self.woken = int(np.count_nonzero(was_asleep & ~asleep))
+        self.fell_asleep = int(np.count_nonzero(asleep & ~was_asleep))
+        self.sleeping_count = int(np.count_nonzero(asleep))
+        self.awake_count = len(asleep) - self.sleeping_count
+
+    def disturb(self, store, rows):
+        """
+        Wake creatures up right away and restart their still tick count, e.g. the creatures of a bite or a bump
+
+        :param rows: store rows, repeats are fine
+        :type rows: numpy.ndarray
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        for k in rows[store.asleep[rows]]:
+            store.objects[k].sleeping = False
+        store.asleep[rows] = False
+        store.idle_ticks[rows] = 0
+
+    def counts(self):
+        """
+        :rtype: dict<str, int>
+        """
+        return {"sleeping": self.sleeping_count, "awake": self.awake_count}
+
+    def _nearMovers(self, store, grid, movers, sleepers):
+        """
+        In class usage only. Sleeping creatures within wake_radius of a moving awake creature
+        """
+        result = np.zeros(len(movers), dtype=bool)
+        if not movers.any():
+            return result
+        radii = store.radii()
+        reach = 2 * (radii.max() if len(radii) else 0) + self.wake_radius
+        i, j = grid.pairsWithin(reach)
+        valid = (i < len(movers)) & (j < len(movers))
+        i, j = i[valid], j[valid]
+        d = np.linalg.norm(store.positions()[i] - store.positions()[j], axis=1)
+        close = d < radii[i] + radii[j] + self.wake_radius
+        i, j = i[close], j[close]
+        result[i[sleepers[i] & movers[j]]] = True
+        result[j[sleepers[j] & movers[i]]] = True
+        return result
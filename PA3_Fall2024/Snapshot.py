@@ -0,0 +1,247 @@
+"""
+Compact versioned binary snapshots of a vivarium's simulation state.
+
+Layout, little endian:
+    header      magic b"VIVS", uint16 version, uint64 tick_count, uint64 eaten_count, uint64 food_eaten_count,
+                3 float64 tank dimensions,
+                uint32 length + utf-8 JSON random generator state,
+                uint32 length + utf-8 JSON list of CreatureStore field names, uint32 creature count
+    creature    uint16 length + class name, uint16 length + registered name,
+                the creature's CreatureStore row: every field in declaration order, packed, at its own dtype,
+                uint16 rows + uint16 columns + float64 rotation_speed values,
+                uint32 node count, then for every node of the creature's subtree in depth first order:
+                3 float64 currentPos, 3 float64 u/v/w angles, uint8 has quaternion, 4 float64 quaternion
+    food        uint32 capacity, uint32 free_count, then for every slot of the FoodPool: 3 float64 position,
+                3 float64 velocity, uint8 alive, uint8 settled, and the int64 free list of capacity entries
+"""
+
+import json
+import struct
+
+import numpy as np
+
+from Point import Point
+from Quaternion import Quaternion
+
+MAGIC = b"VIVS"
+VERSION = 4
+
+_HEADER = struct.Struct("<4sHQQQ3d")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_NODE = struct.Struct("<3d3dB4d")
+
+
+def subtree(component):
+    """
+    Every component under component, itself included, in depth first order
+
+    :rtype: list<Component>
+    """
+    result = []
+    stack = [component]
+    while stack:
+        c = stack.pop()
+        result.append(c)
+        stack.extend(reversed(c.children))
+    return result
+
+
+def storeRowType(store):
+    """
+    Packed little endian record type holding one row of every field of a CreatureStore
+
+    :rtype: numpy.dtype
+    """
+    return np.dtype([(name, np.dtype(dtype).newbyteorder("<"), shape) for name, shape, dtype in store.fields])
+
+
+def _writeString(out, text):
+    data = text.encode("utf-8")
+    out.append(_U16.pack(len(data)))
+    out.append(data)
+
+
+class _Reader:
+    """
+    In module usage only. Sequential reader over a bytes buffer
+    """
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def bytes(self, n):
+        result = bytes(self.data[self.offset:self.offset + n])
+        self.offset += n
+        return result
+
+    def string(self):
+        (n,) = self.unpack(_U16)
+        return self.bytes(n).decode("utf-8")
+
+
+def writeSnapshot(vivarium):
+    """
+    Serialize the simulation state of every creature in a vivarium
+
+    :type vivarium: Vivarium
+    :rtype: bytes
+    """
+    store = vivarium.store
+    out = [_HEADER.pack(MAGIC, VERSION, vivarium.tick_count, vivarium.eaten_count, vivarium.food_eaten_count,
+                        *vivarium.tank_dimensions)]
+
+    rng_state = json.dumps(vivarium.rng.bit_generator.state).encode("utf-8")
+    out.append(_U32.pack(len(rng_state)))
+    out.append(rng_state)
+
+    fields = json.dumps([name for name, _, _ in store.fields]).encode("utf-8")
+    out.append(_U32.pack(len(fields)))
+    out.append(fields)
+
+    row = np.zeros(1, dtype=storeRowType(store))
+    out.append(_U32.pack(len(store)))
+    for i, creature in enumerate(store.objects):
+        _writeString(out, type(creature).__name__)
+        _writeString(out, vivarium.registry.nameOf(creature))
+        for name, _, _ in store.fields:
+            row[name] = getattr(store, name)[i]
+        out.append(row.tobytes())
+
+        speed = np.asarray(creature.rotation_speed or [], dtype=np.float64)
+        speed = speed.reshape(len(speed), -1) if speed.size else np.zeros((0, 0))
+        out.append(_U16.pack(speed.shape[0]))
+        out.append(_U16.pack(speed.shape[1]))
+        out.append(speed.astype("<f8").tobytes())
+
+        nodes = subtree(creature)
+        out.append(_U32.pack(len(nodes)))
+        for node in nodes:
+            q = node.quat
+            out.append(_NODE.pack(*np.asarray(node.currentPos.getCoords(), dtype=np.float64),
+                                  node.uAngle, node.vAngle, node.wAngle,
+                                  q is not None, *((q.s, *q.v) if q is not None else (1, 0, 0, 0))))
+
+    food = vivarium.food
+    out.append(_U32.pack(food.capacity))
+    out.append(_U32.pack(food.free_count))
+    out.append(food.position.astype("<f8").tobytes())
+    out.append(food.velocity.astype("<f8").tobytes())
+    out.append(food.alive.astype(np.uint8).tobytes())
+    out.append(food.settled.astype(np.uint8).tobytes())
+    out.append(food.free.astype("<i8").tobytes())
+    return b"".join(out)
+
+
+def readSnapshot(vivarium, data, creatureClasses):
+    """
+    Restore a vivarium to the state of a snapshot.
+    Creatures already in the tank are reused in order when their class matches, others are built from scratch.
+
+    :type vivarium: Vivarium
+    :param data: bytes produced by writeSnapshot
+    :type data: bytes
+    :param creatureClasses: creature class for every class name that may appear in the snapshot
+    :type creatureClasses: dict<str, type>
+    """
+    reader = _Reader(data)
+    magic, version, tick_count, eaten_count, food_eaten_count, *tank = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise ValueError("not a vivarium snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version}, expected {VERSION}")
+    if list(tank) != [float(d) for d in vivarium.tank_dimensions]:
+        raise ValueError(f"snapshot tank {tank} does not match vivarium tank {vivarium.tank_dimensions}")
+
+    (n,) = reader.unpack(_U32)
+    rng_state = json.loads(reader.bytes(n).decode("utf-8"))
+    (n,) = reader.unpack(_U32)
+    fields = json.loads(reader.bytes(n).decode("utf-8"))
+    store = vivarium.store
+    if fields != [name for name, _, _ in store.fields]:
+        raise ValueError(f"snapshot creature fields {fields} do not match this CreatureStore")
+    row_type = storeRowType(store)
+
+    # current creatures, grouped by class so they can be reused
+    available = {}
+    for creature in list(vivarium.store.objects):
+        available.setdefault(type(creature).__name__, []).append(creature)
+
+    (count,) = reader.unpack(_U32)
+    restored = []
+    for _ in range(count):
+        class_name = reader.string()
+        name = reader.string()
+        row = np.frombuffer(reader.bytes(row_type.itemsize), dtype=row_type)[0]
+        rows, columns = reader.unpack(_U16) + reader.unpack(_U16)
+        speed = np.frombuffer(reader.bytes(8 * rows * columns), dtype="<f8").reshape(rows, columns)
+        (node_count,) = reader.unpack(_U32)
+        nodes = [reader.unpack(_NODE) for _ in range(node_count)]
+
+        if available.get(class_name):
+            creature = available[class_name].pop(0)
+        else:
+            if class_name not in creatureClasses:
+                raise KeyError(f"unknown creature class {class_name} in snapshot")
+            creature = creatureClasses[class_name](Point((0, 0, 0)), vivarium.shaderProg)
+        restored.append((creature, name, row, speed, nodes))
+
+    food = vivarium.food
+    capacity, free_count = reader.unpack(_U32) + reader.unpack(_U32)
+    if capacity != food.capacity:
+        raise ValueError(f"snapshot food capacity {capacity} does not match vivarium food capacity {food.capacity}")
+    food_position = np.frombuffer(reader.bytes(24 * capacity), dtype="<f8").reshape(capacity, 3)
+    food_velocity = np.frombuffer(reader.bytes(24 * capacity), dtype="<f8").reshape(capacity, 3)
+    food_alive = np.frombuffer(reader.bytes(capacity), dtype=np.uint8)
+    food_settled = np.frombuffer(reader.bytes(capacity), dtype=np.uint8)
+    food_free = np.frombuffer(reader.bytes(8 * capacity), dtype="<i8")
+
+    # creatures which are not part of the snapshot leave the tank
+    for leftovers in available.values():
+        for creature in leftovers:
+            vivarium.delObjInTank(creature)
+
+    for creature, name, row, speed, nodes in restored:
+        if creature.store is None:
+            vivarium.addNewObjInTank(creature, name)
+        else:
+            vivarium.nameObjInTank(creature, name)
+        i = creature.store_index
+        for field, _, _ in store.fields:
+            getattr(store, field)[i] = row[field]
+        store.previous[i] = store.position[i]
+        creature.species_id = int(row["species"])
+        creature.bound_radius = float(row["radius"])
+        creature.lod_priority = int(row["lod_priority"])
+        creature.sleeping = bool(row["asleep"])
+        creature.rotation_speed = speed.tolist()
+
+        components = subtree(creature)
+        if len(components) != len(nodes):
+            raise ValueError(f"{type(creature).__name__} has {len(components)} components, snapshot has {len(nodes)}")
+        for node, (x, y, z, u, v, w, has_quat, qs, q0, q1, q2) in zip(components, nodes):
+            if node is not creature:
+                node.currentPos = Point((x, y, z))
+            node.uAngle, node.vAngle, node.wAngle = u, v, w
+            node.quat = Quaternion(qs, q0, q1, q2) if has_quat else None
+            node.markDirty()
+
+    # same row order as when the snapshot was taken, so a restored run replays exactly
+    vivarium.store.reorder([r[0] for r in restored])
+    vivarium.tick_count = tick_count
+    vivarium.eaten_count = eaten_count
+    vivarium.food_eaten_count = food_eaten_count
+    food.position[:] = food_position
+    food.velocity[:] = food_velocity
+    food.alive[:] = food_alive.astype(bool)
+    food.settled[:] = food_settled.astype(bool)
+    food.free[:] = food_free
+    food.free_count = free_count
+    vivarium.rng.bit_generator.state = rng_state
+    vivarium.update()
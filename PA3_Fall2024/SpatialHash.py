@@ -0,0 +1,156 @@
+"""
+Uniform spatial hash grid over the tank, used for neighbor queries between creatures.
+The grid is rebuilt from the CreatureStore position array once per tick, all queries are vectorized with NumPy.
+"""
+
+import math
+
+import numpy as np
+
+from Kernels import NumpyKernels, expandRanges
+
+
+class SpatialHash:
+    """
+    Bucket every point into a cubic cell of a dense grid covering the tank box centered at the origin.
+    Points outside of the box are clamped into the border cells, so queries stay correct for them.
+
+    After rebuild(), `order` lists the point indices sorted by cell and cell c holds
+    order[cellStart[c]:cellStart[c] + cellCount[c]].
+    """
+    cell_size = 0.0
+    dims = None  # numpy.ndarray(3,), number of cells along each axis
+    origin = None  # numpy.ndarray(3,), minimum corner of the grid
+
+    points = None  # numpy.ndarray(N, 3)
+    cells = None  # numpy.ndarray(N, 3), integer cell coordinates of each point
+    order = None
+    cellStart = None
+    cellCount = None
+    kernels = None  # NumpyKernels or a compiled backend, runs pairsWithin
+
+    def __init__(self, tank_dimensions, cell_size=0.5, kernels=None):
+        """
+        :param tank_dimensions: size of the tank along x, y and z
+        :type tank_dimensions: list<float>
+        :param cell_size: edge length of a grid cell, should be about the typical query radius
+        :type cell_size: float
+        :param kernels: kernel backend, NumPy if None
+        :type kernels: NumpyKernels
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size should be positive")
+        self.kernels = kernels if kernels is not None else NumpyKernels()
+        self.cell_size = float(cell_size)
+        extent = np.asarray(tank_dimensions, dtype=np.float64)
+        self.origin = -extent / 2
+        self.dims = np.maximum(np.ceil(extent / self.cell_size).astype(np.int64), 1)
+        self.rebuild(np.zeros((0, 3)))
+
+    def cellOf(self, points):
+        """
+        Integer cell coordinates of points, clamped to the grid
+
+        :rtype: numpy.ndarray(N, 3)
+        """
+        c = np.floor((np.asarray(points, dtype=np.float64) - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(c, 0, self.dims - 1)
+
+    def _key(self, cells):
+        return (cells[..., 0] * self.dims[1] + cells[..., 1]) * self.dims[2] + cells[..., 2]
+
+    def rebuild(self, points):
+        """
+        Rebucket all points. Call once per tick after positions changed.
+        The points are copied, so queries see the positions as they were at rebuild time.
+
+        :param points: positions of all points, usually CreatureStore.positions()
+        :type points: numpy.ndarray(N, 3)
+        """
+        self.points = np.array(points, dtype=np.float64)
+        self.cells = self.cellOf(self.points)
+        keys = self._key(self.cells)
+        self.order = np.argsort(keys, kind="stable")
+        ncells = int(np.prod(self.dims))
+        self.cellCount = np.bincount(keys, minlength=ncells)
+        self.cellStart = np.cumsum(self.cellCount) - self.cellCount
+
+    def _cellMembers(self, cells):
+        """
+        For every row of cells, the point indices inside that cell. Cells outside the grid are empty.
+
+        :return: (owner, members) where members[m] lies in cells[owner[m]]
+        """
+        inside = np.all((cells >= 0) & (cells < self.dims), axis=-1)
+        keys = self._key(np.clip(cells, 0, self.dims - 1))
+        counts = np.where(inside, self.cellCount[keys], 0)
+        owner, slots = expandRanges(self.cellStart[keys], counts)
+        return owner, self.order[slots]
+
+    def _span(self, radius):
+        return max(1, int(math.ceil(radius / self.cell_size)))
+
+    def neighborsWithin(self, point, radius):
+        """
+        Indices of all points within radius of a query point
+
+        :param point: query position
+        :type point: list<float> or numpy.ndarray(3,)
+        :param radius: query radius
+        :type radius: float
+        :return: indices into the points given to the last rebuild
+        :rtype: numpy.ndarray
+        """
+        point = np.asarray(point, dtype=np.float64)
+        lo = self.cellOf(point - radius)
+        hi = self.cellOf(point + radius)
+        grid = np.stack(np.meshgrid(*[np.arange(lo[k], hi[k] + 1) for k in range(3)], indexing="ij"), axis=-1)
+        _, candidates = self._cellMembers(grid.reshape(-1, 3))
+        d = self.points[candidates] - point
+        return candidates[np.einsum("ij,ij->i", d, d) <= radius * radius]
+
+    def neighborsOf(self, points, radius):
+        """
+        For many query points at once, the indices of all points within radius of each of them
+
+        :param points: query positions, e.g. food particles
+        :type points: numpy.ndarray(M, 3)
+        :param radius: query radius
+        :type radius: float
+        :return: (owner, indices) where indices[m] lies within radius of points[owner[m]], ordered by owner
+        :rtype: tuple<numpy.ndarray, numpy.ndarray>
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        span = self._span(radius)
+        r = np.arange(-span, span + 1)
+        offsets = np.stack(np.meshgrid(r, r, r, indexing="ij"), axis=-1).reshape(-1, 3)
+        cells = self.cellOf(points)[:, None, :] + offsets[None, :, :]
+        owner, candidates = self._cellMembers(cells.reshape(-1, 3))
+        owner //= len(offsets)
+        d = self.points[candidates] - points[owner]
+        close = np.einsum("ij,ij->i", d, d) <= radius * radius
+        return owner[close], candidates[close]
+
+    def pairsWithin(self, radius):
+        """
+        All unordered pairs of points closer than radius to each other
+
+        :param radius: pair distance threshold
+        :type radius: float
+        :return: (i, j) index arrays, every pair is reported once with i != j
+        :rtype: tuple<numpy.ndarray, numpy.ndarray>
+        """
+        n = len(self.points)
+        if n < 2:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        span = self._span(radius)
+        r = np.arange(-span, span + 1)
+        offsets = np.stack(np.meshgrid(r, r, r, indexing="ij"), axis=-1).reshape(-1, 3)
+        # half shell: the zero offset plus every offset that is lexicographically positive,
+        # so each pair of cells is visited once
+        positive = (offsets[:, 0] > 0) | ((offsets[:, 0] == 0) & (offsets[:, 1] > 0)) | \
+                   ((offsets[:, 0] == 0) & (offsets[:, 1] == 0) & (offsets[:, 2] >= 0))
+        offsets = offsets[positive]
+
+        return self.kernels.cellPairs(self.points, self.cells, self.order, self.cellStart, self.cellCount, self.dims,
+                                      offsets, radius * radius)
@@ -0,0 +1,499 @@
+"""
+Stream the state of a running vivarium to viewers in other processes on the same machine.
+
+A StateServer publishes one frame per tick over a Unix socket (address is a path) or a localhost TCP socket
+(address is a (host, port) tuple). A StateClient on the other end mirrors every frame into a render-only Vivarium.
+
+Every creature is identified by its registry handle and described by a float32 vector:
+    3 position, 9 orientation (upper 3x3 of postRotationMat),
+    then for every node of its subtree in depth first order: 3 u/v/w angles, 1 has quaternion, 4 quaternion
+
+Messages are a uint32 length followed by a zlib compressed payload, little endian:
+    header      magic b"VIVF", uint8 kind, uint64 tick_count
+    keyframe    uint32 count, then count records
+    delta       uint32 removed count + int64 ids, uint32 added count + records,
+                uint32 changed count + int32 indices + float32 values
+    record      int64 id, uint32 vector length, uint16 length + class name, float32 vector
+Delta indices address the concatenated vectors of the creatures present in both frames, in increasing id order.
+Values which moved less than epsilon since they were last sent are left out. Rounding never accumulates, since
+the server compares against what viewers actually hold. A keyframe is sent every keyframe_interval frames,
+and a viewer joining late gets one as soon as it connects. The server never waits for a viewer: frames a viewer
+is not reading yet are queued, and a viewer whose queue outgrows max_queued skips to a fresh keyframe.
+
+Run a headless vivarium and stream it: python StateStream.py serve [socket path]
+Print what a stream contains: python StateStream.py watch [socket path]
+"""
+
+import collections
+import os
+import select
+import socket
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from Point import Point
+from Quaternion import Quaternion
+from Snapshot import subtree
+
+MAGIC = b"VIVF"
+KEYFRAME = 0
+DELTA = 1
+
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<4sBQ")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_RECORD = struct.Struct("<qI")
+
+# float32 values of a creature before its per node values, and per node
+CREATURE_VALUES = 12
+NODE_VALUES = 8
+
+
+def creatureState(creature):
+    """
+    Everything a viewer needs to draw a creature, as one vector
+
+    :rtype: numpy.ndarray(float32)
+    """
+    nodes = subtree(creature)
+    values = np.empty(CREATURE_VALUES + NODE_VALUES * len(nodes), dtype=np.float32)
+    values[0:3] = creature.currentPos.getCoords()
+    values[3:12] = np.asarray(creature.postRotationMat)[:3, :3].ravel()
+    for k, node in enumerate(nodes):
+        q = node.quat
+        start = CREATURE_VALUES + NODE_VALUES * k
+        values[start:start + NODE_VALUES] = (node.uAngle, node.vAngle, node.wAngle, q is not None,
+                                             *((q.s, *q.v) if q is not None else (1, 0, 0, 0)))
+    return values
+
+
+def applyCreatureState(creature, values):
+    """
+    Pose a creature from a vector made by creatureState
+    """
+    nodes = subtree(creature)
+    if len(values) != CREATURE_VALUES + NODE_VALUES * len(nodes):
+        raise ValueError(f"{type(creature).__name__} has {len(nodes)} components, "
+                         f"state has {len(values)} values")
+    values = values.astype(np.float64)
+    creature.currentPos.coords[:] = values[0:3]
+    rotation = np.identity(4)
+    rotation[:3, :3] = values[3:12].reshape(3, 3)
+    creature.setPostRotation(rotation)
+    for k, node in enumerate(nodes):
+        start = CREATURE_VALUES + NODE_VALUES * k
+        u, v, w, has_quat, qs, q0, q1, q2 = values[start:start + NODE_VALUES]
+        node.uAngle, node.vAngle, node.wAngle = u, v, w
+        node.quat = Quaternion(qs, q0, q1, q2) if has_quat else None
+        node.markDirty()
+
+
+def _openSocket(address):
+    """
+    In module usage only. Unix socket for a path, TCP socket for a (host, port) tuple
+    """
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+
+def _writeRecords(out, records):
+    """
+    In module usage only. records is a list of (id, class name, vector)
+    """
+    out.append(_U32.pack(len(records)))
+    for i, class_name, values in records:
+        name = class_name.encode("utf-8")
+        out.append(_RECORD.pack(i, len(values)))
+        out.append(_U16.pack(len(name)))
+        out.append(name)
+        out.append(values.astype("<f4").tobytes())
+
+
+def _readRecords(data, offset):
+    """
+    In module usage only. Inverse of _writeRecords, returns (records, new offset)
+    """
+    (count,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    records = []
+    for _ in range(count):
+        i, n = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        (length,) = _U16.unpack_from(data, offset)
+        offset += _U16.size
+        class_name = bytes(data[offset:offset + length]).decode("utf-8")
+        offset += length
+        values = np.frombuffer(data, dtype="<f4", count=n, offset=offset).copy()
+        offset += 4 * n
+        records.append((i, class_name, values))
+    return records, offset
+
+
+def _frame(kind, tick, body):
+    payload = zlib.compress(_HEADER.pack(MAGIC, kind, tick) + b"".join(body), 1)
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def _split(baseline, ids, flat):
+    """
+    In module usage only. Write a concatenated vector back into the per creature vectors of baseline
+    """
+    offsets = np.cumsum([len(baseline[i][1]) for i in ids])[:-1]
+    for i, part in zip(ids, np.split(flat, offsets)):
+        baseline[i] = (baseline[i][0], part)
+
+
+class StateServer:
+    """
+    Publishes a vivarium's creature state to every connected viewer. Call publish() once per tick.
+    Sockets are non-blocking and only written to, a viewer which stops reading only grows its own queue.
+    """
+    vivarium = None
+    address = None
+    keyframe_interval = 60
+    epsilon = 1e-4
+    max_queued = 1 << 22  # bytes waiting for one viewer before it is sent a keyframe instead
+
+    sock = None  # listening socket
+    clients = None  # list<socket.socket>
+    queues = None  # dict<socket.socket, collections.deque<bytes>>, messages each viewer has not got yet, oldest first
+    head_sent = None  # dict<socket.socket, int>, bytes of the oldest queued message already written
+    baseline = None  # dict<int, tuple<str, numpy.ndarray>>, id -> (class name, vector) as every viewer holds it
+    frame_count = 0
+    bytes_sent = 0  # total over every viewer
+
+    def __init__(self, vivarium, address, keyframe_interval=60, epsilon=1e-4, max_queued=1 << 22):
+        """
+        :param vivarium: the simulation to publish
+        :type vivarium: Vivarium
+        :param address: Unix socket path, or (host, port) for TCP
+        :type address: str or tuple<str, int>
+        :param keyframe_interval: send the full state every this many frames
+        :type keyframe_interval: int
+        :param epsilon: smallest change of a value worth sending
+        :type epsilon: float
+        :param max_queued: bytes a viewer may fall behind by, it then skips what it missed and gets a keyframe
+        :type max_queued: int
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval should be at least 1")
+        self.vivarium = vivarium
+        self.address = address
+        self.keyframe_interval = keyframe_interval
+        self.epsilon = epsilon
+        self.max_queued = max_queued
+        self.clients = []
+        self.queues = dict()
+        self.head_sent = dict()
+        self.frame_count = 0
+        self.bytes_sent = 0
+
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
+        self.sock = _openSocket(address)
+        if not isinstance(address, str):
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(address)
+        self.sock.listen()
+        self.sock.setblocking(False)
+
+    def capture(self):
+        """
+        Current state of every creature, ordered by id
+
+        :rtype: dict<int, tuple<str, numpy.ndarray>>
+        """
+        registry = self.vivarium.registry
+        creatures = sorted((registry.handleOf(c), c) for c in self.vivarium.store.objects)
+        return {i: (type(c).__name__, creatureState(c)) for i, c in creatures}
+
+    def publish(self):
+        """
+        Send this tick's frame to every viewer, then welcome viewers which connected since the last call
+
+        :return: size of the frame in bytes
+        :rtype: int
+        """
+        current = self.capture()
+        keyframe = None
+        if self.baseline is None or self.frame_count % self.keyframe_interval == 0:
+            self.baseline = current
+            message = keyframe = self._keyframe()
+        else:
+            message = self._delta(current)
+        for client in self.clients:
+            if self.queued(client) + len(message) > self.max_queued:
+                # the viewer fell behind, it skips the frames it did not read and starts over from the current state
+                if keyframe is None:
+                    keyframe = self._keyframe()
+                self._resync(client, keyframe)
+            else:
+                self.queues[client].append(message)
+        self._flush()
+        self._accept()
+        self.frame_count += 1
+        return len(message)
+
+    def queued(self, client):
+        """
+        Bytes waiting to be written to a viewer
+
+        :rtype: int
+        """
+        return sum(len(m) for m in self.queues[client]) - self.head_sent[client]
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+        self.clients = []
+        self.queues.clear()
+        self.head_sent.clear()
+        self.sock.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def _keyframe(self):
+        body = []
+        _writeRecords(body, [(i, c, v) for i, (c, v) in self.baseline.items()])
+        return _frame(KEYFRAME, self.vivarium.tick_count, body)
+
+    def _delta(self, current):
+        removed = [i for i in self.baseline if i not in current]
+        added = [i for i in current if i not in self.baseline]
+        common = sorted(i for i in self.baseline if i in current)
+
+        changed = np.zeros(0, dtype=np.int32)
+        values = np.zeros(0, dtype=np.float32)
+        if common:
+            sent = np.concatenate([self.baseline[i][1] for i in common])
+            new = np.concatenate([current[i][1] for i in common])
+            changed = np.flatnonzero(np.abs(new - sent) > self.epsilon).astype(np.int32)
+            values = new[changed]
+            sent[changed] = values
+            _split(self.baseline, common, sent)
+        for i in removed:
+            del self.baseline[i]
+        for i in added:
+            self.baseline[i] = current[i]
+
+        body = [_U32.pack(len(removed)), np.asarray(removed, dtype="<i8").tobytes()]
+        _writeRecords(body, [(i, *current[i]) for i in added])
+        body += [_U32.pack(len(changed)), changed.astype("<i4").tobytes(), values.astype("<f4").tobytes()]
+        return _frame(DELTA, self.vivarium.tick_count, body)
+
+    def _accept(self):
+        joined = []
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except BlockingIOError:
+                break
+            client.setblocking(False)
+            joined.append(client)
+        if joined:
+            # late joiners start from what every other viewer holds now
+            keyframe = self._keyframe()
+            for client in joined:
+                self.clients.append(client)
+                self.queues[client] = collections.deque([keyframe])
+                self.head_sent[client] = 0
+            self._flush()
+
+    def _resync(self, client, keyframe):
+        """
+        Replace everything queued for a viewer by a keyframe, but the rest of a message it got part of already
+        """
+        queue = self.queues[client]
+        head = queue[0] if queue and self.head_sent[client] > 0 else None
+        queue.clear()
+        if head is not None:
+            queue.append(head)
+        queue.append(keyframe)
+
+    def _flush(self):
+        """
+        Write as much of every viewer's queue as its socket takes without waiting, drop viewers which are gone
+        """
+        for client in list(self.clients):
+            queue = self.queues[client]
+            try:
+                while queue:
+                    sent = self.head_sent[client]
+                    n = client.send(memoryview(queue[0])[sent:])
+                    self.bytes_sent += n
+                    if sent + n < len(queue[0]):
+                        self.head_sent[client] = sent + n
+                        break
+                    queue.popleft()
+                    self.head_sent[client] = 0
+            except BlockingIOError:
+                continue
+            except OSError:
+                client.close()
+                self.clients.remove(client)
+                del self.queues[client]
+                del self.head_sent[client]
+
+
+class StateClient:
+    """
+    Mirrors a StateServer's stream into a render-only Vivarium, built with populate=False and never advanced itself.
+    Call poll() once per rendered frame instead of Vivarium.advance().
+    """
+    vivarium = None
+    creatureClasses = None  # dict<str, type>
+    sock = None
+    buffer = None  # bytearray, received bytes not yet parsed
+    baseline = None  # dict<int, tuple<str, numpy.ndarray>>, same as the server's
+    creatures = None  # dict<int, EnvironmentObject>, server id -> local creature
+    tick_count = 0  # tick of the last frame applied
+    bytes_received = 0
+
+    def __init__(self, vivarium, address, creatureClasses=None):
+        """
+        :param vivarium: render-only vivarium to mirror the stream into
+        :type vivarium: Vivarium
+        :param address: the server's Unix socket path or (host, port)
+        :type address: str or tuple<str, int>
+        :param creatureClasses: creature class for every class name that may appear in the stream, \
+            Prey and Predator if None
+        :type creatureClasses: dict<str, type>
+        """
+        if creatureClasses is None:
+            from Prey import Prey
+            from Predator import Predator
+            creatureClasses = {"Prey": Prey, "Predator": Predator}
+        self.vivarium = vivarium
+        self.creatureClasses = creatureClasses
+        self.buffer = bytearray()
+        self.baseline = dict()
+        self.creatures = dict()
+        self.bytes_received = 0
+        self.sock = _openSocket(address)
+        self.sock.connect(address)
+        self.sock.setblocking(False)
+
+    def poll(self, timeout=0.0):
+        """
+        Apply every frame received so far
+
+        :param timeout: seconds to wait for data when none is there yet
+        :type timeout: float
+        :return: number of frames applied
+        :rtype: int
+        """
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        while ready:
+            try:
+                data = self.sock.recv(1 << 16)
+            except BlockingIOError:
+                break
+            if not data:
+                raise ConnectionError("state server closed the stream")
+            self.buffer += data
+            self.bytes_received += len(data)
+
+        applied = 0
+        while len(self.buffer) >= _LENGTH.size:
+            (n,) = _LENGTH.unpack_from(self.buffer)
+            if len(self.buffer) < _LENGTH.size + n:
+                break
+            payload = zlib.decompress(bytes(self.buffer[_LENGTH.size:_LENGTH.size + n]))
+            del self.buffer[:_LENGTH.size + n]
+            self._apply(payload)
+            applied += 1
+        if applied:
+            self.vivarium.update()
+        return applied
+
+    def close(self):
+        self.sock.close()
+
+    def _apply(self, payload):
+        magic, kind, tick = _HEADER.unpack_from(payload)
+        if magic != MAGIC:
+            raise ValueError("not a vivarium state stream")
+        offset = _HEADER.size
+        if kind == KEYFRAME:
+            records, _ = _readRecords(payload, offset)
+            keep = {r[0] for r in records}
+            for i in [i for i in self.baseline if i not in keep]:
+                self._remove(i)
+            for i, class_name, values in records:
+                self._set(i, class_name, values)
+        elif kind == DELTA:
+            (n,) = _U32.unpack_from(payload, offset)
+            offset += _U32.size
+            removed = np.frombuffer(payload, dtype="<i8", count=n, offset=offset)
+            offset += 8 * n
+            added, offset = _readRecords(payload, offset)
+            (n,) = _U32.unpack_from(payload, offset)
+            offset += _U32.size
+            changed = np.frombuffer(payload, dtype="<i4", count=n, offset=offset)
+            values = np.frombuffer(payload, dtype="<f4", count=n, offset=offset + 4 * n)
+
+            for i in removed:
+                self._remove(int(i))
+            common = sorted(self.baseline)
+            if len(changed):
+                flat = np.concatenate([self.baseline[i][1] for i in common])
+                flat[changed] = values
+                _split(self.baseline, common, flat)
+                # only pose the creatures which had a value changed
+                ends = np.cumsum([len(self.baseline[i][1]) for i in common])
+                for k in np.unique(np.searchsorted(ends, changed, side="right")):
+                    i = common[k]
+                    applyCreatureState(self.creatures[i], self.baseline[i][1])
+            for i, class_name, values in added:
+                self._set(i, class_name, values)
+        else:
+            raise ValueError(f"unknown frame kind {kind}")
+        self.tick_count = tick
+
+    def _set(self, i, class_name, values):
+        creature = self.creatures.get(i)
+        if creature is None or type(creature).__name__ != class_name:
+            if creature is not None:
+                self._remove(i)
+            if class_name not in self.creatureClasses:
+                raise KeyError(f"unknown creature class {class_name} in stream")
+            creature = self.creatureClasses[class_name](Point((0, 0, 0)), self.vivarium.shaderProg)
+            self.vivarium.addNewObjInTank(creature)
+            self.creatures[i] = creature
+        self.baseline[i] = (class_name, values)
+        applyCreatureState(creature, values)
+
+    def _remove(self, i):
+        self.baseline.pop(i, None)
+        creature = self.creatures.pop(i, None)
+        if creature is not None:
+            self.vivarium.delObjInTank(creature)
+
+
+if __name__ == "__main__":
+    from Vivarium import Vivarium
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    path = sys.argv[2] if len(sys.argv) > 2 else "/tmp/vivarium.sock"
+    if mode == "serve":
+        server = StateServer(Vivarium(None, None), path)
+        print(f"streaming on {path}")
+        try:
+            while True:
+                server.vivarium.advance()
+                server.publish()
+                time.sleep(server.vivarium.dt)
+        finally:
+            server.close()
+    else:
+        client = StateClient(Vivarium(None, None, populate=False), path)
+        while True:
+            frames = client.poll(timeout=1.0)
+            print(f"tick {client.tick_count}: {frames} frames, {len(client.creatures)} creatures, "
+                  f"{client.bytes_received} bytes")
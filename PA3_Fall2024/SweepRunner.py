@@ -0,0 +1,162 @@
+"""
+Parameter sweep over headless Vivarium configurations.
+Every configuration of a grid is simulated for a fixed number of ticks in its own worker process, and the summary
+metrics of all runs are collected into one table.
+
+Run it directly for a small example sweep: python SweepRunner.py [ticks]
+"""
+
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Vivarium import Vivarium
+from Prey import Prey
+from Predator import Predator
+
+
+# configuration keys understood by runConfiguration, with their default values
+DEFAULT_CONFIGURATION = {
+    "prey_count": 2,
+    "predator_count": 1,
+    "prey_speed": 0.6,
+    "predator_speed": 0.4,
+    "bound_radius": 0.45,
+    "tank_dimensions": (4, 4, 4),
+    "dt": 1 / 120,
+    "lod": True,
+}
+
+
+def runConfiguration(config, ticks, seed):
+    """
+    Build one headless vivarium from a configuration, simulate it and summarize the run.
+    Module level so that it can be sent to worker processes.
+
+    :param config: configuration values, missing keys take their DEFAULT_CONFIGURATION value
+    :type config: dict
+    :param ticks: number of simulation ticks to run
+    :type ticks: int
+    :param seed: seed of this run's random stream
+    :type seed: numpy.random.SeedSequence
+    :return: the configuration followed by the run's metrics
+    :rtype: dict
+    """
+    config = {**DEFAULT_CONFIGURATION, **config}
+    vivarium = Vivarium(None, None, seed=seed, tank_dimensions=config["tank_dimensions"], populate=False,
+                        dt=config["dt"], lod=config["lod"])
+    prey = vivarium.spawn(Prey, config["prey_count"], "prey",
+                          translation_speed=config["prey_speed"], bound_radius=config["bound_radius"])
+    vivarium.spawn(Predator, config["predator_count"], "predator",
+                   translation_speed=config["predator_speed"], bound_radius=config["bound_radius"])
+
+    # tick each prey was eaten at, prey still alive at the end count as surviving the whole run
+    eaten_at = {}
+    collisions = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        vivarium.animationUpdate()
+        counts = vivarium.events.counts()
+        collisions += counts["eat"] + counts["bounce"]
+        for p in prey:
+            if p.store is None and id(p) not in eaten_at:
+                eaten_at[id(p)] = tick + 1
+    elapsed = time.perf_counter() - start
+
+    survival = [eaten_at.get(id(p), ticks) for p in prey]
+    return {
+        **config,
+        "ticks": ticks,
+        "prey_eaten": len(eaten_at),
+        "prey_survival_ticks": float(np.mean(survival)) if survival else float(ticks),
+        "collisions_per_tick": collisions / ticks if ticks > 0 else 0.0,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+class SweepRunner:
+    """
+    Run every combination of a parameter grid in a process pool.
+
+    The grid maps configuration keys to the list of values to try, e.g. {"prey_count": [2, 8], "prey_speed": [0.3, 0.6]}.
+    Each run gets its own random stream spawned from one root seed, so a sweep is reproducible whatever the number of
+    workers and the order runs finish in.
+    """
+    grid = None  # dict<str, list>
+    ticks = 0
+    seed = 0
+    workers = None
+
+    def __init__(self, grid, ticks=1000, seed=0, workers=None):
+        """
+        :param grid: values to try for each configuration key
+        :type grid: dict<str, list>
+        :param ticks: number of ticks every configuration is simulated for
+        :type ticks: int
+        :param seed: root seed of the sweep
+        :type seed: int
+        :param workers: number of worker processes, all cores if None
+        :type workers: int
+        """
+        unknown = set(grid) - set(DEFAULT_CONFIGURATION)
+        if unknown:
+            raise KeyError(f"unknown configuration keys: {sorted(unknown)}")
+        self.grid = dict(grid)
+        self.ticks = ticks
+        self.seed = seed
+        self.workers = workers if workers is not None else os.cpu_count()
+
+    def configurations(self):
+        """
+        Every combination of the grid values, in a fixed order
+
+        :rtype: list<dict>
+        """
+        keys = list(self.grid)
+        return [dict(zip(keys, values)) for values in itertools.product(*(self.grid[k] for k in keys))]
+
+    def run(self):
+        """
+        Simulate every configuration and collect the results
+
+        :return: one row per configuration, in the order of configurations()
+        :rtype: list<dict>
+        """
+        configs = self.configurations()
+        seeds = np.random.SeedSequence(self.seed).spawn(len(configs))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(runConfiguration, c, self.ticks, s) for c, s in zip(configs, seeds)]
+            return [f.result() for f in futures]
+
+    @staticmethod
+    def formatTable(rows):
+        """
+        Render result rows as a fixed width text table
+
+        :param rows: results returned by run()
+        :type rows: list<dict>
+        :rtype: str
+        """
+        if not rows:
+            return ""
+        columns = list(rows[0])
+
+        def fmt(v):
+            return f"{v:.3f}" if isinstance(v, float) else str(v)
+
+        cells = [[fmt(r[c]) for c in columns] for r in rows]
+        widths = [max(len(c), *(len(row[k]) for row in cells)) for k, c in enumerate(columns)]
+        lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+        lines += ["  ".join(v.rjust(w) for v, w in zip(row, widths)) for row in cells]
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    runner = SweepRunner({"prey_count": [2, 6], "prey_speed": [0.3, 0.6], "tank_dimensions": [(3, 3, 3), (4, 4, 4)]},
+                         ticks=ticks)
+    print(SweepRunner.formatTable(runner.run()))
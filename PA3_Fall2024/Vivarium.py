@@ -8,27 +8,77 @@ Created on 20181028
 modified by Daniel Scrivener
 """
 
+import sys
+import time
+
 import numpy as np
 
-from PA3_Fall2024.Predator import Predator
+from Predator import Predator
 from Point import Point
 from Component import Component
 from ModelTank import Tank
 from EnvironmentObject import EnvironmentObject
 from ModelLinkage import Linkage
 from Prey import Prey
+from CreatureStore import CreatureStore
+from CreatureRegistry import CreatureRegistry
+from SpatialHash import SpatialHash
+from Collision import CollisionDetector
+from SimulationClock import SimulationClock
+from EventQueue import EventQueue
+from Flocking import Flocking
+from SimulationLOD import SimulationLOD
+from SleepSystem import SleepSystem
+from Kernels import loadKernels
+from SignedDistanceField import SignedDistanceField
+from FoodPool import FoodPool
+from FlatSceneGraph import FlatSceneGraph
+import Snapshot
 
 
 class Vivarium(Component):
     """
     The Vivarium for our animation
     """
-    components = None  # List
+    components = None  # List, dense list of every creature in the tank, shared with tank.children
+    registry = None  # CreatureRegistry owning components, gives every creature a stable handle
     c_dict = None
     obj_dict = None
     parent = None  # class that have current context
     tank = None
     tank_dimensions = None
+    store = None  # CreatureStore, struct-of-arrays state of every EnvironmentObject
+    grid = None  # SpatialHash over the tank, rebuilt every tick
+    collision = None  # CollisionDetector
+    collisions = None  # CollisionResult of the current tick
+    events = None  # EventQueue of the current tick, eats/bounces are applied by commitEvents()
+    flocking = None  # Flocking, group behavior of every species with flocking weights
+    lod = None  # SimulationLOD, how often every creature gets its animationUpdate/stepForward
+    sleep = None  # SleepSystem, creatures at rest are skipped entirely
+    kernels = None  # kernel backend of the hot loops, see Kernels
+    sdf = None  # SignedDistanceField of the tank walls and static obstacles
+    sdf_nodes = 64  # most grid nodes of the signed distance field along an axis, the field is coarser in big tanks
+    wall_margin = 0.3  # creatures start turning away this far from a wall or obstacle
+    wall_repulsion = 3.0  # strongest turn away from a wall, change of velocity per second
+    food = None  # FoodPool, every chunk of food in the tank
+    scene_graph = None  # FlatSceneGraph of the whole vivarium, None to update matrices recursively instead
+
+    dt = 1 / 120  # simulated seconds per tick
+    rng = None  # numpy.random.Generator used for every random choice of the simulation
+    clock = None  # SimulationClock, turns rendered frames into fixed simulation steps
+
+    tick_count = 0
+    ticks_per_second = 0.0
+    eaten_count = 0  # prey eaten since construction
+    food_eaten_count = 0  # food particles eaten since construction
+    track_poses = False  # save creatures' joint angles every tick for interpolate(), off for headless runs
+    stepping = False  # whether creatures are running their stepForward, the tank must not change meanwhile
+    pending_adds = None  # list<EnvironmentObject>, added by creatures while stepping, put in the tank by commitEvents
+
+    # bits of CreatureStore.wall_hits, one per tank wall
+    WALL_NEG_X, WALL_POS_X = 1, 2
+    WALL_NEG_Y, WALL_POS_Y = 4, 8
+    WALL_NEG_Z, WALL_POS_Z = 16, 32
 
     ##### BONUS 5(TODO 5 for CS680 Students): Feed your creature
     # Requirements:
@@ -38,11 +88,40 @@ class Vivarium(Component):
     #     the vivarium and remain there within the tank until eaten.
     #     * The food should disappear once it has been eaten. Food is eaten by the first creature that touches it.
 
-    def __init__(self, parent, shaderProg):
+    def __init__(self, parent, shaderProg, seed=None, tank_dimensions=None, populate=True, dt=None, kernels=None,
+                 lod=False):
+        """
+        :param parent: the canvas which owns this vivarium, None when running headless
+        :type parent: Sketch
+        :param shaderProg: compiled shader program. Pass None to build every creature without a GL context, \
+            the vivarium can then only be advanced through run()
+        :type shaderProg: GLProgram
+        :param seed: seed of the simulation random generator, None for a fresh one
+        :type seed: int or numpy.random.SeedSequence
+        :param tank_dimensions: size of the tank along x, y and z, [4, 4, 4] by default
+        :type tank_dimensions: list<float>
+        :param populate: add the default creatures. Set it to False to fill the tank with spawn() instead
+        :type populate: bool
+        :param dt: simulated seconds per tick, 1 / 120 if None. Collisions are swept over the tick, so headless runs \
+            can use a several times coarser step
+        :type dt: float
+        :param kernels: kernel backend, "numpy" or "numba", picked by Kernels.loadKernels if None
+        :type kernels: str
+        :param lod: update creatures far from the camera and from predators less often, see SimulationLOD. \
+            Meant for large headless runs, distant creatures visibly animate at a lower rate
+        :type lod: bool
+        """
         self.parent = parent
+        # a canvas draws interpolated frames, headless runs never look at the saved poses
+        self.track_poses = parent is not None
+        self.kernels = loadKernels(kernels)
+        if dt is not None:
+            self.dt = dt
         self.shaderProg = shaderProg
+        self.rng = np.random.default_rng(seed)
+        self.clock = SimulationClock(self.dt)
 
-        self.tank_dimensions = [4, 4, 4]
+        self.tank_dimensions = list(tank_dimensions) if tank_dimensions is not None else [4, 4, 4]
         tank = Tank(Point((0, 0, 0)), shaderProg, self.tank_dimensions)
         super(Vivarium, self).__init__(Point((0, 0, 0)))
 
@@ -50,44 +129,464 @@ class Vivarium(Component):
         self.addChild(tank)
         self.tank = tank
 
-        # Store all components in one list, for us to access them later
-        self.components = [tank]
+        # Store all components in one list, for us to access them later. The tank only holds creatures, so its
+        # children list doubles as the registry's dense list and removal stays O(1) for both
+        self.registry = CreatureRegistry(tank.children)
+        self.components = self.registry.objects
         self.k_c_dict = dict()
         self.c_k_dict = dict()
         self.obj_dict = dict()
-        # self.addNewObjInTank(Linkage(parent, Point((0, 0, 0)), shaderProg))
-        self.addNewObjInTank(Prey(Point((1, 1, 1)), shaderProg), "prey0")
-        self.addNewObjInTank(Prey(Point((-1, 1, 1)), shaderProg), "prey1")
-        self.addNewObjInTank(Predator(Point((0, 0, 0)), shaderProg), "predator0")
+        self.store = CreatureStore()
+        self.grid = SpatialHash(self.tank_dimensions, kernels=self.kernels)
+        self.collision = CollisionDetector()
+        self.events = EventQueue()
+        self.stepping = False
+        self.pending_adds = []
+        self.flocking = Flocking(kernels=self.kernels)
+        self.lod = SimulationLOD(enabled=lod)
+        self.sleep = SleepSystem()
+        # static obstacles are registered with self.sdf.addSphere()/addBox(), the field is built on first use.
+        # Its memory grows with the cube of the tank side, so the spacing widens once the node budget is reached
+        spacing = max(SignedDistanceField.spacing, max(self.tank_dimensions) / (self.sdf_nodes - 1))
+        self.sdf = SignedDistanceField(self.tank_dimensions, spacing=spacing)
+        self.eaten_count = 0
+        self.food = FoodPool(shaderProg, self.tank_dimensions)
+        self.addChild(self.food)
+        self.food_eaten_count = 0
+        # compiled on the first update()
+        self.scene_graph = FlatSceneGraph()
+        if populate:
+            # self.addNewObjInTank(Linkage(parent, Point((0, 0, 0)), shaderProg))
+            self.addNewObjInTank(Prey(Point((1, 1, 1)), shaderProg), "prey0")
+            self.addNewObjInTank(Prey(Point((-1, 1, 1)), shaderProg), "prey1")
+            self.addNewObjInTank(Predator(Point((0, 0, 0)), shaderProg), "predator0")
 
     def animationUpdate(self):
         """
-        Update all creatures in vivarium
+        Update all creatures in vivarium, this is one fixed simulation step of length dt
+        """
+        self.store.savePrevious()
+        self.events.clear()
+        self.grid.rebuild(self.store.positions())
+        # one bulk collision pass, stepForward reads the result from self.collisions
+        self.collisions = self.collision.detect(self.store, self.grid, self.dt)
+        self.recordCollisions()
+        self.flocking.steer(self.store, self.grid, self.dt)
+
+        # creatures only push events here, nothing leaves the tank until every creature has stepped
+        rows, steps = self.lod.schedule(self.store)
+        awake = ~self.store.sleepingMask()[rows]
+        rows, steps = rows[awake], steps[awake]
+        self.stepping = True
+        for c, n in zip([self.store.objects[k] for k in rows], steps):
+            if c.store_index < 0:
+                # taken out of the tank by a creature which stepped before it
+                continue
+            c.lod_steps = int(n)
+            if self.track_poses:
+                c.savePose(self.tick_count)
+            c.animationUpdate()
+            c.stepForward(self.components, self.tank_dimensions, self)
+            self.store.joint_activity[c.store_index] = c.jointActivity()
+        self.stepping = False
+
+        self.commitEvents()
+        self.integrate()
+        self.containCreatures()
+        self.avoidObstacles()
+        self.food.step(self.dt)
+        if len(self.food) > 0:
+            # creatures moved and may have left the tank since the grid was built at the start of the tick
+            self.grid.rebuild(self.store.positions())
+        eaten, rows = self.food.feed(self.store, self.grid)
+        self.events.pushMany(EventQueue.FOOD, rows, eaten)
+        self.food_eaten_count += len(eaten)
+        self.sleep.update(self.store, self.events, self.grid)
+        self.markCreaturesMoved()
+        self.update()
+        self.tick_count += 1
+
+    def advance(self, elapsed=None):
+        """
+        Run as many fixed simulation steps as the time since the last call is worth.
+        Called once per rendered frame; under load fewer frames are drawn but simulation time is kept.
+
+        :param elapsed: wall time since the last call in seconds, measured by the clock if None
+        :type elapsed: float
+        :return: number of simulation steps that were run
+        :rtype: int
         """
+        steps = self.clock.tick(elapsed)
+        for _ in range(steps):
+            self.animationUpdate()
+        return steps
 
-        for c in self.components[::-1]:
-            if isinstance(c, EnvironmentObject):
-                c.animationUpdate()
-                c.stepForward(self.components, self.tank_dimensions, self)
+    def interpolate(self, alpha=None):
+        """
+        Update every transformation matrix for drawing, with creatures placed alpha of the way from their previous
+        to their current simulated position, and the joint angles of the creatures animated during the last tick
+        blended the same way. Simulation state itself is not changed.
 
+        :param alpha: blend factor in [0, 1], taken from the clock if None
+        :type alpha: float
+        """
+        if alpha is None:
+            alpha = self.clock.alpha()
+        # from the next tick on, joint angles are blended too
+        self.track_poses = True
+        previous = self.store.previousPositions()
+        blended = previous + alpha * (self.store.positions() - previous)
+        poses = []
+        for i, obj in enumerate(self.store.objects):
+            obj.currentPos.coords = blended[i]
+            if obj.pose_tick >= 0 and obj.pose_tick == self.tick_count - 1:
+                poses.append(obj.blendPose(alpha))
+        self.markCreaturesMoved()
         self.update()
+        self.store.rebind()
+        for pose in poses:
+            EnvironmentObject.restorePose(pose)
+        # the next update() has to go back to the simulated positions
+        self.markCreaturesMoved()
+
+    def _updateTree(self, parentTransformationMat, changed):
+        """
+        In class usage only. Evaluate every transformation matrix of the vivarium with the batched scene graph,
+        compiled again whenever the tree changed other than by adding or removing a creature
+        """
+        if self.scene_graph is None:
+            super(Vivarium, self)._updateTree(parentTransformationMat, changed)
+            return
+        if self.scene_graph.isStale():
+            self.scene_graph.compile(self)
+        sleeping = [self.store.objects[k].scene_index for k in np.flatnonzero(self.store.sleepingMask())]
+        self.scene_graph.evaluate(parentTransformationMat, sleeping)
+        self.subtree_dirty = False
+
+    def markCreaturesMoved(self):
+        """
+        Positions are written straight into the store arrays, bypassing the Component setters, so flag every
+        awake creature for the next update(). Sleeping ones do not move, they are flagged again once they wake up.
+        """
+        asleep = self.store.sleepingMask()
+        for obj, a in zip(self.store.objects, asleep):
+            if not a:
+                obj.markDirty()
+
+    def recordCollisions(self):
+        """
+        Turn this tick's collision pass into EAT and BOUNCE events
+        """
+        result = self.collisions
+        self.events.pushMany(EventQueue.EAT, result.eats[:, 0], result.eats[:, 1], result.eat_times)
+        self.events.pushMany(EventQueue.BOUNCE, result.bounces[:, 0], result.bounces[:, 1], result.bounce_times)
+
+    def commitEvents(self):
+        """
+        Apply every event recorded so far this tick, in one deterministic pass: creatures of the same species that
+        bumped into each other bounce apart by reflecting their velocity about the plane between them, then every
+        eaten prey leaves the tank in a single removal pass and the creatures added while stepping join it.
+        """
+        i, j, t = self.events.select(EventQueue.BOUNCE)
+        # whoever bit or bumped into someone is awake again, before removals move rows around
+        a, b, _ = self.events.select(EventQueue.EAT)
+        self.sleep.disturb(self.store, np.concatenate((i, j, a, b)))
+        if len(i) > 0:
+            self.kernels.reflectBounces(self.store.positions(), self.store.velocities(), i, j, t)
+
+        # rows shift when creatures are removed, so look the prey objects up first.
+        # A prey caught by several predators at once is only eaten once
+        eaten = [self.store.objects[k] for k in np.unique(b)]
+        for prey in eaten:
+            self.delObjInTank(prey)
+        self.eaten_count += len(eaten)
+
+        for obj in self.pending_adds:
+            if obj not in self.registry:
+                self.addNewObjInTank(obj)
+        self.pending_adds.clear()
+
+    def integrate(self):
+        """
+        Move every creature along its velocity for one tick
+        """
+        awake = ~self.store.sleepingMask()
+        positions = self.store.positions()
+        positions[awake] += self.store.velocities()[awake] * self.dt
+
+    def avoidObstacles(self):
+        """
+        Steer every creature away from nearby walls and static obstacles, and push out the ones that got inside,
+        with a single gather from the signed distance field.
+        """
+        positions = self.store.positions()
+        if len(positions) == 0:
+            return
+        velocities = self.store.velocities()
+        distance, gradient = self.sdf.sample(positions)
+        clearance = distance - self.store.radii()
+        near = clearance < self.wall_margin
+        if not near.any():
+            return
+
+        normal = gradient[near]
+        normal /= np.maximum(np.linalg.norm(normal, axis=1), 1e-9)[:, None]
+        v = velocities[near]
+        speed = np.linalg.norm(v, axis=1)
+        closeness = 1 - np.clip(clearance[near] / self.wall_margin, 0, 1)
+        v += normal * (closeness * self.wall_repulsion * self.dt)[:, None]
+
+        # overlapping a surface: move out along the normal and reflect the velocity heading into it
+        inside = clearance[near] < 0
+        pushed = np.flatnonzero(near)[inside]
+        positions[pushed] -= clearance[near][inside, None] * normal[inside]
+        # containCreatures already ran this tick, a push out must not leave the tank
+        limit = self._tankLimits()[pushed]
+        positions[pushed] = np.clip(positions[pushed], -limit, limit)
+        into = np.minimum(np.einsum("ij,ij->i", v, normal), 0)
+        v -= 2 * (into * inside)[:, None] * normal
+
+        # turning does not change the creature's speed
+        new_speed = np.linalg.norm(v, axis=1)
+        moving = new_speed > 1e-12
+        v[moving] *= (speed[moving] / new_speed[moving])[:, None]
+        velocities[near] = v
+
+    def containCreatures(self):
+        """
+        Keep every creature's bounding sphere inside the tank in one vectorized pass.
+        A creature that crossed a wall during the tick is mirrored back about it, the velocity component going into a
+        wall is reflected in place,
+        and the walls each creature touched are recorded as bits in store.wall_hits.
+        """
+        positions = self.store.positions()
+        velocities = self.store.velocities()
+        hits = self.store.wallHits()
+
+        limit = self._tankLimits()
+        low = positions < -limit
+        high = positions > limit
+
+        # swept against the tank planes: a creature that crossed a wall during the tick bounced off it at the time of
+        # impact and went back the rest of the way, which puts it at its position mirrored about the wall
+        np.subtract(-2 * limit, positions, out=positions, where=low)
+        np.subtract(2 * limit, positions, out=positions, where=high)
+        # faster than a tank width per tick, the mirror is still outside
+        np.clip(positions, -limit, limit, out=positions)
+        np.abs(velocities, out=velocities, where=low)
+        np.negative(np.abs(velocities), out=velocities, where=high)
+
+        # bit 2k is the negative wall of axis k, bit 2k+1 the positive one
+        hits[:] = (low * np.array([1, 4, 16], dtype=np.uint8)).sum(axis=1) + \
+                  (high * np.array([2, 8, 32], dtype=np.uint8)).sum(axis=1)
+        touched = np.flatnonzero(hits)
+        self.events.pushMany(EventQueue.WALL, touched, None, hits[touched])
+
+    def _tankLimits(self):
+        """
+        In class usage only. Largest coordinate along each axis every creature's center can reach inside the tank
+
+        :rtype: numpy.ndarray(N, 3)
+        """
+        limit = np.asarray(self.tank_dimensions, dtype=np.float64) / 2 - self.store.radii()[:, None]
+        return np.maximum(limit, 0)
+
+    def run(self, ticks=1):
+        """
+        Advance the simulation by a fixed number of ticks as fast as possible, without drawing anything.
+        Works the same with or without a GL context.
+
+        :param ticks: number of animation updates to perform
+        :type ticks: int
+        :return: measured simulation throughput, in ticks per second
+        :rtype: float
+        """
+        if ticks < 0:
+            raise ValueError("ticks should be a non-negative integer")
+        start = time.perf_counter()
+        for _ in range(ticks):
+            self.animationUpdate()
+        elapsed = time.perf_counter() - start
+        self.ticks_per_second = ticks / elapsed if elapsed > 0 else float("inf")
+        return self.ticks_per_second
+
+    def snapshot(self):
+        """
+        Save the simulation state of the whole tank: every creature's position, velocity, Euler angles, quaternion,
+        joint rotation_speed and species data, plus the tick counter and random generator state.
+
+        :return: compact versioned binary, see Snapshot
+        :rtype: bytes
+        """
+        return Snapshot.writeSnapshot(self)
+
+    def restore(self, data):
+        """
+        Bring the tank back to a state saved by snapshot(). Creatures already in the tank are reused when their class
+        matches, so restoring onto a vivarium with the same population does not rebuild any creature.
+        Restoring the same snapshot into several vivariums forks independent runs from it.
+
+        :param data: bytes returned by snapshot()
+        :type data: bytes
+        """
+        Snapshot.readSnapshot(self, data, {"Prey": Prey, "Predator": Predator})
+
+    def applyImpulse(self, obj, impulse):
+        """
+        Change a creature's velocity from outside the simulation, waking it up if it sleeps
+
+        :param obj: a creature in the tank
+        :type obj: EnvironmentObject
+        :param impulse: change of velocity
+        :type impulse: list<float> or numpy.ndarray
+        """
+        self.store.velocity[obj.store_index] += impulse
+        self.sleep.disturb(self.store, [obj.store_index])
+
+    def dropFood(self, position=None):
+        """
+        Drop a chunk of food into the tank, it sinks to the floor and waits there until a creature eats it
+
+        :param position: where the food appears, a random spot in the upper half of the tank if None
+        :type position: list<float> or numpy.ndarray
+        :return: slot of the food in self.food, or -1 if the pool is full
+        :rtype: int
+        """
+        if position is None:
+            half = np.asarray(self.tank_dimensions, dtype=np.float64) / 2 - self.food.food_radius
+            position = self.rng.uniform(-half * (1, 0, 1), half)
+        return self.food.spawn(position)
+
+    def spawn(self, creatureClass, count, name="", **attributes):
+        """
+        Add creatures at random positions inside the tank
+
+        :param creatureClass: class of the creatures, called as creatureClass(position, shaderProg)
+        :type creatureClass: type
+        :param count: number of creatures to add
+        :type count: int
+        :param name: if given, creature k is registered as name + str(k)
+        :type name: str
+        :param attributes: creature attributes to overwrite before it enters the tank, e.g. translation_speed=0.5
+        :return: the new creatures
+        :rtype: list<EnvironmentObject>
+        """
+        half = np.asarray(self.tank_dimensions, dtype=np.float64) / 2
+        result = []
+        for k in range(count):
+            creature = creatureClass(Point(tuple(self.rng.uniform(-half, half))), self.shaderProg)
+            for key, value in attributes.items():
+                setattr(creature, key, value)
+            self.addNewObjInTank(creature, name + str(k) if name else "")
+            result.append(creature)
+        return result
+
+    def neighborsWithin(self, point, radius):
+        """
+        Creatures within radius of a point, as of the start of this tick.
+        Use this in stepForward instead of scanning the whole components list.
+
+        :param point: query position, in tank coordinates
+        :type point: Point or numpy.ndarray
+        :param radius: query radius
+        :type radius: float
+        :rtype: list<EnvironmentObject>
+        """
+        if isinstance(point, Point):
+            point = point.getCoords()
+        return [self.store.objects[i] for i in self.grid.neighborsWithin(point, radius)
+                if i < len(self.store)]
+
+    def nameObjInTank(self, obj, name):
+        """
+        Change the name a creature is registered under, keeping obj_dict, k_c_dict and c_k_dict consistent
+
+        :param obj: a creature in the tank
+        :type obj: Component
+        :param name: new name, "" to unname it
+        :type name: str
+        """
+        old = self.registry.nameOf(obj)
+        if old == name:
+            return
+        if old != "":
+            if self.obj_dict.get(old) is obj:
+                del self.obj_dict[old]
+            for k, v in obj.c_dict.items():
+                k = k + "_" + old
+                # another creature may have been registered under the same name since
+                if self.k_c_dict.get(k) is v:
+                    del self.k_c_dict[k]
+                self.c_k_dict.pop(v, None)
+        self.registry.setName(obj, name)
+        if name != "":
+            self.obj_dict[name] = obj
+            for k, v in obj.c_dict.items():
+                k = k + "_" + name
+                self.k_c_dict[k] = v
+                self.c_k_dict[v] = k
 
     def delObjInTank(self, obj):
-        if isinstance(obj, Component):
-            self.tank.children.remove(obj)
-            self.components.remove(obj)
+        """
+        Remove a creature from the tank in O(1), by object or by handle
+        """
+        if isinstance(obj, int):
+            obj = self.registry.get(obj)
+        if isinstance(obj, Component) and obj in self.registry:
+            self.nameObjInTank(obj, "")
+            self.registry.remove(obj)
+            if self.scene_graph is not None:
+                self.scene_graph.removeSubtree(obj)
+            else:
+                Component.tree_version += 1
+            if isinstance(obj, EnvironmentObject):
+                self.store.remove(obj)
+                obj.registry = None
+                obj.vivarium = None
+            obj.releaseDisplay(True)
             del obj
 
     def addNewObjInTank(self, newComponent, name=""):
-        if isinstance(newComponent, Component):
-            self.tank.addChild(newComponent)
-            self.components.append(newComponent)
-            if name != "":
-                self.obj_dict[name] = newComponent
-                for k, v in newComponent.c_dict.items():
-                    k = k + "_" + name
-                    self.k_c_dict[k] = v
-                    self.c_k_dict[v] = k
+        """
+        Put a creature in the tank
+
+        :return: handle of the creature in self.registry, -1 if newComponent is not a Component
+        :rtype: int
+        """
+        if not isinstance(newComponent, Component):
+            return -1
+        handle = self.registry.add(newComponent)
+        # a creature which was in a tank before gave its meshes back when it was removed
+        newComponent.acquireDisplay(True)
+        # the registry fills tank.children directly, link the creature to the tank as addChild() would
+        newComponent.parentComponent = self.tank
+        newComponent.parentMat = None
+        if self.scene_graph is not None:
+            self.scene_graph.appendSubtree(newComponent)
+        else:
+            Component.tree_version += 1
+        newComponent.markDirty()
+        self.nameObjInTank(newComponent, name)
         if isinstance(newComponent, EnvironmentObject):
             # add environment components list reference to this new object's
             newComponent.env_obj_list = self.components
+            newComponent.registry = self.registry
+            newComponent.vivarium = self
+            i = self.store.add(newComponent)
+            if self.lod.enabled:
+                # spread the updates of low detail creatures over ticks
+                self.store.lod_pending[i] = i % self.lod.intervals[-1]
+            if isinstance(newComponent.translation_speed, (int, float)) and newComponent.translation_speed > 0:
+                # start swimming in a random direction
+                direction = self.rng.normal(size=3)
+                direction /= np.linalg.norm(direction)
+                self.store.velocity[i] = direction * newComponent.translation_speed
+        return handle
+
+
+if __name__ == "__main__":
+    # headless batch run: python Vivarium.py [ticks]
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    vivarium = Vivarium(None, None)
+    tps = vivarium.run(ticks)
+    print(f"{ticks} ticks, {tps:.1f} ticks/s")
@@ -0,0 +1,71 @@
+"""
+The modules import each other by bare name and load their meshes from paths relative to PA3_Fall2024,
+so every test runs from there. Shared vivarium factories live here as fixtures.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# the shape modules read their meshes when they are imported, before any fixture runs
+os.chdir(ROOT)
+
+from Predator import Predator  # noqa: E402
+from Prey import Prey  # noqa: E402
+from Vivarium import Vivarium  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def packageDirectory(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def makeVivarium():
+    """
+    Factory of headless vivariums holding prey named prey0, prey1... and predators named predator0...
+    """
+    def make(prey=3, predators=0, seed=0, **kwargs):
+        vivarium = Vivarium(None, None, seed=seed, populate=False, **kwargs)
+        if prey:
+            vivarium.spawn(Prey, prey, "prey")
+        if predators:
+            vivarium.spawn(Predator, predators, "predator")
+        return vivarium
+    return make
+
+
+@pytest.fixture
+def sleepyVivarium(makeVivarium):
+    """
+    Five prey, all asleep
+    """
+    vivarium = makeVivarium(prey=5)
+    # everyone counts as still, so the whole tank falls asleep after one tick
+    vivarium.sleep.speed_threshold = np.inf
+    vivarium.sleep.joint_threshold = np.inf
+    vivarium.sleep.sleep_after = 1
+    vivarium.animationUpdate()
+    vivarium.animationUpdate()
+    assert vivarium.store.sleepingMask().all()
+    return vivarium
+
+
+@pytest.fixture
+def fedVivarium(makeVivarium):
+    """
+    Four prey and a predator, five ticks into a run with food sinking through the tank and some already eaten
+    """
+    vivarium = makeVivarium(prey=4, predators=1, seed=4)
+    # some food right on top of creatures, some sinking through the tank
+    for position in vivarium.store.positions():
+        vivarium.dropFood(position)
+    for _ in range(20):
+        vivarium.dropFood()
+    for _ in range(5):
+        vivarium.animationUpdate()
+    return vivarium
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from Collision import timeOfImpact
+
+
+def toi(offset, velocity, reach, dt):
+    return timeOfImpact(np.array([offset], dtype=float), np.array([velocity], dtype=float), np.array([reach]), dt)[0]
+
+
+def test_timeOfImpact_simple_cases():
+    # head on, 2 apart, closing at 1 per second, touching at distance 1
+    assert toi((2, 0, 0), (-1, 0, 0), 1.0, 2.0) == pytest.approx(1.0)
+    # the contact is after the step
+    assert toi((2, 0, 0), (-1, 0, 0), 1.0, 0.5) == np.inf
+    # overlapping already
+    assert toi((0.5, 0, 0), (1, 0, 0), 1.0, 0.1) == 0
+    # moving apart, side by side, or passing by too far away
+    assert toi((2, 0, 0), (1, 0, 0), 1.0, 10.0) == np.inf
+    assert toi((2, 0, 0), (0, 0, 0), 1.0, 10.0) == np.inf
+    assert toi((2, 1.5, 0), (-1, 0, 0), 1.0, 10.0) == np.inf
+
+
+def test_timeOfImpact_is_the_first_contact():
+    rng = np.random.default_rng(0)
+    k, dt = 2000, 0.5
+    offset = rng.uniform(-3, 3, size=(k, 3))
+    velocity = rng.normal(scale=4, size=(k, 3))
+    reach = rng.uniform(0.2, 1.0, size=k)
+    t = timeOfImpact(offset, velocity, reach, dt)
+
+    samples = np.linspace(0, dt, 401)
+    distance = np.linalg.norm(offset[:, None, :] + velocity[:, None, :] * samples[None, :, None], axis=-1)
+    finite = np.isfinite(t)
+    assert finite.any() and not finite.all()
+    # touching at t, and apart before it
+    at = np.linalg.norm(offset[finite] + velocity[finite] * t[finite, None], axis=1)
+    started_apart = t[finite] > 0
+    assert np.allclose(at[started_apart], reach[finite][started_apart])
+    before = samples[None, :] < t[finite, None] - 1e-9
+    assert np.all((distance[finite] > reach[finite, None] - 1e-9) | ~before)
+    # never closer than reach during the step when no contact is reported
+    assert np.all(distance[~finite] > reach[~finite, None] - 1e-9)
+
+
+@pytest.fixture
+def crossingPair(makeVivarium):
+    """
+    A predator and a prey swimming through each other within one coarse tick
+    """
+    vivarium = makeVivarium(prey=1, predators=1)
+    predator, prey = vivarium.store.objects[1], vivarium.store.objects[0]
+    vivarium.store.positions()[[predator.store_index, prey.store_index]] = [(-1.5, 0, 0), (1.5, 0, 0)]
+    vivarium.store.velocities()[[predator.store_index, prey.store_index]] = [(8, 0, 0), (-8, 0, 0)]
+    return vivarium, predator, prey
+
+
+def test_coarse_step_swept_detection_catches_what_discrete_misses(crossingPair):
+    vivarium, predator, prey = crossingPair
+    store, dt = vivarium.store, 0.25
+    # the two are apart at both ends of the step
+    assert len(vivarium.collision.detect(store).eats) == 0
+    end = store.positions() + store.velocities() * dt
+    assert np.linalg.norm(end[0] - end[1]) > store.radii().sum()
+
+    for grid in (None, vivarium.grid):
+        if grid is not None:
+            grid.rebuild(store.positions())
+        result = vivarium.collision.detect(store, grid, dt)
+        assert result.eats.tolist() == [[predator.store_index, prey.store_index]]
+        gap = 3.0 - store.radii().sum()
+        assert result.eat_times[0] == pytest.approx(gap / 16)
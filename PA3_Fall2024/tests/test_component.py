@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from Component import Component
+from Point import Point
+
+
+def chain():
+    root = Component(Point((0, 0, 0)))
+    child = Component(Point((0, 0, 1)))
+    root.addChild(child)
+    root.update()
+    return root, child
+
+
+def test_batch_updates_once_on_exit():
+    root, child = chain()
+    before = Component.avoided_updates
+    with root.batch():
+        child.setCurrentPosition(Point((1, 0, 0)))
+        child.setCurrentAngle(30, child.wAxis)
+        assert np.allclose(child.transformationMat[:3, 3], (0, 0, 1))
+    assert Component.avoided_updates == before + 2
+    assert np.allclose(child.transformationMat[:3, 3], (1, 0, 0))
+    assert Component.batches == []
+
+
+def test_exception_inside_batch_leaves_no_open_batch():
+    root, child = chain()
+    with pytest.raises(RuntimeError):
+        with root.batch():
+            child.setCurrentPosition(Point((1, 0, 0)))
+            raise RuntimeError("failed edit")
+    assert Component.batches == []
+    # setters update eagerly again, and the interrupted edit is picked up
+    root.setCurrentPosition(Point((0, 1, 0)))
+    assert np.allclose(child.transformationMat[:3, 3], (1, 1, 0))
+
+
+def test_interleaved_batches_flush_each_other():
+    first, a = chain()
+    second, b = chain()
+    outer = first.batch()
+    inner = second.batch()
+    outer.__enter__()
+    inner.__enter__()
+    a.setCurrentPosition(Point((2, 0, 0)))
+    outer.__exit__(None, None, None)
+    # the first block closed while the second is open, its update waits for the second one
+    b.setCurrentPosition(Point((3, 0, 0)))
+    inner.__exit__(None, None, None)
+    assert Component.batches == []
+    assert np.allclose(a.transformationMat[:3, 3], (2, 0, 0))
+    assert np.allclose(b.transformationMat[:3, 3], (3, 0, 0))
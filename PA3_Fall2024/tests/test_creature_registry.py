@@ -0,0 +1,52 @@
+from CreatureRegistry import CreatureRegistry
+
+
+def test_handles_stay_valid_across_swap_remove():
+    registry = CreatureRegistry()
+    objects = [object() for _ in range(4)]
+    handles = [registry.add(o, f"o{k}") for k, o in enumerate(objects)]
+
+    assert registry.remove(handles[1]) is objects[1]
+    # the last object took the freed position, every other handle still resolves
+    assert registry.objects == [objects[0], objects[3], objects[2]]
+    assert registry.names == ["o0", "o3", "o2"]
+    for k in (0, 2, 3):
+        assert registry.get(handles[k]) is objects[k]
+        assert registry.handleOf(objects[k]) == handles[k]
+
+
+def test_stale_handle_does_not_resolve_after_slot_reuse():
+    registry = CreatureRegistry()
+    first = object()
+    handle = registry.add(first)
+    registry.remove(first)
+    assert registry.get(handle) is None
+    assert registry.remove(handle) is None
+
+    second = object()
+    reused = registry.add(second)
+    # same slot, newer generation
+    assert reused & CreatureRegistry.SLOT_MASK == handle & CreatureRegistry.SLOT_MASK
+    assert reused != handle
+    assert registry.get(handle) is None
+    assert registry.get(reused) is second
+    assert first not in registry and second in registry
+
+
+def test_add_twice_keeps_handle():
+    registry = CreatureRegistry()
+    o = object()
+    assert registry.add(o) == registry.add(o)
+    assert len(registry) == 1
+
+
+def test_vivarium_handle_goes_stale_after_removal(makeVivarium):
+    vivarium = makeVivarium(prey=2)
+    victim = vivarium.components[0]
+    handle = vivarium.registry.handleOf(victim)
+    vivarium.delObjInTank(handle)
+    assert vivarium.registry.get(handle) is None
+    assert len(vivarium.store) == 1
+
+    vivarium.spawn(type(victim), 1)
+    assert vivarium.registry.get(handle) is None
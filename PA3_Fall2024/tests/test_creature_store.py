@@ -0,0 +1,40 @@
+import numpy as np
+
+from Point import Point
+
+
+def assertBound(vivarium, creature, expected):
+    row = vivarium.store.position[creature.store_index]
+    assert np.shares_memory(creature.currentPos.coords, row)
+    assert np.allclose(row, expected)
+    vivarium.update()
+    assert np.allclose(creature.transformationMat[:3, 3], row)
+
+
+def test_setCurrentPosition_writes_into_store_row(makeVivarium):
+    vivarium = makeVivarium(prey=2)
+    creature = vivarium.components[0]
+    creature.setCurrentPosition(Point((0.5, 0.5, 0.5)))
+    assertBound(vivarium, creature, (0.5, 0.5, 0.5))
+
+
+def test_setDefaultPosition_and_reset_write_into_store_row(makeVivarium):
+    vivarium = makeVivarium(prey=2)
+    creature = vivarium.components[1]
+    creature.setDefaultPosition(Point((-0.5, 0.25, 0.0)))
+    assertBound(vivarium, creature, (-0.5, 0.25, 0.0))
+
+    creature.setCurrentPosition(Point((1.0, 1.0, 1.0)))
+    creature.reset("position")
+    assertBound(vivarium, creature, (-0.5, 0.25, 0.0))
+    # the default position is not aliased to the store row
+    assert not np.shares_memory(creature.defaultPos.coords, vivarium.store.position)
+
+
+def test_positions_stay_in_sync_while_simulating(makeVivarium):
+    vivarium = makeVivarium(prey=2)
+    creature = vivarium.components[0]
+    creature.setCurrentPosition(Point((0.5, 0.0, 0.0)))
+    for _ in range(5):
+        vivarium.animationUpdate()
+    assert np.array_equal(creature.currentPos.coords, vivarium.store.position[creature.store_index])
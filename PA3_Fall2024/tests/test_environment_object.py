@@ -0,0 +1,46 @@
+from Point import Point
+from Prey import Prey
+
+
+def test_rmCollisionObj_removes_creature_from_vivarium(makeVivarium):
+    vivarium = makeVivarium()
+    first, second, third = vivarium.components
+    handle = vivarium.registry.handleOf(second)
+    name = vivarium.registry.nameOf(second)
+    third_name = vivarium.registry.nameOf(third)
+
+    first.rmCollisionObj(second)
+
+    assert vivarium.registry.get(handle) is None
+    assert second not in vivarium.registry
+    assert len(vivarium.store) == len(vivarium.components) == 2
+    assert second not in vivarium.store.objects
+    assert second.store is None and second.vivarium is None
+    assert name not in vivarium.obj_dict
+    for k, v in second.c_dict.items():
+        assert k + "_" + name not in vivarium.k_c_dict
+        assert v not in vivarium.c_k_dict
+    # the last creature was swapped into the freed row and keeps its names
+    assert third.store_index == 1 and vivarium.store.objects[1] is third
+    assert vivarium.obj_dict[third_name] is third
+    for k, v in third.c_dict.items():
+        assert vivarium.c_k_dict[v] == k + "_" + third_name
+        assert vivarium.k_c_dict[k + "_" + third_name] is v
+
+
+def test_addCollisionObj_adds_creature_to_vivarium(makeVivarium):
+    vivarium = makeVivarium()
+    newcomer = Prey(Point((0, 0, 0)), None)
+
+    vivarium.components[0].addCollisionObj(newcomer)
+
+    assert newcomer in vivarium.registry
+    assert len(vivarium.store) == len(vivarium.components) == 4
+    assert vivarium.store.objects[newcomer.store_index] is newcomer
+    assert newcomer.parentComponent is vivarium.tank
+    assert newcomer.vivarium is vivarium
+    assert vivarium.scene_graph.isStale()
+
+    # adding it a second time changes nothing
+    vivarium.components[0].addCollisionObj(newcomer)
+    assert len(vivarium.components) == 4
@@ -0,0 +1,44 @@
+import numpy as np
+
+from EventQueue import EventQueue
+
+
+def test_select_sorts_by_a_then_b():
+    events = EventQueue()
+    events.pushMany(EventQueue.BOUNCE, [3, 1, 3, 0], [2, 5, 0, 4], [0.1, 0.2, 0.3, 0.4])
+    events.push(EventQueue.EAT, 9, 8)
+    a, b, data = events.select(EventQueue.BOUNCE)
+    assert a.tolist() == [0, 1, 3, 3]
+    assert b.tolist() == [4, 5, 0, 2]
+    assert data.tolist() == [0.4, 0.2, 0.3, 0.1]
+    assert events.counts() == {"eat": 1, "bounce": 4, "wall": 0, "food": 0}
+
+
+def test_grows_and_keeps_events():
+    events = EventQueue(capacity=2)
+    events.pushMany(EventQueue.WALL, np.arange(5), data=np.arange(5) * 2.0)
+    events.push(EventQueue.FOOD, 7, 1)
+    assert events.capacity >= 6
+    assert len(events) == 6
+    a, b, data = events.select(EventQueue.WALL)
+    assert a.tolist() == list(range(5))
+    assert b.tolist() == [-1] * 5
+    assert data.tolist() == [0.0, 2.0, 4.0, 6.0, 8.0]
+
+    capacity = events.capacity
+    events.clear()
+    assert len(events) == 0
+    assert events.capacity == capacity
+
+
+def test_prey_caught_twice_is_eaten_once(makeVivarium):
+    vivarium = makeVivarium(prey=3, predators=2)
+    prey = vivarium.store.objects[1]
+    predators = [o for o in vivarium.store.objects if o.species_id != prey.species_id]
+    for predator in predators:
+        vivarium.events.push(EventQueue.EAT, predator.store_index, prey.store_index)
+
+    vivarium.commitEvents()
+    assert prey not in vivarium.registry
+    assert vivarium.eaten_count == 1
+    assert len(vivarium.store) == 4
@@ -0,0 +1,80 @@
+import numpy as np
+
+from Component import Component
+from Point import Point
+from Prey import Prey
+
+
+def expectedWorld(node, parentMat):
+    world = parentMat @ node.localMatrix()
+    yield node, world
+    for c in node.children:
+        yield from expectedWorld(c, world)
+
+
+def test_sleeping_creatures_skip_local_matrices(monkeypatch, sleepyVivarium):
+    vivarium = sleepyVivarium
+    calls = []
+    localMatrix = Component.localMatrix
+
+    def counting(self):
+        calls.append(self)
+        return localMatrix(self)
+
+    monkeypatch.setattr(Component, "localMatrix", counting)
+    for _ in range(10):
+        vivarium.animationUpdate()
+    assert [c for c in calls if c is not vivarium] == []
+
+
+def test_woken_creature_catches_up(sleepyVivarium):
+    vivarium = sleepyVivarium
+    creature = vivarium.components[2]
+    part = creature.children[0]
+    frozen = part.transformationMat.copy()
+    part.vAngle += 10
+    part.markDirty()
+    vivarium.update()
+    assert np.array_equal(part.transformationMat, frozen)
+
+    vivarium.sleep.speed_threshold = 1e-3
+    vivarium.applyImpulse(creature, [0.5, 0, 0])
+    vivarium.animationUpdate()
+    assert not creature.sleeping
+    for node, world in expectedWorld(creature, vivarium.tank.transformationMat):
+        assert np.allclose(node.transformationMat, world)
+
+
+def test_add_and_remove_patch_the_graph(monkeypatch, makeVivarium):
+    vivarium = makeVivarium(prey=6, predators=2)
+    vivarium.animationUpdate()
+    graph = vivarium.scene_graph
+    compiles = []
+    compile = graph.compile
+    monkeypatch.setattr(graph, "compile", lambda root: compiles.append(root) or compile(root))
+
+    victim = vivarium.store.objects[2]
+    vivarium.delObjInTank(victim)
+    assert victim.scene is None
+    # a creature built after the graph was compiled
+    newcomer = Prey(Point((0.5, 0.5, 0.5)), None)
+    vivarium.addNewObjInTank(newcomer)
+    for _ in range(3):
+        vivarium.animationUpdate()
+    assert compiles == []
+    assert len(graph) == sum(1 for _ in expectedWorld(vivarium, np.identity(4)))
+    for node, world in expectedWorld(vivarium, np.identity(4)):
+        assert node.scene is graph
+        assert np.allclose(node.transformationMat, world)
+
+
+def test_removed_rows_are_packed_by_compile(makeVivarium):
+    vivarium = makeVivarium(prey=4)
+    vivarium.update()
+    graph = vivarium.scene_graph
+    for creature in list(vivarium.store.objects[:3]):
+        vivarium.delObjInTank(creature)
+    assert graph.isStale()
+    vivarium.update()
+    assert graph.removed == 0
+    assert graph.count == len(graph)
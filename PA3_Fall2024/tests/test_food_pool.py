@@ -0,0 +1,46 @@
+import numpy as np
+
+from CreatureStore import CreatureStore
+from FoodPool import FoodPool
+from Point import Point
+from Prey import Prey
+from SpatialHash import SpatialHash
+
+
+def denseFeed(food, store):
+    """
+    Reference: every particle against every creature
+    """
+    slots = np.flatnonzero(food.alive)
+    d = food.position[slots, None, :] - store.positions()[None, :, :]
+    d2 = np.einsum("ijk,ijk->ij", d, d)
+    reach = store.radii()[None, :] + food.food_radius
+    d2[d2 > reach * reach] = np.inf
+    nearest = np.argmin(d2, axis=1)
+    touched = np.isfinite(d2[np.arange(len(slots)), nearest])
+    return slots[touched], nearest[touched]
+
+
+def test_feed_matches_dense_search():
+    rng = np.random.default_rng(7)
+    tank = [4, 4, 4]
+    store = CreatureStore()
+    for _ in range(40):
+        store.add(Prey(Point(tuple(rng.uniform(-1.8, 1.8, 3))), None))
+    # two creatures equally close to a particle, the lower row eats it
+    store.positions()[1] = store.positions()[0] + (0.2, 0, 0)
+    grid = SpatialHash(tank)
+    grid.rebuild(store.positions())
+
+    food = FoodPool(None, tank, capacity=64)
+    reference = FoodPool(None, tank, capacity=64)
+    for position in np.concatenate(([store.positions()[0] + (0.1, 0, 0)], rng.uniform(-2, 2, (50, 3)))):
+        food.spawn(position)
+        reference.spawn(position)
+
+    expected = denseFeed(reference, store)
+    eaten, rows = food.feed(store, grid)
+    assert len(eaten) > 1
+    assert np.array_equal(eaten, expected[0])
+    assert np.array_equal(rows, expected[1])
+    assert not food.alive[eaten].any()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from Kernels import NumpyKernels, NumbaKernels, numba
+
+
+def bouncingPairs():
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(-2, 2, size=(8, 3))
+    velocities = rng.normal(size=(8, 3))
+    # creatures 0 and 1 sit on top of each other with the same velocity
+    positions[1] = positions[0]
+    velocities[1] = velocities[0]
+    i = np.array([0, 2, 3, 2], dtype=np.int64)
+    j = np.array([1, 4, 5, 6], dtype=np.int64)
+    t = np.array([0.0, 0.25, 0.5, 0.0])
+    return positions, velocities, i, j, t
+
+
+def test_reflectBounces_coincident_pair_stays_bounded():
+    positions, velocities, i, j, t = bouncingPairs()
+    speed = np.linalg.norm(velocities, axis=1)
+    NumpyKernels().reflectBounces(positions, velocities, i, j, t)
+    assert np.all(np.isfinite(velocities))
+    assert np.all(np.linalg.norm(velocities, axis=1) <= speed * (1 + 1e-12))
+
+
+def test_reflectBounces_crowd_does_not_speed_up():
+    # a creature heading into three others at once
+    positions = np.array([[0.0, 0, 0], [0.5, 0, 0], [0.5, 0.1, 0], [0.5, -0.1, 0]])
+    velocities = np.array([[1.0, 0, 0], [0, 0, 0], [0, 0, 0], [0, 0, 0]])
+    i = np.zeros(3, dtype=np.int64)
+    j = np.array([1, 2, 3], dtype=np.int64)
+    NumpyKernels().reflectBounces(positions, velocities, i, j, np.zeros(3))
+    assert velocities[0, 0] < 0
+    assert np.isclose(np.linalg.norm(velocities[0]), 1.0)
+
+
+@pytest.mark.skipif(numba is None, reason="numba is not installed")
+def test_reflectBounces_numba_matches_numpy():
+    positions, expected, i, j, t = bouncingPairs()
+    actual = expected.copy()
+    NumpyKernels().reflectBounces(positions, expected, i, j, t)
+    NumbaKernels().reflectBounces(positions, actual, i, j, t)
+    assert np.array_equal(actual, expected)
+
+
+@pytest.mark.skipif(numba is None, reason="numba is not installed")
+def test_flockingSums_numba_matches_numpy():
+    positions, velocities, _, _, _ = bouncingPairs()
+    a = np.array([0, 1, 2, 2, 5], dtype=np.int64)
+    b = np.array([1, 0, 3, 4, 6], dtype=np.int64)
+    expected = NumpyKernels().flockingSums(positions, velocities, a, b)
+    actual = NumbaKernels().flockingSums(positions, velocities, a, b)
+    for x, y in zip(actual, expected):
+        assert np.array_equal(x, y)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from NeighborList import NeighborList
+
+
+def freshPairs(vivarium, radius):
+    vivarium.grid.rebuild(vivarium.store.positions())
+    i, j = vivarium.grid.pairsWithin(radius)
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    order = np.lexsort((j, i))
+    return i[order].tolist(), j[order].tolist()
+
+
+def query(neighbors, vivarium, radius):
+    vivarium.grid.rebuild(vivarium.store.positions())
+    i, j = neighbors.pairs(vivarium.store, vivarium.grid, radius)
+    return i.tolist(), j.tolist()
+
+
+def test_list_stays_exact_while_creatures_move_less_than_half_the_skin(makeVivarium):
+    vivarium = makeVivarium(prey=60)
+    rng = np.random.default_rng(5)
+    vivarium.store.positions()[:] = rng.uniform(-1.8, 1.8, size=(60, 3))
+    neighbors, radius = NeighborList(skin=0.3), 0.6
+    assert query(neighbors, vivarium, radius) == freshPairs(vivarium, radius)
+    reference = vivarium.store.positions().copy()
+
+    for _ in range(10):
+        # random walk, every creature stays within skin / 2 of where the list was built
+        step = rng.normal(scale=0.05, size=(60, 3))
+        moved = vivarium.store.positions() + step - reference
+        length = np.linalg.norm(moved, axis=1, keepdims=True)
+        moved *= np.minimum(1, 0.149 / np.maximum(length, 1e-12))
+        vivarium.store.positions()[:] = reference + moved
+        assert query(neighbors, vivarium, radius) == freshPairs(vivarium, radius)
+        assert not neighbors.rebuilt
+    assert neighbors.builds == 1
+
+
+def test_list_is_rebuilt_when_it_could_miss_a_pair(makeVivarium):
+    vivarium = makeVivarium(prey=10)
+    neighbors, radius = NeighborList(skin=0.3), 0.6
+    query(neighbors, vivarium, radius)
+
+    vivarium.store.positions()[3] += (0.16, 0, 0)
+    assert query(neighbors, vivarium, radius) == freshPairs(vivarium, radius)
+    assert neighbors.rebuilt
+
+    assert query(neighbors, vivarium, radius + 0.1) == freshPairs(vivarium, radius + 0.1)
+    assert neighbors.rebuilt
+
+    vivarium.delObjInTank(vivarium.store.objects[0])
+    assert query(neighbors, vivarium, radius + 0.1) == freshPairs(vivarium, radius + 0.1)
+    assert neighbors.rebuilt
+    assert neighbors.rebuildRate() == 1.0
@@ -0,0 +1,37 @@
+from SharedMesh import SharedMesh
+
+
+def _refcounts():
+    return {key: mesh.refcount for key, mesh in SharedMesh.cache.items()}
+
+
+def test_removed_creature_gives_its_meshes_back(makeVivarium):
+    SharedMesh.forgetBuffers()
+    vivarium = makeVivarium(prey=2)
+    full = _refcounts()
+    victim = vivarium.tank.children[0]
+
+    vivarium.delObjInTank(victim)
+    after = _refcounts()
+    assert all(after.get(key, 0) <= count for key, count in full.items())
+    assert sum(after.values()) < sum(full.values())
+
+    vivarium.addNewObjInTank(victim)
+    assert _refcounts() == full
+
+
+def test_last_release_drops_the_mesh():
+    SharedMesh.forgetBuffers()
+    mesh = SharedMesh.acquire("shape", None, [[0.0] * 11], [[0, 0, 0]])
+    assert SharedMesh.acquire("shape", None, [[0.0] * 11], [[0, 0, 0]]) is mesh
+    mesh.release()
+    assert ("shape", None) in SharedMesh.cache
+    mesh.release()
+    assert ("shape", None) not in SharedMesh.cache
+
+
+def test_forget_buffers_empties_the_cache(makeVivarium):
+    makeVivarium(prey=1)
+    assert SharedMesh.cache
+    SharedMesh.forgetBuffers()
+    assert not SharedMesh.cache
@@ -0,0 +1,44 @@
+import numpy as np
+
+from SignedDistanceField import SignedDistanceField
+
+
+def _field():
+    sdf = SignedDistanceField([4, 4, 4], spacing=0.1)
+    sdf.addSphere((1.0, 0.5, 0.0), 0.6)
+    sdf.addBox((-1.0, -1.0, 0.5), (0.4, 0.3, 0.5))
+    return sdf
+
+
+def test_sample_matches_evaluate_on_grid_nodes():
+    sdf = _field()
+    sdf.build()
+    rng = np.random.default_rng(0)
+    idx = rng.integers(0, np.array(sdf.shape), size=(200, 3))
+    nodes = sdf.origin + idx * sdf.spacing
+    distance, _ = sdf.sample(nodes)
+    assert np.allclose(distance, sdf.evaluate(nodes))
+
+
+def test_sample_is_close_to_evaluate_between_nodes():
+    sdf = _field()
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-1.9, 1.9, size=(2000, 3))
+    distance, gradient = sdf.sample(points)
+    # interpolating a distance field is off by at most about one grid cell
+    assert np.max(np.abs(distance - sdf.evaluate(points))) < sdf.spacing
+
+    # away from creases the gradient is the unit direction of steepest ascent
+    step = 1e-4
+    exact = np.stack([(sdf.evaluate(points + step * e) - sdf.evaluate(points - step * e)) / (2 * step)
+                      for e in np.identity(3)], axis=-1)
+    smooth = np.linalg.norm(exact, axis=1) > 0.99
+    cosine = np.sum(gradient[smooth] * exact[smooth], axis=1) / np.linalg.norm(gradient[smooth], axis=1)
+    assert np.median(cosine) > 0.99
+
+
+def test_vivarium_field_fits_the_node_budget(makeVivarium):
+    small = makeVivarium(prey=0)
+    assert small.sdf.spacing == SignedDistanceField.spacing
+    large = makeVivarium(prey=0, tank_dimensions=[40, 20, 40])
+    assert max(large.sdf.shape) <= large.sdf_nodes
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from EventQueue import EventQueue
+from Vivarium import Vivarium
+
+
+@pytest.fixture
+def stillVivarium(makeVivarium):
+    """
+    Three prey far apart, standing still, and a SleepSystem run by hand instead of by animationUpdate()
+    """
+    vivarium = makeVivarium(prey=3)
+    vivarium.store.positions()[:] = [(-1.5, 0, 0), (1.5, 0, 0), (0, 1.5, 0)]
+    vivarium.store.velocities()[:] = 0
+    vivarium.store.jointActivities()[:] = 0
+    vivarium.sleep.sleep_after = 3
+    return vivarium
+
+
+def settle(vivarium, ticks=1):
+    for _ in range(ticks):
+        vivarium.events.clear()
+        vivarium.grid.rebuild(vivarium.store.positions())
+        vivarium.sleep.update(vivarium.store, vivarium.events, vivarium.grid)
+
+
+def test_still_creatures_fall_asleep_after_sleep_after(stillVivarium):
+    vivarium = stillVivarium
+    settle(vivarium, 2)
+    assert not vivarium.store.sleepingMask().any()
+    settle(vivarium)
+    assert vivarium.store.sleepingMask().all()
+    assert all(c.sleeping for c in vivarium.store.objects)
+    assert vivarium.sleep.fell_asleep == 3
+    assert vivarium.sleep.counts() == {"sleeping": 3, "awake": 0}
+
+
+def test_speed_or_joints_keep_a_creature_awake(stillVivarium):
+    vivarium = stillVivarium
+    vivarium.store.velocities()[0] = (2 * vivarium.sleep.speed_threshold, 0, 0)
+    vivarium.store.jointActivities()[1] = 2 * vivarium.sleep.joint_threshold
+    settle(vivarium, 5)
+    assert vivarium.store.sleepingMask().tolist() == [False, False, True]
+    assert vivarium.store.idleTicks()[:2].tolist() == [0, 0]
+
+
+def test_wall_event_wakes_a_sleeper(stillVivarium):
+    vivarium = stillVivarium
+    settle(vivarium, 3)
+    vivarium.events.clear()
+    vivarium.events.push(EventQueue.WALL, 1, data=Vivarium.WALL_POS_X)
+    vivarium.sleep.update(vivarium.store, vivarium.events, vivarium.grid)
+    assert vivarium.store.sleepingMask().tolist() == [True, False, True]
+    assert vivarium.sleep.woken == 1
+    assert vivarium.store.idleTicks()[1] == 0
+
+
+def test_moving_neighbor_wakes_only_nearby_sleepers(stillVivarium):
+    vivarium = stillVivarium
+    settle(vivarium, 3)
+    # creature 0 is woken up and swims towards creature 1, creature 2 stays out of reach
+    vivarium.sleep.disturb(vivarium.store, [0])
+    vivarium.store.positions()[0] = (0.5, -0.5, 0)
+    vivarium.store.velocities()[0] = (1, 0, 0)
+    settle(vivarium)
+    assert vivarium.store.sleepingMask().tolist() == [False, False, True]
+
+
+def test_disturb_and_impulse_wake_up(stillVivarium):
+    vivarium = stillVivarium
+    settle(vivarium, 3)
+    vivarium.sleep.disturb(vivarium.store, [2, 2])
+    assert not vivarium.store.objects[2].sleeping
+    assert vivarium.store.idleTicks()[2] == 0
+    vivarium.applyImpulse(vivarium.store.objects[1], [0.5, 0, 0])
+    assert vivarium.store.sleepingMask().tolist() == [True, False, False]
+
+
+def test_disabled_system_keeps_everyone_awake(stillVivarium):
+    vivarium = stillVivarium
+    settle(vivarium, 3)
+    vivarium.sleep.enabled = False
+    settle(vivarium)
+    assert not vivarium.store.sleepingMask().any()
+    assert not vivarium.store.idleTicks().any()
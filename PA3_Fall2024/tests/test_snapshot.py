@@ -0,0 +1,29 @@
+import numpy as np
+
+from Vivarium import Vivarium
+
+
+def assertSameState(a, b):
+    assert np.array_equal(a.store.positions(), b.store.positions())
+    assert np.array_equal(a.store.velocities(), b.store.velocities())
+    assert a.tick_count == b.tick_count
+    assert a.eaten_count == b.eaten_count
+    assert a.food_eaten_count == b.food_eaten_count
+    for field in ("position", "velocity", "alive", "settled", "free"):
+        assert np.array_equal(getattr(a.food, field), getattr(b.food, field))
+    assert a.food.free_count == b.food.free_count
+
+
+def test_round_trip_keeps_food(fedVivarium):
+    original = fedVivarium
+    assert original.food_eaten_count > 0 and len(original.food) > 0
+    data = original.snapshot()
+
+    restored = Vivarium(None, None, seed=0, populate=False)
+    restored.restore(data)
+    assertSameState(original, restored)
+
+    for _ in range(10):
+        original.animationUpdate()
+        restored.animationUpdate()
+    assertSameState(original, restored)
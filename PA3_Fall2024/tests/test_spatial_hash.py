@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from Kernels import NumbaKernels, NumpyKernels, numba
+from SpatialHash import SpatialHash
+
+
+def bruteForcePairs(points, radius):
+    d = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+    i, j = np.nonzero(np.triu(d <= radius, k=1))
+    return set(zip(i.tolist(), j.tolist()))
+
+
+def asPairs(i, j):
+    pairs = list(zip(np.minimum(i, j).tolist(), np.maximum(i, j).tolist()))
+    # every pair is reported once
+    assert len(pairs) == len(set(pairs))
+    return set(pairs)
+
+
+KERNELS = [NumpyKernels] + ([NumbaKernels] if numba is not None else [])
+
+
+@pytest.mark.parametrize("kernels", KERNELS)
+@pytest.mark.parametrize("radius", [0.2, 0.5, 1.3])
+def test_pairsWithin_matches_brute_force(kernels, radius):
+    rng = np.random.default_rng(0)
+    # some points outside the tank, clamped into the border cells
+    points = rng.uniform(-2.5, 2.5, size=(300, 3))
+    grid = SpatialHash([4, 4, 4], cell_size=0.5, kernels=kernels())
+    grid.rebuild(points)
+    assert asPairs(*grid.pairsWithin(radius)) == bruteForcePairs(points, radius)
+
+
+def test_pairsWithin_handles_clusters_and_duplicates():
+    rng = np.random.default_rng(1)
+    points = np.concatenate((rng.normal(scale=0.05, size=(50, 3)), np.zeros((3, 3))))
+    grid = SpatialHash([4, 4, 4])
+    grid.rebuild(points)
+    assert asPairs(*grid.pairsWithin(0.1)) == bruteForcePairs(points, 0.1)
+
+
+def test_neighbor_queries_match_brute_force():
+    rng = np.random.default_rng(2)
+    points = rng.uniform(-2, 2, size=(200, 3))
+    queries = rng.uniform(-2, 2, size=(20, 3))
+    grid = SpatialHash([4, 4, 4])
+    grid.rebuild(points)
+    owner, indices = grid.neighborsOf(queries, 0.7)
+    for q, query in enumerate(queries):
+        expected = np.flatnonzero(np.linalg.norm(points - query, axis=1) <= 0.7)
+        assert sorted(indices[owner == q].tolist()) == expected.tolist()
+        assert sorted(grid.neighborsWithin(query, 0.7).tolist()) == expected.tolist()
+
+
+def test_empty_and_single_point():
+    grid = SpatialHash([4, 4, 4])
+    for points in (np.zeros((0, 3)), np.zeros((1, 3))):
+        grid.rebuild(points)
+        i, j = grid.pairsWithin(1.0)
+        assert len(i) == len(j) == 0
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from StateStream import StateClient, StateServer, creatureState
+
+
+@pytest.fixture
+def socketPath(tmp_path):
+    return str(tmp_path / "state.sock")
+
+
+def _sync(server, client, rounds=50):
+    """
+    Publish and poll until the viewer applied the server's latest frame and nothing is queued for it
+    """
+    for _ in range(rounds):
+        client.poll(timeout=0.05)
+        if client.tick_count == server.vivarium.tick_count and all(server.queued(c) == 0 for c in server.clients):
+            client.poll(timeout=0.05)
+            return
+        server._flush()
+    raise AssertionError("viewer did not catch up")
+
+
+def _assertMirrored(server, client):
+    registry = server.vivarium.registry
+    expected = {registry.handleOf(c): creatureState(c) for c in server.vivarium.store.objects}
+    assert sorted(client.creatures) == sorted(expected)
+    for i, creature in client.creatures.items():
+        assert np.allclose(creatureState(creature), expected[i], atol=10 * server.epsilon)
+
+
+def test_keyframes_and_deltas_round_trip(makeVivarium, socketPath):
+    server = StateServer(makeVivarium(prey=4, predators=1), socketPath, keyframe_interval=5)
+    client = StateClient(makeVivarium(prey=0), socketPath)
+    try:
+        server.publish()
+        _sync(server, client)
+        _assertMirrored(server, client)
+        for tick in range(12):
+            server.vivarium.animationUpdate()
+            if tick == 6:
+                server.vivarium.delObjInTank(server.vivarium.store.objects[1])
+            server.publish()
+            _sync(server, client)
+            _assertMirrored(server, client)
+    finally:
+        client.close()
+        server.close()
+
+
+def test_late_viewer_starts_from_a_keyframe(makeVivarium, socketPath):
+    server = StateServer(makeVivarium(prey=4, predators=1), socketPath, keyframe_interval=100)
+    early = StateClient(makeVivarium(prey=0), socketPath)
+    try:
+        for _ in range(5):
+            server.vivarium.animationUpdate()
+            server.publish()
+            _sync(server, early)
+        late = StateClient(makeVivarium(prey=0), socketPath)
+        try:
+            for _ in range(3):
+                server.vivarium.animationUpdate()
+                server.publish()
+                _sync(server, early)
+                _sync(server, late)
+            _assertMirrored(server, early)
+            _assertMirrored(server, late)
+        finally:
+            late.close()
+    finally:
+        early.close()
+        server.close()
+
+
+def test_stalled_viewer_does_not_block_the_server(makeVivarium, socketPath):
+    server = StateServer(makeVivarium(prey=40, predators=4), socketPath, keyframe_interval=1, max_queued=1 << 16)
+    client = StateClient(makeVivarium(prey=0), socketPath)
+    try:
+        server.publish()
+        largest = 0
+        # the viewer reads nothing while the server goes on publishing keyframes
+        for _ in range(200):
+            server.vivarium.animationUpdate()
+            largest = max(largest, server.publish())
+            assert server.queued(server.clients[0]) <= server.max_queued + largest
+        _sync(server, client, rounds=500)
+        _assertMirrored(server, client)
+    finally:
+        client.close()
+        server.close()
@@ -0,0 +1,119 @@
+import numpy as np
+
+from Vivarium import Vivarium
+
+
+def test_obstacle_push_out_stays_inside_tank(makeVivarium):
+    vivarium = makeVivarium(prey=1)
+    # an obstacle close to the +x wall pushes a creature between them towards the wall
+    vivarium.sdf.addSphere((1.2, 0, 0), 1.0)
+    radius = vivarium.store.radii()[0]
+    vivarium.store.positions()[0] = (2 - radius - 0.05, 0, 0)
+
+    vivarium.avoidObstacles()
+    assert vivarium.store.positions()[0, 0] <= 2 - radius
+
+    for _ in range(3):
+        vivarium.animationUpdate()
+        half = np.asarray(vivarium.tank_dimensions) / 2 - vivarium.store.radii()[:, None]
+        assert np.all(np.abs(vivarium.store.positions()) <= half)
+
+
+def test_interpolate_blends_joint_angles():
+    vivarium = Vivarium(None, None, seed=2)
+    vivarium.interpolate(1.0)
+    vivarium.animationUpdate()
+    vivarium.animationUpdate()
+    creature = vivarium.components[0]
+    current = [(c, c.uAngle, c.vAngle, c.wAngle) for c, _, _, _ in creature.previous_pose]
+    assert any((u, v, w) != (c.uAngle, c.vAngle, c.wAngle) for c, u, v, w in creature.previous_pose)
+
+    expected = {}
+    for c, u, v, w in creature.previous_pose:
+        c.uAngle, c.vAngle, c.wAngle = u, v, w
+        expected[c] = c.localMatrix()
+    for c, u, v, w in current:
+        c.uAngle, c.vAngle, c.wAngle = u, v, w
+        c.markDirty()
+
+    vivarium.interpolate(0.0)
+    for c, matrix in expected.items():
+        if c.scene is None:
+            # not attached to the tree, e.g. the bounding box
+            continue
+        # the creature's own translation is blended from its previous position
+        assert np.allclose(c.localMat[:3, :3], matrix[:3, :3])
+        if c is not creature:
+            assert np.allclose(c.localMat, matrix)
+    # simulation state is untouched
+    assert [(c, c.uAngle, c.vAngle, c.wAngle) for c, _, _, _ in current] == current
+
+
+def test_blendPose_takes_short_way_around():
+    vivarium = Vivarium(None, None, seed=2)
+    creature = vivarium.components[0]
+    creature.savePose(0)
+    creature.previous_pose[0] = (creature, 0.0, 359.0, 0.0)
+    creature.vAngle = 1.0
+    pose = creature.blendPose(0.5)
+    assert np.isclose(creature.vAngle % 360, 0.0)
+    creature.restorePose(pose)
+    assert creature.vAngle == 1.0
+
+
+def test_simulation_lod_is_opt_in(makeVivarium):
+    vivarium = makeVivarium(prey=6)
+    assert not vivarium.lod.enabled
+    rows, steps = vivarium.lod.schedule(vivarium.store)
+    assert sorted(rows) == list(range(6)) and np.all(steps == 1)
+
+    assert makeVivarium(prey=0, lod=True).lod.enabled
+
+
+def _stepHook(creature, hook):
+    """
+    Run hook(creature) at the start of creature's stepForward
+    """
+    stepForward = creature.stepForward
+
+    def step(*args):
+        hook(creature)
+        stepForward(*args)
+    creature.stepForward = step
+
+
+def test_removal_while_stepping_waits_for_commit(makeVivarium):
+    vivarium = makeVivarium(prey=4)
+    first, victim = vivarium.store.objects[0], vivarium.store.objects[2]
+    seen = []
+    _stepHook(first, lambda c: c.rmCollisionObj(victim))
+    _stepHook(victim, lambda c: seen.append(c.store_index))
+
+    vivarium.animationUpdate()
+    # the victim kept its row until every creature had stepped
+    assert seen == [2]
+    assert victim not in vivarium.registry
+    assert victim.store_index == -1
+    assert vivarium.eaten_count == 1
+    assert [o.store_index for o in vivarium.store.objects] == list(range(3))
+
+
+def test_addition_while_stepping_waits_for_commit(makeVivarium):
+    vivarium = makeVivarium(prey=2)
+    newcomer = makeVivarium(prey=1).store.objects[0]
+    newcomer.vivarium.delObjInTank(newcomer)
+    sizes = []
+    _stepHook(vivarium.store.objects[0], lambda c: c.addCollisionObj(newcomer))
+    _stepHook(vivarium.store.objects[1], lambda c: sizes.append(len(c.store)))
+
+    vivarium.animationUpdate()
+    assert sizes == [2]
+    assert newcomer in vivarium.registry
+    assert newcomer.store is vivarium.store
+    assert vivarium.pending_adds == []
+
+
+def test_headless_run_saves_no_poses(makeVivarium):
+    vivarium = makeVivarium(prey=2)
+    vivarium.animationUpdate()
+    assert all(c.pose_tick < 0 for c in vivarium.store.objects)